@@ -1,12 +1,24 @@
+import asyncio
 import io
-from pathlib import Path
-from typing import Any, Optional
-from PIL import Image, ImageDraw, ImageFont
-from .utils import Network
+from typing import Any, Optional, Sequence
+from PIL import Image
+from .utils import Network, cpu_tasks
+from .utils.network import DEFAULT_MAX_DOWNLOAD_BYTES, ClientPool, stream_download
+from .utils.url_guard import DEFAULT_GUARD, UrlGuard
+from .utils.anilist_cache import AniListCache
+from .utils.enrich import ENRICH_NONE, normalize_enrich_level
+from .utils.proxy_pool import POOL, ProxyRouter, is_proxy_failure
+from .utils.warmup import ENGINE_HOSTS, WARMUP_TIMEOUT
+from .utils.executors import run_cpu
+from .utils.fusion import DEFAULT_FUSION_RESULTS, DEFAULT_FUSION_TOP_K, FUSION_ENGINE, fuse_hits
+from .utils.rerank import ThumbnailReranker
+from .utils.local_index import LocalIndex
+from .utils.image_handle import ImageHandle, ImageSource
+from .utils.preprocess import UploadProfile
+from .utils.search_hit import SearchHit
 from .utils.types import FileContent
 from .utils.api_request import AnimeTrace, BaiDu, Copyseeker, EHentai, GoogleLens, SauceNAO, Tineye, Ascii2D, Iqdb, TraceMoe, Yandex
 
-import asyncio
 from astrbot.api import logger
 
 
@@ -25,18 +37,31 @@ ENGINE_MAP = {
     "tineye": Tineye,
 }
 
+# 支持跳过附加信息请求的引擎
+ENRICHABLE_ENGINES = {"tracemoe", "tineye", "baidu"}
+# 使用代理池的引擎在代理连接失败时最多尝试的代理数
+MAX_PROXY_ATTEMPTS = 3
+
 
 class BaseSearchModel:
     """
     图像反向搜索基础模型类
 
     提供多种搜索引擎的统一接口，支持本地文件和URL搜索，
-    可以输出文本结果或生成可视化图像结果，支持GIF格式自动转换
+    可以输出文本结果或生成可视化图像结果，GIF、动态 WebP、APNG 自动提取单帧
     """
 
     def __init__(self, proxies: Optional[str] = None, cookies: Optional[dict] = None,
                  timeout: int = 60, default_params: Optional[dict] = None, 
-                 default_cookies: Optional[dict] = None):
+                 default_cookies: Optional[dict] = None,
+                 max_download_bytes: int = DEFAULT_MAX_DOWNLOAD_BYTES,
+                 url_guard: Optional[UrlGuard] = DEFAULT_GUARD,
+                 proxy_router: Optional[ProxyRouter] = None,
+                 anilist_cache: Optional[AniListCache] = None,
+                 reranker: Optional[ThumbnailReranker] = None,
+                 local_index: Optional[LocalIndex] = None,
+                 upload_profiles: Optional[dict[str, UploadProfile]] = None,
+                 scan_frames: int = 0):
         """
         初始化搜索模型
 
@@ -46,12 +71,32 @@ class BaseSearchModel:
             timeout: 请求超时时间(秒)
             default_params: 各引擎的默认参数
             default_cookies: 各引擎的默认Cookie
+            max_download_bytes: 下载图片允许的最大字节数
+            url_guard: 下载图片时使用的URL安全检查器
+            proxy_router: 按引擎/主机选择代理的路由，未提供时所有请求使用 proxies
+            anilist_cache: TraceMoe 使用的 AniList 元数据缓存，None 表示不缓存
+            reranker: 按缩略图感知哈希重排结果的重排器，None 表示不重排
+            local_index: 记录历史搜索结果的本地索引，None 表示不记录
+            upload_profiles: 各引擎上传前的图像预处理配置，未配置的引擎上传原图
+            scan_frames: 动图选取最清晰一帧时比较的帧数，0 表示使用第一帧
         """
         self.proxies = proxies
         self.cookies = cookies
         self.timeout = timeout
         self.default_params = default_params or {}
         self.default_cookies = default_cookies or {}
+        self.max_download_bytes = max_download_bytes
+        self.url_guard = url_guard
+        self.proxy_router = proxy_router or ProxyRouter(default=proxies)
+        self.anilist_cache = anilist_cache
+        self.reranker = reranker
+        self.local_index = local_index
+        self.upload_profiles = upload_profiles or {}
+        self.scan_frames = scan_frames
+        # 写入本地索引等后台任务，保留引用避免任务被回收
+        self._background: set[asyncio.Task] = set()
+        # 搜索请求复用长连接客户端，避免每次搜索重新进行DNS/TCP/TLS握手
+        self.clients = ClientPool()
         self._yandex_cookie = None
         self._yandex_cookie_timestamp = 0
 
@@ -115,6 +160,10 @@ class BaseSearchModel:
                 "hl": search_params.get("hl", "zh-CN"),
                 "max_results": search_params.get("max_results", 10)
             }
+        elif api == "tracemoe":
+            engine_params = {
+                "anilist_cache": self.anilist_cache
+            }
         elif api == "yandex":
             engine_params = {
                 "max_results": search_params.get("max_results", 10),
@@ -143,7 +192,7 @@ class BaseSearchModel:
             return False
         try:
             # 简单 HEAD 请求或 GET 请求，检查是否返回 200 且无 CAPTCHA
-            async with Network(cookies=cookie, proxies=self.proxies, timeout=10) as client:
+            async with Network(cookies=cookie, proxies=self.proxy_router.for_engine("yandex"), timeout=10) as client:
                 resp = await client.get("https://yandex.com/images/")
                 if resp.status_code == 200 and "captcha" not in resp.text.lower():
                     return True
@@ -156,59 +205,164 @@ class BaseSearchModel:
         # Fallback to manual default cookie if provided.
         return self.default_cookies.get("yandex")
 
-    def _is_gif(self, file: FileContent) -> bool:
+    async def _network_kwargs(self, api: str, search_params: dict,
+                              timeout: Optional[float] = None) -> dict:
         """
-        检查文件是否为GIF格式
+        生成引擎使用的网络客户端配置（代理由调用方按路由补充）
 
         参数:
-            file: 待检查的文件内容
+            api: 搜索引擎API名称
+            search_params: 搜索参数
+            timeout: 请求超时(秒)，默认使用实例配置
 
         返回:
-            bool: 如果是GIF格式返回True，否则返回False
+            dict: Network 构造参数
         """
-        if isinstance(file, (str, Path)):
-            return str(file).lower().endswith('.gif')
-        elif isinstance(file, bytes):
-            return file.startswith((b'GIF87a', b'GIF89a'))
-        return False
+        network_kwargs = {}
+        effective_cookies = None
+        if api == "yandex":
+            effective_cookies = await self._get_yandex_cookie()
+
+        # Fix: Check for E-Hentai cookies in search_params (from default_params or kwargs)
+        elif api == "ehentai" and "cookies" in search_params:
+            effective_cookies = search_params.get("cookies") 
+            # Note: We don't pop it here because _prepare_engine_params might expect it, 
+            # or we can pop it. ehentai_req.py pops it in _prepare_engine_params effectively?
+            # No, _prepare_engine_params in model.py pops it. 
+            # So it's fine to just read it here.
+        
+        elif api in self.default_cookies:
+            effective_cookies = self.default_cookies.get(api)
+        elif self.cookies:
+            effective_cookies = self.cookies
+        if effective_cookies:
+            network_kwargs["cookies"] = effective_cookies
+        if timeout or self.timeout:
+            network_kwargs["timeout"] = timeout or self.timeout
+        return network_kwargs
 
-    async def _convert_gif_to_jpeg(self, file: FileContent) -> bytes:
+    def _proxy_kwargs(self, api: str, pool_proxy: Optional[str] = None) -> dict:
         """
-        将GIF图像转换为JPEG格式（异步方法，在单独线程中执行）
+        生成一次请求的代理配置：引擎与指向代理池的主机规则共用同一个代理池代理
 
         参数:
-            file: GIF格式的文件内容
+            api: 搜索引擎API名称
+            pool_proxy: 本次请求从代理池选定的代理
 
         返回:
-            bytes: 转换后的JPEG格式图像数据
-        """
-        def convert_image():
-            if isinstance(file, bytes):
-                img_data = file
-            else:
-                with open(file, 'rb') as f:
-                    img_data = f.read()
-            img = Image.open(io.BytesIO(img_data))
-            img.seek(0)
-            jpeg_io = io.BytesIO()
-            img.convert('RGB').save(jpeg_io, 'JPEG', quality=85)
-            return jpeg_io.getvalue()
-        return await asyncio.to_thread(convert_image)
-
-    async def search(self, api: str, file: FileContent = None,
-                     url: Optional[str] = None, **kwargs: Any) -> Optional[str]:
+            dict: Network 的 proxies / proxy_mounts 参数
+        """
+        if self.proxy_router.target_for_engine(api) == POOL:
+            kwargs = {"proxies": pool_proxy}
+        else:
+            kwargs = {"proxies": self.proxy_router.for_engine(api)}
+        host_mounts = self.proxy_router.host_mounts(pool_proxy)
+        if host_mounts:
+            kwargs["proxy_mounts"] = host_mounts
+        return kwargs
+
+    async def search(self, api: str, file: ImageSource = None,
+                     url: Optional[str] = None, *, timeout: Optional[float] = None,
+                     enrich: bool = True, top_k: Optional[int] = None, record: bool = True,
+                     **kwargs: Any) -> Optional[str]:
         """
         执行图像反向搜索
 
         参数:
             api: 搜索引擎API名称
-            file: 本地文件内容
+            file: 本地文件内容或图像句柄（同一图像多次搜索时传入句柄以复用解码结果）
             url: 图像URL
+            timeout: 本次搜索的请求超时(秒)，默认使用实例配置
+            enrich: 是否执行可选的附加信息请求（TraceMoe AniList、TinEye 域名等），
+                为False时忽略引擎的 enrich_level 配置并跳过全部附加请求
+            top_k: 最多解析的结果数，None 表示解析全部结果；解析按需进行，只需少量结果时可减少解析开销
+            record: 是否将结果写入本地索引（健康探测等非用户请求应为False）
             **kwargs: 其他搜索参数
 
         返回:
             Optional[str]: 搜索结果文本，搜索失败时返回None
 
+        异常:
+            ValueError: 当API不支持或参数错误时抛出
+        """
+        response = await self._search_response(
+            api, file, url, timeout=timeout, enrich=enrich, top_k=top_k, record=record, **kwargs
+        )
+        return response.show_result()
+
+    async def search_hits(self, api: str, file: ImageSource = None,
+                          url: Optional[str] = None, *, timeout: Optional[float] = None,
+                          enrich: bool = True, top_k: Optional[int] = None, record: bool = True,
+                          **kwargs: Any) -> list[SearchHit]:
+        """
+        执行图像反向搜索并返回统一格式的结果记录，用于缓存、合并或自定义渲染
+
+        参数与 search 相同
+
+        返回:
+            list[SearchHit]: 搜索结果记录
+
+        异常:
+            ValueError: 当API不支持或参数错误时抛出
+        """
+        response = await self._search_response(
+            api, file, url, timeout=timeout, enrich=enrich, top_k=top_k, record=record, **kwargs
+        )
+        return list(response.hits)
+
+    async def search_fused(self, engines: Sequence[str], file: ImageSource = None,
+                           url: Optional[str] = None, *, timeout: Optional[float] = None,
+                           enrich: bool = True, top_k: Optional[int] = DEFAULT_FUSION_TOP_K,
+                           limit: Optional[int] = DEFAULT_FUSION_RESULTS) -> list[SearchHit]:
+        """
+        并发调用多个引擎并合并结果：规范化链接去重后按各引擎得分统一排序
+
+        单个引擎失败只记录日志，不影响其他引擎的结果
+
+        参数:
+            engines: 参与合并的引擎，排在前面的引擎在合并字段时优先
+            file: 本地文件内容或图像句柄
+            url: 图像URL
+            timeout: 本次搜索的请求超时(秒)，默认使用实例配置
+            enrich: 是否执行可选的附加信息请求
+            top_k: 每个引擎最多解析的结果数
+            limit: 合并后最多返回的条数，None 表示全部
+
+        返回:
+            list[SearchHit]: 合并后的结果，engine 字段为命中引擎以 + 连接
+
+        异常:
+            ValueError: 没有可用引擎或全部引擎搜索失败时抛出
+        """
+        engines = [engine for engine in dict.fromkeys(engines) if engine in ENGINE_MAP]
+        if not engines:
+            raise ValueError("没有可用于合并搜索的引擎")
+        if file is not None:
+            # 各引擎共用同一图像句柄，动图提取单帧等只进行一次
+            file = await ImageHandle.from_file(file, self.scan_frames)
+        results = await asyncio.gather(
+            *(self.search_hits(engine, file, url, timeout=timeout, enrich=enrich, top_k=top_k) for engine in engines),
+            return_exceptions=True,
+        )
+        hit_lists = []
+        for engine, result in zip(engines, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"[{FUSION_ENGINE}] {engine} 搜索失败，跳过: {result}")
+                continue
+            hit_lists.append(result)
+        if not hit_lists:
+            raise ValueError("参与合并的引擎全部搜索失败")
+        return fuse_hits(hit_lists, limit=limit)
+
+    async def _search_response(self, api: str, file: ImageSource, url: Optional[str], *,
+                               timeout: Optional[float], enrich: bool, top_k: Optional[int],
+                               record: bool = True, **kwargs: Any) -> Any:
+        """
+        执行一次引擎搜索并返回响应解析对象（search 与 search_hits 共用）
+
+        返回:
+            Any: 引擎响应解析对象
+
         异常:
             ValueError: 当API不支持或参数错误时抛出
         """
@@ -219,57 +373,179 @@ class BaseSearchModel:
             raise ValueError("必须提供 file 或 url 参数")
         if file and url:
             raise ValueError("file 和 url 参数不能同时提供")
-        if file and not url and self._is_gif(file):
-            file = await self._convert_gif_to_jpeg(file)
+        handle = None
+        if file:
+            handle = await ImageHandle.from_file(file, self.scan_frames)
+            file = await handle.upload_bytes(self.upload_profiles.get(api))
+            if file is not handle.data:
+                logger.debug(f"[{api}] 上传前预处理: {len(handle.data) // 1024}KB -> {len(file) // 1024}KB")
         engine_class = ENGINE_MAP[api]
         default_params = self.default_params.get(api, {})
         search_params = {**default_params, **kwargs}
-        network_kwargs = {}
-        if self.proxies:
-            network_kwargs["proxies"] = self.proxies
-        effective_cookies = None
-        if api == "yandex":
-            effective_cookies = await self._get_yandex_cookie()
-
-        # Fix: Check for E-Hentai cookies in search_params (from default_params or kwargs)
-        elif api == "ehentai" and "cookies" in search_params:
-            effective_cookies = search_params.get("cookies") 
-            # Note: We don't pop it here because _prepare_engine_params might expect it, 
-            # or we can pop it. ehentai_req.py pops it in _prepare_engine_params effectively?
-            # No, _prepare_engine_params in model.py pops it. 
-            # So it's fine to just read it here.
+        if api == "iqdb" and handle is not None and file is handle.data:
+            # 预处理后的图像尺寸已在限制内，由引擎自行读取
+            search_params["image_size"] = handle.size
+        if top_k is not None:
+            search_params["top_k"] = top_k
+        if api in ENRICHABLE_ENGINES:
+            search_params["enrich_level"] = (
+                normalize_enrich_level(search_params.get("enrich_level")) if enrich else ENRICH_NONE
+            )
+        network_kwargs = await self._network_kwargs(api, search_params, timeout)
         
-        elif api in self.default_cookies:
-            effective_cookies = self.default_cookies.get(api)
-        elif self.cookies:
-            effective_cookies = self.cookies
-        if effective_cookies:
-            network_kwargs["cookies"] = effective_cookies
-        if self.timeout:
-            network_kwargs["timeout"] = self.timeout
         
         # NOTE: Exceptions are now propagated to caller (main.py) to distinguish from "No results"
-        async with Network(**network_kwargs) as client:
-            engine_params = self._prepare_engine_params(api, search_params)
-            engine_instance = engine_class(client=client, **engine_params)
-            if api == "animetrace" and search_params.get("base64"):
-                response = await engine_instance.search(
-                    base64=search_params.pop("base64"),
-                    model=search_params.pop("model", None),
-                    **search_params
+        pool = self.proxy_router.pool
+        # 引擎本身或其请求的某些主机经过代理池时，每次尝试只选择一个代理，失败后换用其他代理重试
+        backend = engine_class.transport_backend
+        use_pool = self.proxy_router.uses_pool(api, backend)
+        # 只经由主机规则使用代理池时，成功的请求不一定经过了选定的代理，不计入该代理的成功
+        engine_pooled = self.proxy_router.target_for_engine(api) == POOL
+        attempts = min(len(pool.states), MAX_PROXY_ATTEMPTS) if use_pool else 1
+        tried: list[str] = []
+        for attempt in range(attempts):
+            proxy = pool.choose(tried) if use_pool else None
+            try:
+                response = await self._run_engine(
+                    api, engine_class, {**network_kwargs, **self._proxy_kwargs(api, proxy)}, dict(search_params), file, url
                 )
-            else:
-                response = await engine_instance.search(file=file, url=url, **search_params)
-            return response.show_result()
+            except Exception as e:
+                if not (proxy and is_proxy_failure(e) and self.proxy_router.routed_through_pool(api, e, backend)):
+                    raise
+                pool.mark_failure(proxy, e)
+                tried.append(proxy)
+                if attempt + 1 >= attempts:
+                    raise
+                logger.warning(f"[{api}] 代理 {proxy} 连接失败，切换代理重试: {e}")
+                continue
+            if engine_pooled and proxy:
+                pool.mark_success(proxy)
+            if enrich and handle is not None and self.reranker is not None and self.reranker.applies_to(api):
+                await self._rerank(api, response, handle)
+            if record and handle is not None and self.local_index is not None and self.local_index.records(api):
+                task = asyncio.create_task(self._record_local(api, response.hits, handle))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return response
+
+    async def _rerank(self, api: str, response: Any, handle: ImageHandle) -> None:
+        """
+        下载结果缩略图并按与查询图像的感知哈希距离重排结果，失败时保持原顺序
+
+        参数:
+            api: 搜索引擎API名称
+            response: 引擎响应解析对象
+            handle: 查询图像
+        """
+        client = self.clients.get(proxies=self.proxy_router.for_engine(api))
+        await self.reranker.rerank_response(response, handle, client, guard=self.url_guard)
+
+    async def _record_local(self, api: str, hits: Sequence[SearchHit], handle: ImageHandle) -> None:
+        """
+        后台将搜索结果写入本地索引，失败只记录日志
+
+        参数:
+            api: 搜索引擎API名称
+            hits: 搜索结果记录
+            handle: 查询图像
+        """
+        try:
+            client = self.clients.get(proxies=self.proxy_router.for_engine(api))
+            added = await self.local_index.record(handle, hits, client, guard=self.url_guard)
+            if added:
+                logger.debug(f"[LocalIndex] 已记录 {api} 的 {added} 条结果")
+        except Exception as e:
+            logger.warning(f"[LocalIndex] 记录 {api} 的结果失败: {e}")
+
+    async def search_local(self, file: ImageSource) -> list[SearchHit]:
+        """
+        在本地索引中查找图像的已知来源，不请求任何引擎
+
+        参数:
+            file: 本地文件内容或图像句柄
+
+        返回:
+            list[SearchHit]: 命中的结果，未启用本地索引或未命中时为空列表
+        """
+        if self.local_index is None or not self.local_index.available:
+            return []
+        return await self.local_index.lookup(await ImageHandle.from_file(file, self.scan_frames))
+
+    async def _run_engine(self, api: str, engine_class: type, network_kwargs: dict,
+                          search_params: dict, file: FileContent, url: Optional[str]) -> Any:
+        """
+        使用指定网络配置执行一次引擎搜索
+
+        参数:
+            api: 搜索引擎API名称
+            engine_class: 引擎类
+            network_kwargs: Network 构造参数
+            search_params: 搜索参数
+            file: 本地文件内容
+            url: 图像URL
+
+        返回:
+            Any: 引擎响应解析对象
+        """
+        client = self.clients.get(**network_kwargs)
+        transport = self.clients.transport(engine_class.transport_backend, **network_kwargs)
+        engine_params = self._prepare_engine_params(api, search_params)
+        engine_params["max_download_bytes"] = self.max_download_bytes
+        engine_params["url_guard"] = self.url_guard
+        engine_instance = engine_class(client=client, transport=transport, **engine_params)
+        if api == "animetrace" and search_params.get("base64"):
+            return await engine_instance.search(
+                base64=search_params.pop("base64"),
+                model=search_params.pop("model", None),
+                **search_params
+            )
+        return await engine_instance.search(file=file, url=url, **search_params)
+
+    async def warm_up(self, api: str) -> int:
+        """
+        预热引擎连接：使用搜索时相同配置的共享传输层向引擎主机发送轻量请求，
+        提前完成DNS解析、TCP与TLS握手，并刷新空闲连接
+
+        参数:
+            api: 搜索引擎API名称
 
-    async def search_and_print(self, api: str, file: FileContent = None,
+        返回:
+            int: 成功建立连接的主机数
+        """
+        hosts = ENGINE_HOSTS.get(api, ())
+        engine_class = ENGINE_MAP.get(api)
+        if not hosts or engine_class is None:
+            return 0
+        network_kwargs = await self._network_kwargs(api, dict(self.default_params.get(api, {})))
+        pool_proxy = (
+            self.proxy_router.pool.choose()
+            if self.proxy_router.uses_pool(api, engine_class.transport_backend) else None
+        )
+        transport = self.clients.transport(
+            engine_class.transport_backend, **network_kwargs, **self._proxy_kwargs(api, pool_proxy)
+        )
+        results = await asyncio.gather(
+            *(transport.request("HEAD", f"https://{host}/", timeout=WARMUP_TIMEOUT) for host in hosts),
+            return_exceptions=True,
+        )
+        return sum(not isinstance(r, Exception) for r in results)
+
+    async def aclose(self) -> None:
+        """
+        关闭共享的网络客户端，取消未完成的后台任务
+        """
+        for task in list(self._background):
+            task.cancel()
+        await self.clients.aclose()
+
+    async def search_and_print(self, api: str, file: ImageSource = None,
                                url: Optional[str] = None, **kwargs: Any) -> None:
         """
         执行搜索并打印结果到控制台
 
         参数:
             api: 搜索引擎API名称
-            file: 本地文件内容
+            file: 本地文件内容或图像句柄
             url: 图像URL
             **kwargs: 其他搜索参数
 
@@ -282,14 +558,14 @@ class BaseSearchModel:
         except Exception:
             print(f"❌ {api} 搜索失败")
 
-    async def search_and_draw(self, api: str, file: FileContent = None,
+    async def search_and_draw(self, api: str, file: ImageSource = None,
                               url: Optional[str] = None, **kwargs: Any) -> Image.Image:
         """
         执行搜索并将结果渲染为图像
 
         参数:
             api: 搜索引擎API名称
-            file: 本地文件内容
+            file: 本地文件内容或图像句柄
             url: 图像URL
             **kwargs: 其他搜索参数
 
@@ -297,33 +573,25 @@ class BaseSearchModel:
             Image.Image: 渲染后的结果图像
         """
         try:
+            if file is not None:
+                file = await ImageHandle.from_file(file, self.scan_frames)
+                file.prefetch("jpeg", "preview")
             result = await self.search(api=api, file=file, url=url, **kwargs)
-            source_image = None
-            
-            def load_image():
-                if file is not None:
-                    if isinstance(file, (str, Path)):
-                        return Image.open(file)
-                    elif isinstance(file, bytes):
-                        return Image.open(io.BytesIO(file))
-                return None
-            
+            source_bytes = None
             if file is not None:
-                source_image = await asyncio.to_thread(load_image)
+                source_bytes = await file.preview()
             elif url is not None:
-                network_kwargs = {}
-                if self.proxies:
-                    network_kwargs["proxies"] = self.proxies
+                network_kwargs = {"proxies": self.proxy_router.for_url(url)}
                 if self.timeout:
                     network_kwargs["timeout"] = self.timeout
                 async with Network(**network_kwargs) as client:
-                    response = await client.get(url)
-                    img_data = await response.aread()
-                    source_image = await asyncio.to_thread(lambda: Image.open(io.BytesIO(img_data)))
-            
-            return await asyncio.to_thread(self.draw_results, api, result, source_image)
+                    source_bytes = await stream_download(
+                        client, url, max_bytes=self.max_download_bytes, guard=self.url_guard
+                    )
+            img_bytes = await run_cpu(cpu_tasks.render_results_jpeg, api, result, source_bytes)
         except Exception:
-            return await asyncio.to_thread(self.draw_error, api, "搜索失败")
+            img_bytes = await run_cpu(cpu_tasks.render_error_jpeg, api, "搜索失败")
+        return Image.open(io.BytesIO(img_bytes))
 
     def _format_error(self, api: str, error_msg: str) -> str:
         """
@@ -367,68 +635,7 @@ class BaseSearchModel:
         返回:
             Image.Image: 渲染后的结果图像
         """
-        margin = 20
-        lines = result.split('\n')
-        base_dir = Path(__file__).parent
-        font_path = str(base_dir / "resource/font/arialuni.ttf")
-        try:
-            font = ImageFont.truetype(font_path, 18)
-            title_font = ImageFont.truetype(font_path, 24)
-        except IOError:
-            font = ImageFont.load_default()
-            title_font = ImageFont.load_default()
-        title_text = f"{api.upper()} 搜索结果"
-        if hasattr(title_font, "getbbox"):
-            title_width = title_font.getbbox(title_text)[2] + margin * 2
-        else:
-            title_width = title_font.getsize(title_text)[0] + margin * 2
-        max_text_width = 0
-        for line in lines:
-            if hasattr(font, "getbbox"):
-                line_width = font.getbbox(line)[2] + margin * 2
-            else:
-                line_width = font.getsize(line)[0] + margin * 2
-            max_text_width = max(max_text_width, line_width)
-        source_img_height = 0
-        source_img_width = 0
-        if source_image:
-            max_source_width = 800
-            orig_width, orig_height = source_image.size
-            if orig_width > max_source_width:
-                ratio = max_source_width / orig_width
-                source_img_width = max_source_width
-                source_img_height = int(orig_height * ratio)
-                source_image = source_image.resize((source_img_width, source_img_height), Image.LANCZOS)
-            else:
-                source_img_width = orig_width
-                source_img_height = orig_height
-        width = max(800, title_width, max_text_width, source_img_width + margin * 2)
-        if hasattr(font, "getbbox"):
-            line_height = max(25, font.getbbox("Ay")[3] + 7)
-        else:
-            line_height = max(25, font.getsize("Ay")[1] + 7)
-        header_height = 60
-        content_height = margin + line_height * len(lines)
-        source_area_height = source_img_height + margin * 2 if source_image else 0
-        total_height = header_height + content_height + source_area_height
-        img = Image.new('RGB', (width, total_height), color='white')
-        draw = ImageDraw.Draw(img)
-        draw.rectangle([(0, 0), (width, header_height)], fill='#4a6ea9')
-        draw.text((margin, margin), title_text, font=title_font, fill='white')
-        y_offset = header_height
-        if source_image:
-            x_center = (width - source_img_width) // 2
-            img.paste(source_image, (x_center, y_offset + margin))
-            y_offset += source_img_height + margin * 2
-            draw.line([(margin, y_offset - margin // 2), (width - margin, y_offset - margin // 2)], fill='#cccccc', width=2)
-        y_position = y_offset
-        for line in lines:
-            if line.startswith('='):
-                draw.line([(margin, y_position), (width - margin, y_position)], fill='#cccccc', width=1)
-            else:
-                draw.text((margin, y_position), line, font=font, fill='black')
-            y_position += line_height
-        return img
+        return cpu_tasks.draw_results(api, result, source_image)
 
     def draw_error(self, api: str, error_msg: str) -> Image.Image:
         """
@@ -443,19 +650,4 @@ class BaseSearchModel:
         返回:
             Image.Image: 渲染后的错误图像
         """
-        width, height = 600, 200
-        img = Image.new('RGB', (width, height), color='white')
-        draw = ImageDraw.Draw(img)
-        draw.rectangle([(0, 0), (width, 60)], fill='#e74c3c')
-        try:
-            base_dir = Path(__file__).parent
-            font_path = str(base_dir / "resource/font/arialuni.ttf")
-            font = ImageFont.truetype(font_path, 18)
-            title_font = ImageFont.truetype(font_path, 24)
-        except IOError:
-            font = ImageFont.load_default()
-            title_font = ImageFont.load_default()
-        margin = 20
-        draw.text((margin, margin), f"{api.upper()} 搜索失败", font=title_font, fill='white')
-        draw.text((margin, 80), f"错误信息: {error_msg}", font=font, fill='black')
-        return img
\ No newline at end of file
+        return cpu_tasks.draw_error(api, error_msg)
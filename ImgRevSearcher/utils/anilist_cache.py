@@ -0,0 +1,217 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+from astrbot.api import logger
+from .executors import run_io
+from .ext_tools import json_dumps, json_loads
+
+DEFAULT_CACHE_PATH = Path("data/plugins/img_rev_searcher/anilist_cache.sqlite3")
+# 番剧标题与封面几乎不会变化，默认缓存30天
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MEMORY_ENTRIES = 1000
+
+
+class AniListCache:
+    """
+    AniList 番剧元数据缓存
+
+    以 AniList ID 为键持久化到 SQLite，前面再加一层内存 LRU；
+    数据库读写是阻塞操作，异步接口统一放到I/O线程池执行
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_CACHE_PATH,
+        ttl: float = DEFAULT_TTL,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+    ):
+        """
+        初始化缓存
+
+        参数:
+            path: SQLite 数据库文件路径
+            ttl: 缓存有效期(秒)
+            memory_entries: 内存 LRU 最多保存的条目数
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        打开（必要时创建）数据库，需在持有锁时调用
+        """
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS media ("
+                "id INTEGER PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+        return self._conn
+
+    def _remember(self, aid: int, expires: float, media: dict) -> None:
+        """
+        写入内存 LRU，需在持有锁时调用
+        """
+        self._memory[aid] = (expires, media)
+        self._memory.move_to_end(aid)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many_sync(self, ids: Iterable[int]) -> dict[int, dict]:
+        """
+        批量读取未过期的元数据（同步）
+
+        参数:
+            ids: AniList ID 列表
+
+        返回:
+            dict[int, dict]: 命中的 ID 到元数据的映射
+        """
+        ids = list(ids)
+        now = time.time()
+        found: dict[int, dict] = {}
+        with self._lock:
+            missing = []
+            for aid in ids:
+                entry = self._memory.get(aid)
+                if entry and entry[0] > now:
+                    self._memory.move_to_end(aid)
+                    found[aid] = entry[1]
+                else:
+                    missing.append(aid)
+            if missing:
+                placeholders = ",".join("?" * len(missing))
+                rows = self._connect().execute(
+                    f"SELECT id, data, expires FROM media WHERE id IN ({placeholders}) AND expires > ?",
+                    (*missing, now),
+                ).fetchall()
+                for aid, data, expires in rows:
+                    media = json_loads(data)
+                    self._remember(aid, expires, media)
+                    found[aid] = media
+            self.hits += len(found)
+            self.misses += len(ids) - len(found)
+        return found
+
+    def put_many_sync(self, items: dict[int, dict]) -> int:
+        """
+        批量写入元数据（同步）
+
+        参数:
+            items: AniList ID 到元数据的映射
+
+        返回:
+            int: 写入的条目数
+        """
+        if not items:
+            return 0
+        expires = time.time() + self.ttl
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO media (id, data, expires) VALUES (?, ?, ?)",
+                    [(aid, json_dumps(media), expires) for aid, media in items.items()],
+                )
+            for aid, media in items.items():
+                self._remember(aid, expires, media)
+        return len(items)
+
+    async def get_many(self, ids: Iterable[int]) -> dict[int, dict]:
+        """
+        批量读取未过期的元数据
+
+        参数:
+            ids: AniList ID 列表
+
+        返回:
+            dict[int, dict]: 命中的 ID 到元数据的映射
+        """
+        return await run_io(self.get_many_sync, list(ids))
+
+    async def put_many(self, items: dict[int, dict]) -> int:
+        """
+        批量写入元数据
+
+        参数:
+            items: AniList ID 到元数据的映射
+
+        返回:
+            int: 写入的条目数
+        """
+        return await run_io(self.put_many_sync, dict(items))
+
+    def import_file_sync(self, path: Union[str, Path]) -> int:
+        """
+        从文件批量导入元数据，用于预热缓存（同步）
+
+        支持 JSON 数组、{"media": [...]}（如 AniList Page 查询结果）以及每行一个对象的 JSON Lines，
+        每个对象需包含 id 字段
+
+        参数:
+            path: 文件路径
+
+        返回:
+            int: 导入的条目数
+        """
+        raw = Path(path).read_bytes()
+        try:
+            records: Any = json_loads(raw)
+        except ValueError:
+            records = [json_loads(line) for line in raw.splitlines() if line.strip()]
+        if isinstance(records, dict):
+            if "id" in records:
+                records = [records]
+            else:
+                records = records.get("media") or (records.get("data") or {}).get("Page", {}).get("media") or []
+        items = {
+            int(record["id"]): record
+            for record in records
+            if isinstance(record, dict) and record.get("id")
+        }
+        count = self.put_many_sync(items)
+        logger.info(f"[AniListCache] 已从 {path} 导入 {count} 条番剧信息")
+        return count
+
+    async def import_file(self, path: Union[str, Path]) -> int:
+        """
+        从文件批量导入元数据，用于预热缓存
+
+        参数:
+            path: 文件路径
+
+        返回:
+            int: 导入的条目数
+        """
+        return await run_io(self.import_file_sync, path)
+
+    def close(self) -> None:
+        """
+        关闭数据库连接
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def describe(self) -> str:
+        """
+        生成缓存状态文本，供管理员查看
+
+        返回:
+            str: 状态文本
+        """
+        total = self.hits + self.misses
+        ratio = f"{self.hits / total * 100:.0f}%" if total else "-"
+        return f"AniList缓存: 内存 {len(self._memory)}/{self.memory_entries} 条, 命中 {self.hits}, 未命中 {self.misses}, 命中率 {ratio}"
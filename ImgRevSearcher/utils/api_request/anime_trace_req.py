@@ -1,4 +1,3 @@
-from json import loads as json_loads
 from pathlib import Path
 from typing import Any, Optional, Union
 from typing_extensions import override
@@ -54,7 +53,7 @@ class AnimeTrace(BaseSearchReq[AnimeTraceResponse]):
             file: 本地文件内容
             base64: Base64编码的图像数据
             model: 使用的识别模型
-            **kwargs: 其他搜索参数
+            **kwargs: 其他搜索参数，top_k 为最多解析的结果数
             
         返回:
             AnimeTraceResponse: 搜索响应对象
@@ -90,4 +89,4 @@ class AnimeTrace(BaseSearchReq[AnimeTraceResponse]):
             )
         else:
             raise ValueError("One of 'url', 'file', or 'base64' must be provided")
-        return AnimeTraceResponse(json_loads(resp.text), resp.url)
+        return AnimeTraceResponse(resp.json(), resp.url, top_k=kwargs.get("top_k"))
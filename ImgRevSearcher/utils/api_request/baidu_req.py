@@ -1,11 +1,12 @@
-from json import loads as json_loads
 from pathlib import Path
 from typing import Any, Optional, Union
 from lxml.html import HTMLParser, fromstring
 from pyquery import PyQuery
 from typing_extensions import override
 from ..response_parser import BaiDuResponse
-from ..ext_tools import deep_get, read_file
+from ..ext_tools import deep_get, json_loads, read_file
+from ..embedded_json import extract_script_json
+from ..enrich import ENRICH_FULL, await_follow_up
 from .base_req import BaseSearchReq
 
 
@@ -27,16 +28,22 @@ class BaiDu(BaseSearchReq[BaiDuResponse]):
         super().__init__(base_url, **request_kwargs)
 
     @staticmethod
-    def _extract_card_data(data: PyQuery) -> list[dict[str, Any]]:
+    def _extract_card_data(content: bytes) -> list[dict[str, Any]]:
         """
         从页面中提取卡片数据
         
+        先直接在字节流中定位 window.cardData 并做括号匹配，失败时才回退到完整的DOM解析
+        
         参数:
-            data: PyQuery对象，包含页面HTML
+            content: 页面HTML字节
             
         返回:
             list[dict[str, Any]]: 提取的卡片数据列表
         """
+        card_data = extract_script_json(content, b"window.cardData")
+        if isinstance(card_data, list):
+            return card_data
+        data = PyQuery(fromstring(content, parser=HTMLParser(encoding="utf-8")))
         for script in data("script").items():
             script_text = script.text()
             if script_text and "window.cardData" in script_text:
@@ -50,6 +57,7 @@ class BaiDu(BaseSearchReq[BaiDuResponse]):
         self,
         url: Optional[str] = None,
         file: Union[str, bytes, Path, None] = None,
+        enrich_level: str = ENRICH_FULL,
         **kwargs: Any,
     ) -> BaiDuResponse:
         """
@@ -58,7 +66,9 @@ class BaiDu(BaseSearchReq[BaiDuResponse]):
         参数:
             url: 图像URL
             file: 本地文件内容
-            **kwargs: 其他搜索参数
+            enrich_level: 附加信息级别。页面已有相同图片结果时，相似图片列表视为附加信息：
+                none 不请求，basic 最多等待数秒，full 等待请求完成
+            **kwargs: 其他搜索参数，top_k 为最多解析的结果数
             
         返回:
             BaiDuResponse: 搜索响应对象
@@ -80,14 +90,13 @@ class BaiDu(BaseSearchReq[BaiDuResponse]):
             data=data,
             files=files,
         )
-        data_url = deep_get(json_loads(resp.text), "data.url")
+        data_url = deep_get(resp.json(), "data.url")
         if not data_url:
             return BaiDuResponse({}, resp.url)
         resp = await self._send_request(method="get", url=data_url)
-        utf8_parser = HTMLParser(encoding="utf-8")
-        data = PyQuery(fromstring(resp.text, parser=utf8_parser))
-        card_data = self._extract_card_data(data)
+        card_data = self._extract_card_data(resp.content)
         same_data = None
+        next_url = None
         for card in card_data:
             if card.get("cardName") == "noresult":
                 return BaiDuResponse({}, data_url)
@@ -95,9 +104,26 @@ class BaiDu(BaseSearchReq[BaiDuResponse]):
                 same_data = card["tplData"]
             if card.get("cardName") == "simipic":
                 next_url = card["tplData"]["firstUrl"]
-                resp = await self._send_request(method="get", url=next_url)
-                resp_data = json_loads(resp.text)
-                if same_data:
-                    resp_data["same"] = same_data
-                return BaiDuResponse(resp_data, data_url)
-        return BaiDuResponse({}, data_url)
+        if not next_url:
+            return BaiDuResponse({"same": same_data} if same_data else {}, data_url)
+        if not deep_get(same_data or {}, "list"):
+            # 没有相同图片结果时相似图片列表就是主结果，必须等待
+            return BaiDuResponse(await self._fetch_simipic(next_url), data_url, top_k=kwargs.get("top_k"))
+        resp_data = await await_follow_up(
+            self._fetch_simipic(next_url), enrich_level, "百度相似图片"
+        ) or {}
+        resp_data["same"] = same_data
+        return BaiDuResponse(resp_data, data_url, top_k=kwargs.get("top_k"))
+
+    async def _fetch_simipic(self, next_url: str) -> dict[str, Any]:
+        """
+        获取相似图片列表
+        
+        参数:
+            next_url: simipic 卡片中的 firstUrl
+            
+        返回:
+            dict[str, Any]: 相似图片数据
+        """
+        resp = await self._send_request(method="get", url=next_url)
+        return resp.json()
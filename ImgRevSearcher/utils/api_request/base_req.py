@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import Any, Generic, Optional, TypeVar
 from ..response_parser.base_parser import BaseSearchResponse
 from ..network import RESP, HandOver
+from ..retry import DEFAULT_BUDGET, DEFAULT_POLICY, RetryPolicy, call_with_retry
 from ..types import FileContent
 
 ResponseT = TypeVar("ResponseT")
@@ -14,8 +15,13 @@ class BaseSearchReq(HandOver, ABC, Generic[T]):
     
     所有搜索引擎请求类的抽象基类，提供通用的请求发送功能
     并定义搜索接口规范
+
+    子类可通过 retry_policy 声明默认重试策略，并通过 stage_policies
+    为不同请求阶段（如附加信息请求）单独覆盖
     """
     base_url: str
+    retry_policy: RetryPolicy = DEFAULT_POLICY
+    stage_policies: dict[str, RetryPolicy] = {}
 
     def __init__(self, base_url: str, **request_kwargs: Any):
         """
@@ -64,9 +70,9 @@ class BaseSearchReq(HandOver, ABC, Generic[T]):
         files = {"fileToUpload": ("image.jpg", file, "image/jpeg")}
         
         try:
-             # Using self.client (httpx.AsyncClient)
-             resp = await self.client.post(url, data=data, files=files)
-             resp.raise_for_status()
+             resp = await self._send_request("post", url=url, stage="upload", data=data, files=files, timeout=60)
+             if resp.status_code >= 400:
+                  raise ValueError(f"Upload failed with HTTP {resp.status_code}")
              public_url = resp.text.strip()
              if not public_url.startswith("http"):
                   raise ValueError(f"Invalid upload response: {public_url}")
@@ -76,14 +82,16 @@ class BaseSearchReq(HandOver, ABC, Generic[T]):
              logger.error(f"[BaseSearchReq] Upload failed: {e}")
              raise e
 
-    async def _send_request(self, method: str, endpoint: str = "", url: str = "", **kwargs: Any) -> RESP:
+    async def _send_request(self, method: str, endpoint: str = "", url: str = "", stage: str = "",
+                            **kwargs: Any) -> RESP:
         """
-        发送HTTP请求
+        发送HTTP请求（按重试策略自动重试）
         
         参数:
             method: HTTP方法(get/post)
             endpoint: API端点路径
             url: 完整的请求URL，如果提供则忽略base_url和endpoint
+            stage: 请求阶段名称，用于选择 stage_policies 中的重试策略
             **kwargs: 其他请求参数
             
         返回:
@@ -96,8 +104,15 @@ class BaseSearchReq(HandOver, ABC, Generic[T]):
         method = method.lower()
         if method == "get":
             kwargs.pop("files", None)
-            return await self.get(request_url, **kwargs)
+            send = self.get
         elif method == "post":
-            return await self.post(request_url, **kwargs)
+            send = self.post
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
+        policy = self.stage_policies.get(stage, self.retry_policy)
+        name = f"{type(self).__name__}:{stage}" if stage else type(self).__name__
+        # 只有携带文件的请求才按上传处理，仅提交URL或查询的POST照常重试超时
+        upload = bool(kwargs.get("files"))
+        return await call_with_retry(
+            lambda: send(request_url, **kwargs), policy, DEFAULT_BUDGET, name, upload=upload
+        )
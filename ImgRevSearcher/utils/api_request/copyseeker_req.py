@@ -40,9 +40,6 @@ class Copyseeker(BaseSearchReq[CopyseekerResponse]):
         # RapidAPI Endpoint takes imageUrl as query param
         params = {"imageUrl": url}
         
-        # Import json locally or at top level (assuming top level has imports, or add local import)
-        import json
-        
         try:
             resp = await self._send_request(
                 method="GET",
@@ -55,7 +52,7 @@ class Copyseeker(BaseSearchReq[CopyseekerResponse]):
                 logger.error(f"[Copyseeker] API Error: {resp.status_code} - {resp.text}")
                 return CopyseekerResponse({}, resp.url)
                 
-            return CopyseekerResponse(json.loads(resp.text), resp.url)
+            return CopyseekerResponse(resp.json(), resp.url)
             
         except Exception as e:
             logger.error(f"[Copyseeker] Request failed: {e}")
@@ -3,6 +3,8 @@ from typing import Any, Optional, Union
 from typing_extensions import override
 from ..response_parser import EHentaiResponse
 from ..ext_tools import read_file
+from ..cpu_tasks import parse_response
+from ..executors import run_cpu
 from .base_req import BaseSearchReq
 
 
@@ -51,7 +53,7 @@ class EHentai(BaseSearchReq[EHentaiResponse]):
         参数:
             url: 图像URL
             file: 本地文件内容
-            **kwargs: 其他搜索参数
+            **kwargs: 其他搜索参数，top_k 为最多解析的结果数
             
         返回:
             EHentaiResponse: 搜索响应对象
@@ -80,4 +82,4 @@ class EHentai(BaseSearchReq[EHentaiResponse]):
             data=data,
             files=files,
         )
-        return EHentaiResponse(resp.text, resp.url)
+        return await run_cpu(parse_response, EHentaiResponse, resp.content, resp.url, {"top_k": kwargs.get("top_k")})
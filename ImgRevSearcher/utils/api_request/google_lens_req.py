@@ -1,15 +1,22 @@
 from typing import Any, Optional, Dict
 from typing_extensions import override
-import requests
-import json
 
 from ..response_parser.google_lens_parser import GoogleLensResponse
 from .base_req import BaseSearchReq
+from ..retry import NO_RETRY, RetryPolicy
 from astrbot.api import logger
 
+# 主引擎（SerpApi）仅在连接层失败时重试，其他错误直接切换到备用引擎
+PRIMARY_RETRY_POLICY = RetryPolicy(max_attempts=2, retry_statuses=frozenset(), base_delay=1.0)
+# GoogleLens 自身的参数，其余参数作为网络配置传给子引擎
+GOOGLE_LENS_PARAMS = ("api_keys", "serpapi_key", "zenserp_key", "country", "hl", "max_results")
+
+
 class GoogleLensSerpApi(BaseSearchReq[GoogleLensResponse]):
-    def __init__(self, api_key: str, **kwargs: Any):
-        super().__init__("https://serpapi.com/search") # Pass base_url
+    retry_policy = PRIMARY_RETRY_POLICY
+
+    def __init__(self, api_key: str, **request_kwargs: Any):
+        super().__init__("https://serpapi.com/search", **request_kwargs) # Pass base_url
         self.api_key = api_key
         # SerpApi params matched to user's example
         self.engine = "google_lens"
@@ -41,14 +48,11 @@ class GoogleLensSerpApi(BaseSearchReq[GoogleLensResponse]):
             # Let's revert to a quick Litterbox upload Helper or check if we can reuse the one from ascii2d (if refactored) or just duplicate the simple requests post.
             # Let's verify what the old code did. Old code used Selenium to upload.
             
-            # For now, let's implement a quick temp host uploader here or use a common utility.
-            # Better: Use the same Litterbox logic.
-            url = self._upload_to_litterbox(file)
+            # Use the shared Litterbox upload from BaseSearchReq.
+            url = await self._upload_image(file)
             params["url"] = url
         
-        # Requests is blocking, wrap in thread if needed, but for now simple sync should be fine or use run_in_executor
-        import asyncio
-        data = await asyncio.to_thread(self._fetch_serpapi, params)
+        data = await self._fetch_serpapi(params)
         
         # Parse logic
         # We need to convert SerpApi JSON to GoogleLensResponse
@@ -57,33 +61,25 @@ class GoogleLensSerpApi(BaseSearchReq[GoogleLensResponse]):
         # BUT since we have JSON, we might need to adapt the parser or return a mock RESP object with JSON string.
         
         return GoogleLensResponse(
-            resp_data=json.dumps(data), 
+            resp_data=data,
             resp_url=f"https://serpapi.com/search?engine={self.engine}", 
             status_code=200, 
             headers={},
             **kwargs
         )
 
-    def _fetch_serpapi(self, params):
-        resp = requests.get("https://serpapi.com/search", params=params)
-        resp.raise_for_status()
+    async def _fetch_serpapi(self, params):
+        resp = await self._send_request("get", params=params)
+        if resp.status_code >= 400:
+            raise RuntimeError(f"SerpApi HTTP {resp.status_code}: {resp.text[:100]}")
         return resp.json()
 
-    def _upload_to_litterbox(self, file: bytes) -> str:
-        # Simple upload implementation
-        files = {'fileToUpload': ('image.jpg', file, 'image/jpeg')}
-        data = {'reqtype': 'fileupload', 'time': '1h'}
-        resp = requests.post("https://litterbox.catbox.moe/resources/internals/api.php", files=files, data=data, timeout=30)
-        resp.raise_for_status()
-        url = resp.text
-        if not url.startswith("http"):
-            raise Exception(f"Upload failed: {url}")
-        return url
-
 
 class GoogleLensZenserp(BaseSearchReq[GoogleLensResponse]):
-    def __init__(self, api_key: str, **kwargs: Any):
-        super().__init__("https://app.zenserp.com/api/v2/search")
+    retry_policy = NO_RETRY
+
+    def __init__(self, api_key: str, **request_kwargs: Any):
+        super().__init__("https://app.zenserp.com/api/v2/search", **request_kwargs)
         self.api_key = api_key
 
     @override
@@ -101,39 +97,31 @@ class GoogleLensZenserp(BaseSearchReq[GoogleLensResponse]):
         if url:
             params["image_url"] = url
         elif file:
-            url = self._upload_to_litterbox(file)
+            url = await self._upload_image(file)
             params["image_url"] = url
             
-        import asyncio
-        data = await asyncio.to_thread(self._fetch_zenserp, headers, params)
+        data = await self._fetch_zenserp(headers, params)
         
         return GoogleLensResponse(
-            resp_data=json.dumps(data), 
+            resp_data=data,
             resp_url="https://app.zenserp.com/api/v2/search", 
             status_code=200, 
             headers={},
             **kwargs
         )
         
-    def _fetch_zenserp(self, headers, params):
-        resp = requests.get("https://app.zenserp.com/api/v2/search", headers=headers, params=params)
-        resp.raise_for_status()
+    async def _fetch_zenserp(self, headers, params):
+        resp = await self._send_request("get", headers=headers, params=params)
+        if resp.status_code >= 400:
+            raise RuntimeError(f"Zenserp HTTP {resp.status_code}: {resp.text[:100]}")
         return resp.json()
 
-    def _upload_to_litterbox(self, file: bytes) -> str:
-        files = {'fileToUpload': ('image.jpg', file, 'image/jpeg')}
-        data = {'reqtype': 'fileupload', 'time': '1h'}
-        resp = requests.post("https://litterbox.catbox.moe/resources/internals/api.php", files=files, data=data, timeout=30)
-        resp.raise_for_status()
-        url = resp.text
-        if not url.startswith("http"):
-             raise Exception(f"Upload failed: {url}")
-        return url
-
 
 class GoogleLens(BaseSearchReq[GoogleLensResponse]):
     def __init__(self, **kwargs: Any):
-        super().__init__("https://google.com")
+        # 客户端、传输层等网络配置与子引擎共享
+        request_kwargs = {k: v for k, v in kwargs.items() if k not in GOOGLE_LENS_PARAMS}
+        super().__init__("https://google.com", **request_kwargs)
         self.api_keys = kwargs.get("api_keys", {})
         self.serpapi_key = self.api_keys.get("serpapi") or kwargs.get("serpapi_key")
         self.zenserp_key = self.api_keys.get("zenserp") or kwargs.get("zenserp_key")
@@ -142,11 +130,11 @@ class GoogleLens(BaseSearchReq[GoogleLensResponse]):
         self.backup = None
         
         if self.serpapi_key:
-            self.primary = GoogleLensSerpApi(self.serpapi_key, **kwargs)
+            self.primary = GoogleLensSerpApi(self.serpapi_key, **request_kwargs)
             logger.info("[GoogleLens] Primary Engine: SerpApi (Google Lens)")
         
         if self.zenserp_key:
-            self.backup = GoogleLensZenserp(self.zenserp_key, **kwargs)
+            self.backup = GoogleLensZenserp(self.zenserp_key, **request_kwargs)
             logger.info("[GoogleLens] Backup Engine: Zenserp (Google Reverse Image)")
             
         if not self.primary and not self.backup:
@@ -155,21 +143,11 @@ class GoogleLens(BaseSearchReq[GoogleLensResponse]):
     @override
     async def search(self, file: Optional[bytes] = None, url: Optional[str] = None, **kwargs: Any) -> GoogleLensResponse:
         # Strategy: Primary -> Retry(Connection) -> Backup
-        import asyncio
         
         # 1. Try Primary (if available)
         if self.primary:
              try:
                  return await self._try_search(self.primary, file, url, **kwargs)
-             except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.ChunkedEncodingError) as e:
-                 logger.warning(f"[GoogleLens] Primary Connection Error: {e}. Retrying once...")
-                 try:
-                     # Simple retry delay
-                     await asyncio.sleep(1)
-                     return await self._try_search(self.primary, file, url, **kwargs)
-                 except Exception as retry_e:
-                     logger.error(f"[GoogleLens] Primary Retry Failed: {retry_e}")
-                     # Proceed to fallback
              except Exception as e:
                  logger.error(f"[GoogleLens] Primary Engine Failed: {e}")
                  # Proceed to fallback
@@ -31,6 +31,7 @@ class Iqdb(BaseSearchReq[IqdbResponse]):
         url: Optional[str] = None,
         file: FileContent = None,
         force_gray: bool = False,
+        image_size: Optional[tuple[int, int]] = None,
         **kwargs: Any,
     ) -> IqdbResponse:
         data = {}
@@ -53,13 +54,16 @@ class Iqdb(BaseSearchReq[IqdbResponse]):
             if len(file_content) > 8192 * 1024:
                 raise ValueError("IQDB limit: File size must be under 8192 KB")
             
-            try:
-                img = Image.open(io.BytesIO(file_content))
-                w, h = img.size
+            # 调用方已读取过尺寸时（image_size）不再打开图像
+            if image_size is None:
+                try:
+                    image_size = Image.open(io.BytesIO(file_content)).size
+                except Exception:
+                    pass # Ignore if not an image or PIL fails, let IQDB handle it
+            if image_size is not None:
+                w, h = image_size
                 if w > 7500 or h > 7500:
                     raise ValueError(f"IQDB limit: Image dimensions ({w}x{h}) exceed 7500x7500")
-            except Exception:
-                pass # Ignore if not an image or PIL fails, let IQDB handle it
                 
             files = {"file": (filename, file_content, "image/jpeg")}
         else:
@@ -76,7 +80,7 @@ class Iqdb(BaseSearchReq[IqdbResponse]):
         # Debug: Dump HTML
         try:
              # Basic check: if "No relevant matches" in text
-             if "No relevant matches" in resp.text and "Best match" not in resp.text:
+             if b"No relevant matches" in resp.content and b"Best match" not in resp.content:
                  pass # normal no match
              else:
                  # Dumping for analysis regardless, or maybe just when suspicious?
@@ -84,9 +88,9 @@ class Iqdb(BaseSearchReq[IqdbResponse]):
                  # Let's dump always for now to a rolling file
                  save_dir = Path("data/plugins/img_rev_searcher/debug")
                  save_dir.mkdir(parents=True, exist_ok=True)
-                 with open(save_dir / f"iqdb_dump_{int(time.time())}.html", "w", encoding="utf-8") as f:
-                     f.write(resp.text)
+                 with open(save_dir / f"iqdb_dump_{int(time.time())}.html", "wb") as f:
+                     f.write(resp.content)
         except Exception:
              pass
 
-        return IqdbResponse(resp.text, resp.url)
+        return IqdbResponse(resp.content, resp.url, top_k=kwargs.get("top_k"))
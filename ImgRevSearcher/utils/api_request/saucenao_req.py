@@ -1,4 +1,3 @@
-from json import loads as json_loads
 from pathlib import Path
 from typing import Any, Optional, Union
 from httpx import QueryParams
@@ -6,6 +5,10 @@ from typing_extensions import override
 from ..response_parser import SauceNAOResponse
 from ..ext_tools import read_file
 from .base_req import BaseSearchReq
+from ..retry import RETRYABLE_STATUSES, RetryPolicy
+
+# 429 表示搜索额度已用尽，重试只会继续消耗额度且仍然失败
+QUOTA_RETRY_POLICY = RetryPolicy(retry_statuses=RETRYABLE_STATUSES - {429})
 
 
 class SauceNAO(BaseSearchReq[SauceNAOResponse]):
@@ -14,6 +17,7 @@ class SauceNAO(BaseSearchReq[SauceNAOResponse]):
     
     用于与SauceNAO图像搜索API交互，支持多种搜索参数配置
     """
+    retry_policy = QUOTA_RETRY_POLICY
     
     def __init__(
         self,
@@ -82,7 +86,7 @@ class SauceNAO(BaseSearchReq[SauceNAOResponse]):
         参数:
             url: 图像URL
             file: 本地文件内容
-            **kwargs: 其他搜索参数
+            **kwargs: 其他搜索参数，top_k 为最多解析的结果数
             
         返回:
             SauceNAOResponse: 搜索响应对象
@@ -103,6 +107,6 @@ class SauceNAO(BaseSearchReq[SauceNAOResponse]):
             params=params,
             files=files,
         )
-        resp_json = json_loads(resp.text)
+        resp_json = resp.json()
         resp_json.update({"status_code": resp.status_code})
-        return SauceNAOResponse(resp_json, resp.url)
+        return SauceNAOResponse(resp_json, resp.url, top_k=kwargs.get("top_k"))
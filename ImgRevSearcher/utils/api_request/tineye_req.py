@@ -1,11 +1,13 @@
-from json import loads as json_loads
+import asyncio
 from pathlib import Path
 from typing import Any, Optional, Union
 from typing_extensions import override
 from ..response_parser import TineyeResponse
 from ..types import DomainInfo
 from ..ext_tools import deep_get, read_file
+from ..enrich import ENRICH_FULL, ENRICH_NONE, await_follow_up
 from .base_req import BaseSearchReq
+from ..retry import NO_RETRY
 
 
 class Tineye(BaseSearchReq[TineyeResponse]):
@@ -14,6 +16,8 @@ class Tineye(BaseSearchReq[TineyeResponse]):
     
     用于与TinEye反向图像搜索服务交互，支持分页浏览和按域名过滤等功能
     """
+    # 域名统计只是附加信息，失败时不重试
+    stage_policies = {"domains": NO_RETRY}
     
     def __init__(self, base_url: str = "https://tineye.com", **request_kwargs: Any):
         """
@@ -35,8 +39,10 @@ class Tineye(BaseSearchReq[TineyeResponse]):
         返回:
             list[DomainInfo]: 域名信息列表
         """
-        resp = await self._send_request(method="get", endpoint=f"api/v1/search/get_domains/{query_hash}")
-        resp_json = json_loads(resp.text)
+        resp = await self._send_request(
+            method="get", endpoint=f"api/v1/search/get_domains/{query_hash}", stage="domains"
+        )
+        resp_json = resp.json()
         return [DomainInfo.from_raw_data(domain_data) for domain_data in resp_json.get("domains", [])]
 
     async def _navigate_page(self, resp: TineyeResponse, offset: int) -> Optional[TineyeResponse]:
@@ -57,13 +63,14 @@ class Tineye(BaseSearchReq[TineyeResponse]):
             f"page={resp.page_number}", f"page={next_page_number}"
         )
         _resp = await self._send_request(method="get", url=api_url)
-        resp_json = json_loads(_resp.text)
+        resp_json = _resp.json()
         resp_json.update({"status_code": _resp.status_code})
         return TineyeResponse(
             resp_json,
             _resp.url,
             resp.domains,
             next_page_number,
+            top_k=resp.top_k,
         )
 
     async def pre_page(self, resp: TineyeResponse) -> Optional[TineyeResponse]:
@@ -100,6 +107,7 @@ class Tineye(BaseSearchReq[TineyeResponse]):
         sort: str = "score",
         order: str = "desc",
         tags: str = "",
+        enrich_level: str = ENRICH_FULL,
         **kwargs: Any,
     ) -> TineyeResponse:
         """
@@ -113,7 +121,8 @@ class Tineye(BaseSearchReq[TineyeResponse]):
             sort: 结果排序方式，可选值包括"score"、"size"、"date"等
             order: 排序顺序，可选值为"asc"或"desc"
             tags: 按标签过滤结果
-            **kwargs: 其他搜索参数
+            enrich_level: 附加信息级别，none 不请求域名统计，basic/full 与结果解析并行请求（basic 最多等待数秒）
+            **kwargs: 其他搜索参数，top_k 为最多解析的结果数
             
         返回:
             TineyeResponse: 搜索响应对象
@@ -143,12 +152,23 @@ class Tineye(BaseSearchReq[TineyeResponse]):
             data=params,
             files=files,
         )
-        resp_json = json_loads(resp.text)
+        resp_json = resp.json()
         resp_json["status_code"] = resp.status_code
         _url = resp.url
-        domains = []
+        domains_task = None
         if query_hash := deep_get(resp_json, "query.key"):
             query_string = "&".join(f"{k}={v}" for k, v in params.items())
             _url = f"{self.base_url}/search/{query_hash}?{query_string}"
-            domains = await self._get_domains(resp_json["query"]["hash"])
-        return TineyeResponse(resp_json, _url, domains)
+            if enrich_level != ENRICH_NONE:
+                # 域名统计与结果解析并行，不阻塞主结果
+                domains_task = asyncio.create_task(self._get_domains(resp_json["query"]["hash"]))
+                await asyncio.sleep(0)
+        try:
+            response = TineyeResponse(resp_json, _url, [], top_k=kwargs.get("top_k"))
+        except Exception:
+            if domains_task is not None:
+                domains_task.cancel()
+            raise
+        if domains_task is not None:
+            response.domains = await await_follow_up(domains_task, enrich_level, "TinEye 域名统计") or []
+        return response
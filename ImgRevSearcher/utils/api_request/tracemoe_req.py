@@ -1,4 +1,3 @@
-import json
 from typing import Any, Optional, Union, Dict
 from typing_extensions import override
 
@@ -6,10 +5,42 @@ from ..types import FileContent
 from ..ext_tools import read_file
 from ..response_parser.tracemoe_parser import TraceMoeResponse
 from .base_req import BaseSearchReq
+from ..retry import RetryPolicy
+from ..anilist_cache import AniListCache
+from ..enrich import ENRICH_FULL, ENRICH_NONE, await_follow_up
 from astrbot.api import logger
+import asyncio
 import time
 from pathlib import Path
 
+ANILIST_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+# 默认获取元数据的番剧数；批量查询一次请求即可覆盖，上限为 AniList 单页上限
+DEFAULT_ANILIST_IDS = 10
+MAX_ANILIST_IDS = 50
+
+ANIME_BATCH_QUERY = """
+query ($ids: [Int], $perPage: Int) {
+  Page (perPage: $perPage) {
+    media (id_in: $ids, type: ANIME) {
+      id
+      title {
+        native
+        romaji
+        english
+      }
+      coverImage {
+        large
+      }
+      isAdult
+    }
+  }
+}
+"""
+
 ANIME_INFO_QUERY = """
 query ($id: Int) {
   Media (id: $id, type: ANIME) {
@@ -31,23 +62,30 @@ class TraceMoe(BaseSearchReq[TraceMoeResponse]):
     """
     TraceMoe 搜索请求类
     """
+    # AniList 限流时 Retry-After 通常较长，附加信息不值得长时间等待
+    stage_policies = {"anilist": RetryPolicy(max_attempts=2, max_retry_after=3)}
+
     def __init__(
         self,
         base_url: str = "https://api.trace.moe",
         anilist_url: str = "https://graphql.anilist.co", # Use official endpoint
         api_key: Optional[str] = None,
+        anilist_cache: Optional[AniListCache] = None,
         **request_kwargs: Any,
     ):
         base_url = f"{base_url}/search"
         super().__init__(base_url, **request_kwargs)
         self.anilist_url = anilist_url
         self.api_key = api_key
+        self.anilist_cache = anilist_cache
 
     @override
     async def search(
         self,
         url: Optional[str] = None,
         file: FileContent = None,
+        enrich_level: str = ENRICH_FULL,
+        anilist_max_ids: int = DEFAULT_ANILIST_IDS,
         **kwargs: Any,
     ) -> TraceMoeResponse:
         params = {}
@@ -78,85 +116,179 @@ class TraceMoe(BaseSearchReq[TraceMoeResponse]):
         )
 
         try:
-            data = json.loads(resp.text)
+            data = resp.json()
         except Exception as e:
             logger.warning(f"[TraceMoe] JSON parse failed: {e}. Text: {resp.text}")
-            return TraceMoeResponse(resp.text, resp.url)
+            return TraceMoeResponse({}, resp.url)
 
-        # 2. 获取元数据 (Anilist)
-        # 收集所有 Anilist ID
+        # 2. 获取元数据 (Anilist)；basic 级别超时后查询继续在后台完成并写入缓存，下次搜索即可命中
         results = data.get("result", [])
-        if results:
-            seen_ids = set()
-            for item in results:
-                aid = item.get("anilist")
-                if aid and aid not in seen_ids:
-                    seen_ids.add(aid)
-                    # 限制请求数，防止过多 (前3个通常够了)
-                    if len(seen_ids) >= 3: 
-                        break
-            
-            # 并发请求获取信息
-            # 注意: self._send_request 是 async 的，这里简单循环 loop (或者 gather)
-            # TraceMoe 的 GraphQL 似乎不支持批量 ID? query 是 ($id: Int) 单个
-            
-            # 使用简单的循环，可能会慢一点，但安全
-            # 稍作优化: 缓存已获取的 info
-            fetched_info = {}
-            for aid in seen_ids:
-                gql_resp = None
-                try:
-                    variables = {"id": aid}
-                    gql_resp = await self._send_request(
-                        method="post",
-                        url=self.anilist_url,
-                        json={"query": ANIME_INFO_QUERY, "variables": variables},
-                        headers={
-                            "Content-Type": "application/json",
-                            "Accept": "application/json",
-                            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                        }
-                    )
-                    
-                    try:
-                        gql_data = json.loads(gql_resp.text)
-                    except Exception as e:
-                        logger.warning(f"[TraceMoe] Anilist JSON parse failed: {e}")
-                        continue
-                    
-                    if "errors" in gql_data:
-                        logger.warning(f"[TraceMoe] Anilist API returned errors for {aid}: {gql_data['errors']}")
-                        # Trigger debug dump
-                        raise Exception(f"API Error: {gql_data['errors']}")
-
-                    media = gql_data.get("data", {}).get("Media")
-                    if media:
-                        logger.info(f"[TraceMoe] Successfully fetched info for {aid}: {media.get('title', {}).get('native', 'Unknown')}")
-                        fetched_info[aid] = media
-                    else:
-                        logger.warning(f"[TraceMoe] Media data is empty for {aid}")
-
-                except Exception as e:
-                    logger.warning(f"[TraceMoe] Failed to fetch Anilist info for {aid}: {e}")
-                    if gql_resp:
-                        try:
-                             save_dir = Path("data/plugins/img_rev_searcher/debug")
-                             save_dir.mkdir(parents=True, exist_ok=True)
-                             dump_path = save_dir / f"tracemoe_anilist_dump_{aid}_{int(time.time())}.json"
-                             with open(dump_path, "w", encoding="utf-8") as f:
-                                 f.write(gql_resp.text)
-                             logger.info(f"[TraceMoe] Dumped Anilist debug JSON to: {dump_path.absolute()}")
-                        except Exception:
-                             pass
-                    continue
-            
+        if results and enrich_level != ENRICH_NONE:
+            anilist_ids = self._collect_anilist_ids(results, anilist_max_ids)
+            fetched_info = await await_follow_up(
+                self._fetch_anime_info(anilist_ids),
+                enrich_level,
+                "TraceMoe AniList 信息",
+                keep_running=self.anilist_cache is not None,
+            ) or {}
+
             # 3. 注入信息到 data
             for item in results:
                 aid = item.get("anilist")
                 if aid in fetched_info:
                     item["_anime_info"] = fetched_info[aid]
-        
-        # 重新序列化为 JSON 供 Parser 使用
-        new_resp_text = json.dumps(data)
-        
-        return TraceMoeResponse(new_resp_text, resp.url)
+
+        # 直接将解析后的数据交给 Parser，无需重新序列化
+        return TraceMoeResponse(data, resp.url)
+
+    @staticmethod
+    def _collect_anilist_ids(results: list[dict[str, Any]], limit: int) -> list[int]:
+        """
+        按结果顺序收集去重后的 AniList ID
+
+        参数:
+            results: TraceMoe 搜索结果
+            limit: 最多收集的ID数
+
+        返回:
+            list[int]: AniList ID 列表
+        """
+        limit = max(0, min(int(limit), MAX_ANILIST_IDS))
+        ids: list[int] = []
+        for item in results:
+            if len(ids) >= limit:
+                break
+            aid = item.get("anilist")
+            if aid and aid not in ids:
+                ids.append(aid)
+        return ids
+
+    async def _fetch_anime_info(self, anilist_ids: list[int]) -> Dict[int, dict]:
+        """
+        获取番剧元数据：先查缓存，未命中的部分再向 AniList 查询并写回缓存
+
+        参数:
+            anilist_ids: AniList ID 列表
+
+        返回:
+            Dict[int, dict]: AniList ID 到元数据的映射
+        """
+        if not anilist_ids:
+            return {}
+        if self.anilist_cache is None:
+            return await self._query_anilist(anilist_ids)
+        try:
+            cached = await self.anilist_cache.get_many(anilist_ids)
+        except Exception as e:
+            logger.warning(f"[TraceMoe] Anilist cache read failed: {e}")
+            cached = {}
+        missing = [aid for aid in anilist_ids if aid not in cached]
+        if not missing:
+            return cached
+        fetched = await self._query_anilist(missing)
+        if fetched:
+            try:
+                await self.anilist_cache.put_many(fetched)
+            except Exception as e:
+                logger.warning(f"[TraceMoe] Anilist cache write failed: {e}")
+        return {**cached, **fetched}
+
+    async def _query_anilist(self, anilist_ids: list[int]) -> Dict[int, dict]:
+        """
+        向 AniList 查询番剧元数据：优先使用一次批量查询，失败时并发逐个查询
+
+        参数:
+            anilist_ids: AniList ID 列表
+
+        返回:
+            Dict[int, dict]: AniList ID 到元数据的映射
+        """
+        try:
+            return await self._fetch_anime_batch(anilist_ids)
+        except Exception as e:
+            logger.warning(f"[TraceMoe] Anilist batch query failed, falling back to per-ID queries: {e}")
+        infos = await asyncio.gather(*(self._fetch_anime_single(aid) for aid in anilist_ids))
+        return {aid: info for aid, info in zip(anilist_ids, infos) if info}
+
+    async def _fetch_anime_batch(self, anilist_ids: list[int]) -> Dict[int, dict]:
+        """
+        通过 Page(media(id_in)) 一次查询多个番剧的元数据
+
+        参数:
+            anilist_ids: AniList ID 列表
+
+        返回:
+            Dict[int, dict]: AniList ID 到元数据的映射
+
+        异常:
+            Exception: 请求失败或 AniList 返回错误时抛出
+        """
+        gql_resp = await self._send_request(
+            method="post",
+            url=self.anilist_url,
+            stage="anilist",
+            json={"query": ANIME_BATCH_QUERY, "variables": {"ids": anilist_ids, "perPage": len(anilist_ids)}},
+            headers=ANILIST_HEADERS,
+        )
+        if gql_resp.status_code == 429:
+            # 已被限流时逐个查询只会更糟，直接放弃本次元数据
+            logger.warning("[TraceMoe] Anilist rate limited, skipping metadata")
+            return {}
+        gql_data = gql_resp.json()
+        if gql_data.get("errors"):
+            raise Exception(f"API Error: {gql_data['errors']}")
+        media_list = ((gql_data.get("data") or {}).get("Page") or {}).get("media") or []
+        fetched_info = {media["id"]: media for media in media_list if media and media.get("id")}
+        logger.info(f"[TraceMoe] Fetched Anilist info for {len(fetched_info)}/{len(anilist_ids)} titles in one query")
+        return fetched_info
+
+    async def _fetch_anime_single(self, aid: int) -> Optional[dict]:
+        """
+        查询单个番剧的元数据（批量查询失败时使用）
+
+        参数:
+            aid: AniList ID
+
+        返回:
+            Optional[dict]: 元数据，失败时返回None
+        """
+        gql_resp = None
+        try:
+            gql_resp = await self._send_request(
+                method="post",
+                url=self.anilist_url,
+                stage="anilist",
+                json={"query": ANIME_INFO_QUERY, "variables": {"id": aid}},
+                headers=ANILIST_HEADERS,
+            )
+
+            try:
+                gql_data = gql_resp.json()
+            except Exception as e:
+                logger.warning(f"[TraceMoe] Anilist JSON parse failed: {e}")
+                return None
+
+            if "errors" in gql_data:
+                logger.warning(f"[TraceMoe] Anilist API returned errors for {aid}: {gql_data['errors']}")
+                # Trigger debug dump
+                raise Exception(f"API Error: {gql_data['errors']}")
+
+            media = gql_data.get("data", {}).get("Media")
+            if media:
+                logger.info(f"[TraceMoe] Successfully fetched info for {aid}: {media.get('title', {}).get('native', 'Unknown')}")
+                return media
+            logger.warning(f"[TraceMoe] Media data is empty for {aid}")
+
+        except Exception as e:
+            logger.warning(f"[TraceMoe] Failed to fetch Anilist info for {aid}: {e}")
+            if gql_resp:
+                try:
+                     save_dir = Path("data/plugins/img_rev_searcher/debug")
+                     save_dir.mkdir(parents=True, exist_ok=True)
+                     dump_path = save_dir / f"tracemoe_anilist_dump_{aid}_{int(time.time())}.json"
+                     with open(dump_path, "w", encoding="utf-8") as f:
+                         f.write(gql_resp.text)
+                     logger.info(f"[TraceMoe] Dumped Anilist debug JSON to: {dump_path.absolute()}")
+                except Exception:
+                     pass
+        return None
@@ -4,7 +4,10 @@ from typing_extensions import override
 from ..types import FileContent
 from ..ext_tools import read_file
 from ..response_parser.yandex_parser import YandexResponse
+from ..cpu_tasks import parse_response
+from ..executors import run_cpu
 from .base_req import BaseSearchReq
+from astrbot.api import logger
 
 class Yandex(BaseSearchReq[YandexResponse]):
     """
@@ -23,42 +26,21 @@ class Yandex(BaseSearchReq[YandexResponse]):
         
         super().__init__(base_url, **request_kwargs)
 
-    # ... (skipping search logic which is unchanged) ...
-
     @override
     async def _send_request(self, *args, **kwargs) -> Any:
+        """
+        发送请求；重试策略用尽后仍失败时，切换到 yandex.ru 镜像再请求一次
+        """
         try:
             return await super()._send_request(*args, **kwargs)
-        except Exception as e:
-            # Simple fallback mechanism: replace .com with .ru in url
-            if self.use_ru_fallback and "yandex.com" in self.base_url:
-                # Update base_url for future calls logic (though search logic uses manual URLs mostly)
-                # Currently 'search' override mostly constructs URLs manually unless we refactor it.
-                # The 'search' method constructs: https://yandex.com/images/search...
-                # If _send_request fails, it's because 'search' calls it.
-                # However, 'search' constructs URL outside of _send_request if using 'url' param override.
-                
-                # Check if we are retrying a URL passed in args/kwargs
-                # If we are here, super()._send_request failed.
-                
-                # We need to detect if we can swap .com to .ru in the params/url
-                
-                retry_needed = False
-                
-                # 1. Update self.base_url just in case
-                if "yandex.com" in self.base_url:
-                    self.base_url = self.base_url.replace("yandex.com", "yandex.ru")
-                    retry_needed = True
-
-                # 2. Update kwargs['url'] if present (this is what search uses)
-                if "url" in kwargs and "yandex.com" in kwargs["url"]:
-                    kwargs["url"] = kwargs["url"].replace("yandex.com", "yandex.ru")
-                    retry_needed = True
-                    
-                if retry_needed:
-                     return await super()._send_request(*args, **kwargs)
-            
-            raise e
+        except Exception:
+            if not (self.use_ru_fallback and "yandex.com" in self.base_url) or kwargs.get("stage") == "upload":
+                raise
+            self.base_url = self.base_url.replace("yandex.com", "yandex.ru")
+            if "yandex.com" in kwargs.get("url", ""):
+                kwargs["url"] = kwargs["url"].replace("yandex.com", "yandex.ru")
+            logger.warning("[Yandex] yandex.com 请求失败，切换到 yandex.ru")
+            return await super()._send_request(*args, **kwargs)
 
     @override
     async def search(
@@ -79,7 +61,7 @@ class Yandex(BaseSearchReq[YandexResponse]):
                 from ..ext_tools import read_file
                 file_bytes = read_file(file)
             
-            target_url = self._upload_to_litterbox(file_bytes)
+            target_url = await self._upload_image(file_bytes)
         
         if not target_url:
              raise ValueError("Must provide url or file")
@@ -97,7 +79,7 @@ class Yandex(BaseSearchReq[YandexResponse]):
              "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         }
         
-        # We use Requests directly or via _send_request (which uses self.session/requests)
+        # We use _send_request (shared transport with retry policy)
         # BaseReq _send_request logic:
         # return await self.get(request_url, **kwargs)
         # We need to mix in our headers.
@@ -118,31 +100,4 @@ class Yandex(BaseSearchReq[YandexResponse]):
             timeout=30
         )
 
-        return YandexResponse(resp.text, resp.url, **kwargs)
-
-    def _upload_to_litterbox(self, file: bytes) -> str:
-        import requests
-        # Simple upload implementation
-        files = {'fileToUpload': ('image.jpg', file, 'image/jpeg')}
-        data = {'reqtype': 'fileupload', 'time': '1h'}
-        resp = requests.post("https://litterbox.catbox.moe/resources/internals/api.php", files=files, data=data, timeout=30)
-        resp.raise_for_status()
-        url = resp.text
-        if not url.startswith("http"):
-            raise Exception(f"Upload failed: {url}")
-        return url
-
-    @override
-    async def _send_request(self, *args, **kwargs) -> Any:
-        try:
-            return await super()._send_request(*args, **kwargs)
-        except Exception as e:
-            # Simple fallback mechanism: replace .com with .ru in url
-            if "yandex.com" in self.base_url:
-                self.base_url = self.base_url.replace("yandex.com", "yandex.ru")
-                # Retry
-                # Note: 'url' in kwargs might also need replacing if it was absolute
-                if "url" in kwargs and "yandex.com" in kwargs["url"]:
-                    kwargs["url"] = kwargs["url"].replace("yandex.com", "yandex.ru")
-                return await super()._send_request(*args, **kwargs)
-            raise e
+        return await run_cpu(parse_response, YandexResponse, resp.content, resp.url, kwargs)
@@ -0,0 +1,513 @@
+import io
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps, ImageStat
+from .ext_tools import json_loads
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 纯CPU任务集合：输入输出均为 bytes / str 等轻量对象，可直接在进程池中执行
+
+BASE_DIR = Path(__file__).parent.parent
+FONT_PATH = BASE_DIR / "resource/font/arialuni.ttf"
+TRANSLATIONS_PATH = BASE_DIR / "resource/translations/ehviewer_translations.json"
+# 结果图中源图像的最大宽度
+PREVIEW_WIDTH = 800
+
+
+@lru_cache(maxsize=8)
+def load_font(size: int) -> Any:
+    """
+    加载指定字号的字体（进程内缓存）
+
+    参数:
+        size: 字号
+
+    返回:
+        Any: 字体对象，字体文件不存在时返回默认字体
+    """
+    try:
+        return ImageFont.truetype(str(FONT_PATH), size)
+    except IOError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=4)
+def load_translations(path: str = str(TRANSLATIONS_PATH)) -> dict:
+    """
+    加载E-Hentai标签翻译文件（进程内缓存）
+
+    参数:
+        path: 翻译文件路径
+
+    返回:
+        dict: 翻译字典，读取失败时返回空字典
+    """
+    try:
+        return json_loads(Path(path).read_bytes())
+    except Exception:
+        return {}
+
+
+def warm_worker() -> None:
+    """
+    进程池工作进程初始化：预加载字体与翻译文件
+    """
+    for size in (16, 18, 24):
+        load_font(size)
+    load_translations()
+
+
+def _text_width(font: Any, text: str) -> int:
+    if hasattr(font, "getbbox"):
+        return font.getbbox(text)[2]
+    return font.getsize(text)[0]
+
+
+def _encode_jpeg(img: Image.Image, quality: int = 85) -> bytes:
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+
+def draw_results(api: str, result: str, source_image: Optional[Image.Image] = None) -> Image.Image:
+    """
+    绘制搜索结果图像
+
+    将文本搜索结果渲染为图像，可选包含源图像
+
+    参数:
+        api: 搜索引擎API名称
+        result: 搜索结果文本
+        source_image: 源图像（可选）
+
+    返回:
+        Image.Image: 渲染后的结果图像
+    """
+    margin = 20
+    lines = result.split('\n')
+    font = load_font(18)
+    title_font = load_font(24)
+    title_text = f"{api.upper()} 搜索结果"
+    title_width = _text_width(title_font, title_text) + margin * 2
+    max_text_width = 0
+    for line in lines:
+        max_text_width = max(max_text_width, _text_width(font, line) + margin * 2)
+    source_img_height = 0
+    source_img_width = 0
+    if source_image:
+        orig_width, orig_height = source_image.size
+        if orig_width > PREVIEW_WIDTH:
+            ratio = PREVIEW_WIDTH / orig_width
+            source_img_width = PREVIEW_WIDTH
+            source_img_height = int(orig_height * ratio)
+            source_image = source_image.resize((source_img_width, source_img_height), Image.LANCZOS)
+        else:
+            source_img_width = orig_width
+            source_img_height = orig_height
+    width = max(800, title_width, max_text_width, source_img_width + margin * 2)
+    if hasattr(font, "getbbox"):
+        line_height = max(25, font.getbbox("Ay")[3] + 7)
+    else:
+        line_height = max(25, font.getsize("Ay")[1] + 7)
+    header_height = 60
+    content_height = margin + line_height * len(lines)
+    source_area_height = source_img_height + margin * 2 if source_image else 0
+    total_height = header_height + content_height + source_area_height
+    img = Image.new('RGB', (width, total_height), color='white')
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([(0, 0), (width, header_height)], fill='#4a6ea9')
+    draw.text((margin, margin), title_text, font=title_font, fill='white')
+    y_offset = header_height
+    if source_image:
+        x_center = (width - source_img_width) // 2
+        img.paste(source_image, (x_center, y_offset + margin))
+        y_offset += source_img_height + margin * 2
+        draw.line([(margin, y_offset - margin // 2), (width - margin, y_offset - margin // 2)], fill='#cccccc', width=2)
+    y_position = y_offset
+    for line in lines:
+        if line.startswith('='):
+            draw.line([(margin, y_position), (width - margin, y_position)], fill='#cccccc', width=1)
+        else:
+            draw.text((margin, y_position), line, font=font, fill='black')
+        y_position += line_height
+    return img
+
+
+def draw_error(api: str, error_msg: str) -> Image.Image:
+    """
+    绘制错误信息图像
+
+    参数:
+        api: 搜索引擎API名称
+        error_msg: 错误消息文本
+
+    返回:
+        Image.Image: 渲染后的错误图像
+    """
+    width, height = 600, 200
+    img = Image.new('RGB', (width, height), color='white')
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([(0, 0), (width, 60)], fill='#e74c3c')
+    font = load_font(18)
+    title_font = load_font(24)
+    margin = 20
+    draw.text((margin, margin), f"{api.upper()} 搜索失败", font=title_font, fill='white')
+    draw.text((margin, 80), f"错误信息: {error_msg}", font=font, fill='black')
+    return img
+
+
+def render_results_jpeg(api: str, result: str, source_bytes: Optional[bytes] = None) -> bytes:
+    """
+    渲染搜索结果并编码为JPEG，渲染失败时返回错误图
+
+    参数:
+        api: 搜索引擎API名称
+        result: 搜索结果文本
+        source_bytes: 源图像数据（可选）
+
+    返回:
+        bytes: JPEG图像数据
+    """
+    try:
+        source_image = Image.open(io.BytesIO(source_bytes)) if source_bytes else None
+        result_img = draw_results(api, result, source_image)
+    except Exception as e:
+        result_img = draw_error(api, str(e))
+    return _encode_jpeg(result_img)
+
+
+def render_error_jpeg(api: str, error_msg: str) -> bytes:
+    """
+    渲染错误信息并编码为JPEG
+
+    参数:
+        api: 搜索引擎API名称
+        error_msg: 错误消息文本
+
+    返回:
+        bytes: JPEG图像数据
+    """
+    return _encode_jpeg(draw_error(api, error_msg))
+
+
+def render_engine_table(rows: list[tuple[str, str, bool, str]], theme: dict[str, tuple]) -> bytes:
+    """
+    绘制引擎介绍表格并编码为JPEG
+
+    参数:
+        rows: 表格行 (引擎名, 网址, 是否二次元专用, 关键词)
+        theme: 配色方案
+
+    返回:
+        bytes: JPEG图像数据
+    """
+    width = 1000
+    cell_height = 50
+    header_height = 60
+    title_height = 70
+    table_height = header_height + cell_height * len(rows)
+    height = title_height + table_height + 25
+    border_width = 2
+
+    def rounded_rectangle(draw, xy, radius, fill=None, outline=None, width=1):
+        x1, y1, x2, y2 = xy
+        diameter = 2 * radius
+        draw.rectangle([x1 + radius, y1, x2 - radius, y2], fill=fill, outline=outline, width=width)
+        draw.rectangle([x1, y1 + radius, x2, y2 - radius], fill=fill, outline=outline, width=width)
+        draw.pieslice([x1, y1, x1 + diameter, y1 + diameter], 180, 270, fill=fill, outline=outline, width=width)
+        draw.pieslice([x2 - diameter, y1, x2, y1 + diameter], 270, 360, fill=fill, outline=outline, width=width)
+        draw.pieslice([x1, y2 - diameter, x1 + diameter, y2], 90, 180, fill=fill, outline=outline, width=width)
+        draw.pieslice([x2 - diameter, y2 - diameter, x2, y2], 0, 90, fill=fill, outline=outline, width=width)
+
+    img = Image.new('RGB', (width, height), theme["bg"])
+    draw = ImageDraw.Draw(img)
+    title_font = load_font(24)
+    header_font = load_font(18)
+    body_font = load_font(16)
+    rounded_rectangle(draw, [20, 15, width - 20, title_height - 5], 10, fill=theme["header_bg"])
+    title = "可用搜索引擎"
+    title_width = draw.textlength(title, font=title_font) if hasattr(draw, 'textlength') else title_font.getsize(title)[0]
+    title_x = (width - title_width) // 2
+    draw.text((title_x, 25), title, font=title_font, fill=theme["header_text"])
+    table_x = 20
+    table_width = width - 40
+    col_widths = [int(table_width * 0.15), int(table_width * 0.40), int(table_width * 0.20), int(table_width * 0.25)]
+    table_y = title_height + 10
+    table_bottom = table_y + header_height + cell_height * len(rows)
+    draw.rectangle([table_x, table_y, table_x + sum(col_widths), table_y + header_height], fill=theme["table_header"])
+    y = table_y + header_height
+    for idx in range(len(rows)):
+        row_bg = theme["cell_bg_even"] if idx % 2 == 0 else theme["cell_bg_odd"]
+        draw.rectangle([table_x, y, table_x + sum(col_widths), y + cell_height], fill=row_bg)
+        y += cell_height
+    headers = ["引擎", "网址", "二次元图片专用", "关键词"]
+    x = table_x
+    for i, header in enumerate(headers):
+        text_width = draw.textlength(header, font=header_font) if hasattr(draw, 'textlength') else header_font.getsize(header)[0]
+        text_x = x + (col_widths[i] - text_width) // 2
+        draw.text((text_x, table_y + (header_height - 18) // 2), header, font=header_font, fill=theme["text"])
+        x += col_widths[i]
+    y = table_y + header_height
+    for engine, url, anime, keyword in rows:
+        x = table_x
+        draw.text((x + 15, y + (cell_height - 16) // 2), engine, font=body_font, fill=theme["text"])
+        x += col_widths[0]
+        draw.text((x + 15, y + (cell_height - 16) // 2), url, font=body_font, fill=theme["url"])
+        x += col_widths[1]
+        mark = "✓" if anime else "✗"
+        mark_color = theme["success"] if anime else theme["fail"]
+        mark_width = draw.textlength(mark, font=header_font) if hasattr(draw, 'textlength') else header_font.getsize(mark)[0]
+        draw.text((x + (col_widths[2] - mark_width) // 2, y + (cell_height - 18) // 2), mark, font=header_font, fill=mark_color)
+        x += col_widths[2]
+        draw.text((x + 15, y + (cell_height - 16) // 2), keyword, font=body_font, fill=theme["hint"])
+        y += cell_height
+    draw.rectangle([table_x, table_y, table_x + sum(col_widths), table_bottom], outline=theme["border"], width=border_width)
+    for i in range(1, len(rows) + 1):
+        line_y = table_y + header_height + cell_height * i
+        if i < len(rows):
+            draw.line([(table_x, line_y), (table_x + sum(col_widths), line_y)], fill=theme["border"], width=border_width)
+    draw.line([(table_x, table_y + header_height), (table_x + sum(col_widths), table_y + header_height)], fill=theme["border"], width=border_width)
+    col_x = table_x
+    for i in range(len(col_widths) - 1):
+        col_x += col_widths[i]
+        draw.line([(col_x, table_y), (col_x, table_bottom)], fill=theme["border"], width=border_width)
+    return _encode_jpeg(img)
+
+
+def _flatten_rgb(img: Image.Image) -> Image.Image:
+    """
+    转换为RGB，透明像素以白色背景合成（直接转换会变为黑色）
+    """
+    if img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, "white")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+# 动图提取出的单帧的JPEG质量（之后仍可能按上传配置再次压缩）
+FRAME_QUALITY = 92
+# 比较清晰度时将帧缩小到的最长边
+SHARPNESS_SIZE = 256
+_LAPLACIAN = ImageFilter.Kernel((3, 3), (0, 1, 0, 1, -4, 1, 0, 1, 0), scale=1, offset=128)
+
+
+def _sharpness(img: Image.Image) -> float:
+    """
+    清晰度：缩小后灰度图拉普拉斯响应的方差，模糊、淡入或纯色帧接近 0
+    """
+    gray = img.convert("L")
+    gray.thumbnail((SHARPNESS_SIZE, SHARPNESS_SIZE))
+    return ImageStat.Stat(gray.filter(_LAPLACIAN)).var[0]
+
+
+def extract_frame(data: bytes, scan_frames: int = 0) -> bytes:
+    """
+    从动图（GIF、动态 WebP、APNG）中提取单帧并编码为JPEG
+
+    只解码需要的帧：默认只解码第一帧；scan_frames 大于 1 时依次解码前 scan_frames 帧，
+    取其中最清晰的一帧（跳过淡入、模糊的开头），其余帧不会被解码
+
+    参数:
+        data: 原始图像数据
+        scan_frames: 参与比较的帧数，0 或 1 表示直接使用第一帧
+
+    返回:
+        bytes: JPEG数据，无法解码时返回原始数据
+    """
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.seek(0)
+        best = _flatten_rgb(img)
+        if scan_frames > 1:
+            best_score = _sharpness(best)
+            for index in range(1, scan_frames):
+                try:
+                    img.seek(index)
+                except EOFError:
+                    break
+                frame = _flatten_rgb(img)
+                score = _sharpness(frame)
+                if score > best_score:
+                    best, best_score = frame, score
+        return _encode_jpeg(best, FRAME_QUALITY)
+    except Exception:
+        return data
+
+
+def prepare_upload(data: bytes, max_side: int, quality: int = 90) -> bytes:
+    """
+    按上传配置预处理图像：取第一帧、按EXIF方向旋转、缩小到最长边不超过 max_side，去除元数据后编码为JPEG
+
+    JPEG 在解码时直接按 1/2、1/4、1/8 缩小（draft），其他格式先用整数倍 reduce 缩小，最后再精确缩放
+
+    参数:
+        data: 原始图像数据
+        max_side: 最长边上限(像素)，0 表示不缩小
+        quality: JPEG质量
+
+    返回:
+        bytes: 处理后的JPEG数据；无法解码，或原图尺寸符合要求且处理后反而更大时返回原始数据
+    """
+    try:
+        img = Image.open(io.BytesIO(data))
+        original_format = img.format
+        original_size = img.size
+        if max_side and max(img.size) > max_side:
+            scale = max_side / max(img.size)
+            img.draft("RGB", (round(img.width * scale), round(img.height * scale)))
+        img.seek(0)
+        img = _flatten_rgb(ImageOps.exif_transpose(img))
+        if max_side and max(img.size) > max_side:
+            factor = max(img.size) // max_side
+            if factor >= 2:
+                img = img.reduce(factor)
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+        output = _encode_jpeg(img, quality)
+    except Exception:
+        return data
+    fits = not max_side or max(original_size) <= max_side
+    if fits and original_format in ("JPEG", "PNG", "WEBP") and len(output) >= len(data):
+        return data
+    return output
+
+
+# 感知哈希: 灰度缩放到 PHASH_SIZE 见方后做二维DCT，取左上 HASH_SIZE 见方的低频系数与中位数比较得到64位哈希
+PHASH_SIZE = 32
+HASH_SIZE = 8
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+
+@lru_cache(maxsize=2)
+def _dct_matrix(size: int) -> Any:
+    """
+    生成正交 DCT-II 变换矩阵（进程内缓存）
+    """
+    n = np.arange(size)
+    matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+
+def _phash_image(img: Image.Image) -> bytes:
+    """
+    将图像缩放为 PHASH_SIZE 见方的灰度像素（透明像素按白色背景计算）
+    """
+    if img.mode not in ("L", "RGB"):
+        img = _flatten_rgb(img)
+    return img.convert("L").resize((PHASH_SIZE, PHASH_SIZE), Image.LANCZOS).tobytes()
+
+
+def _phash_pixels(data: bytes) -> Optional[bytes]:
+    """
+    解码图像并缩放为 PHASH_SIZE 见方的灰度像素，无法解码时返回None
+    """
+    try:
+        img = Image.open(io.BytesIO(data))
+        # JPEG 可在解码时直接缩小，避免解码整张大图
+        img.draft("L", (PHASH_SIZE * 2, PHASH_SIZE * 2))
+        return _phash_image(img)
+    except Exception:
+        return None
+
+
+def _phash_batch(pixels: list[bytes]) -> Any:
+    """
+    在一次批量矩阵乘法中计算多张灰度像素的感知哈希
+
+    返回:
+        numpy.ndarray: 形状为 (len(pixels), 8) 的 uint8 数组，每行为一个按大端序打包的64位哈希
+    """
+    batch = np.frombuffer(b"".join(pixels), dtype=np.uint8).reshape(-1, PHASH_SIZE, PHASH_SIZE).astype(np.float32)
+    dct = _dct_matrix(PHASH_SIZE)
+    low = (dct @ batch @ dct.T)[:, :HASH_SIZE, :HASH_SIZE].reshape(len(pixels), HASH_BITS)
+    return np.packbits(low > np.median(low, axis=1, keepdims=True), axis=1)
+
+
+def phash_values(images: list[Optional[bytes]]) -> list[Optional[int]]:
+    """
+    批量计算图像的64位感知哈希
+
+    参数:
+        images: 图像数据，None 表示没有图像
+
+    返回:
+        list[Optional[int]]: 与 images 一一对应的哈希值，图像无法解码时为None
+
+    异常:
+        RuntimeError: 未安装 numpy 时抛出
+    """
+    if np is None:
+        raise RuntimeError("感知哈希需要安装 numpy")
+    decoded = [_phash_pixels(data) if data else None for data in images]
+    pixels = [p for p in decoded if p is not None]
+    if not pixels:
+        return [None] * len(images)
+    hashes = iter(_phash_batch(pixels))
+    return [None if p is None else int.from_bytes(next(hashes).tobytes(), "big") for p in decoded]
+
+
+def image_variants(data: bytes, names: tuple[str, ...]) -> dict[str, Any]:
+    """
+    只解码一次，生成查询图像的多个派生版本
+
+    支持的版本:
+        jpeg: 第一帧重新编码的JPEG（用于上传GIF等引擎不支持的格式）
+        preview: 宽度不超过 PREVIEW_WIDTH 的JPEG，用于渲染结果图
+        phash: 64位感知哈希（需要安装 numpy）
+
+    参数:
+        data: 原始图像数据
+        names: 需要生成的版本
+
+    返回:
+        dict[str, Any]: 版本名到数据的映射，无法解码时 jpeg 为原始数据、其余为None
+    """
+    result: dict[str, Any] = dict.fromkeys(names)
+    try:
+        img = Image.open(io.BytesIO(data))
+        if "jpeg" not in names:
+            # 不需要原尺寸时让 JPEG 在解码时直接缩小
+            size = PREVIEW_WIDTH if "preview" in names else PHASH_SIZE * 2
+            img.draft("RGB", (size, size))
+        img.seek(0)
+        frame = _flatten_rgb(img)
+    except Exception:
+        if "jpeg" in names:
+            result["jpeg"] = data
+        return result
+    if "jpeg" in names:
+        result["jpeg"] = _encode_jpeg(frame)
+    if "preview" in names:
+        preview = frame
+        if frame.width > PREVIEW_WIDTH:
+            height = max(1, round(frame.height * PREVIEW_WIDTH / frame.width))
+            preview = frame.resize((PREVIEW_WIDTH, height), Image.LANCZOS)
+        result["preview"] = _encode_jpeg(preview, quality=90)
+    if "phash" in names and np is not None:
+        result["phash"] = int.from_bytes(_phash_batch([_phash_image(frame)])[0].tobytes(), "big")
+    return result
+
+
+def parse_response(response_cls: type, resp_data: Any, resp_url: str, kwargs: dict[str, Any]) -> Any:
+    """
+    构造并解析搜索响应对象
+
+    在进程池中执行时，返回对象经 pickle 传回，原始页面数据不会随之传输
+
+    参数:
+        response_cls: 响应解析类
+        resp_data: 原始响应数据
+        resp_url: 响应URL
+        kwargs: 其他解析参数
+
+    返回:
+        Any: 响应解析对象
+    """
+    return response_cls(resp_data, resp_url, **kwargs)
@@ -0,0 +1,167 @@
+import html
+import re
+from typing import Any, Optional, Union
+from .ext_tools import json_loads
+
+# 一次匹配一个完整的JSON字符串或一个括号，字符串内容与其他字符都在正则引擎中跳过
+_JSON_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.S)
+_JSON_START = re.compile(rb"[\[{]")
+_TAG_OPEN = re.compile(rb"<([A-Za-z][\w:-]*)")
+_ATTRIBUTE = re.compile(rb"""\s+([^\s"'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+# 常见转义之外的字符引用交给 html.unescape 处理
+_UNCOMMON_ENTITY = re.compile(rb"&(?!(?:quot|amp|lt|gt|apos|#34|#39|#x22|#x27);)")
+_COMMON_ENTITIES = (
+    (b"&quot;", b'"'), (b"&#34;", b'"'), (b"&#x22;", b'"'),
+    (b"&apos;", b"'"), (b"&#39;", b"'"), (b"&#x27;", b"'"),
+    (b"&lt;", b"<"), (b"&gt;", b">"), (b"&amp;", b"&"),
+)
+
+
+def match_brackets(data: bytes, start: int) -> int:
+    """
+    从 start 处的 [ 或 { 开始进行括号匹配，跳过JSON字符串中的括号
+
+    参数:
+        data: 页面字节
+        start: 左括号位置
+
+    返回:
+        int: 匹配的右括号之后的位置
+
+    异常:
+        ValueError: start 处不是左括号或括号不完整时抛出
+    """
+    if data[start:start + 1] not in (b"[", b"{"):
+        raise ValueError(f"位置 {start} 处不是 JSON 数组或对象")
+    depth = 0
+    for token in _JSON_TOKEN.finditer(data, start):
+        char = token.group()
+        if char[0] == 34:  # 字符串
+            continue
+        if char in b"[{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return token.end()
+    raise ValueError("JSON 括号不完整")
+
+
+def extract_script_json(data: bytes, anchor: bytes) -> Optional[Any]:
+    """
+    直接在页面字节中提取脚本内嵌的JSON（如 window.cardData = [...]），无需解析DOM
+
+    定位 anchor 后取其后第一个 [ 或 { 作为起点：JSON 是脚本中最后一条语句时，直接解析到 </script> 为止的片段；
+    否则做括号匹配确定终点，只解析该片段
+
+    参数:
+        data: 页面字节
+        anchor: JSON 前的定位文本
+
+    返回:
+        Optional[Any]: 解析结果，未找到或解析失败时返回None（调用方应回退到DOM解析）
+    """
+    index = data.find(anchor)
+    while index != -1:
+        start = _JSON_START.search(data, index + len(anchor))
+        if start is not None:
+            begin = start.start()
+            close = data.find(b"</script>", begin)
+            if close != -1:
+                try:
+                    return json_loads(data[begin:close].rstrip().rstrip(b";"))
+                except ValueError:
+                    pass
+            try:
+                return json_loads(data[begin:match_brackets(data, begin)])
+            except ValueError:
+                pass
+        index = data.find(anchor, index + len(anchor))
+    return None
+
+
+def unescape_attribute(value: bytes) -> Union[str, bytes]:
+    """
+    还原HTML属性值中的字符引用
+
+    只含常见转义时直接在字节上替换，避免对大段属性值整体解码后再调用 html.unescape
+
+    参数:
+        value: 原始属性值
+
+    返回:
+        Union[str, bytes]: 还原后的属性值
+    """
+    if b"&" not in value:
+        return value
+    if _UNCOMMON_ENTITY.search(value) is not None:
+        return html.unescape(value.decode("utf-8"))
+    for entity, char in _COMMON_ENTITIES:
+        value = value.replace(entity, char)
+    return value
+
+
+def tag_attributes(data: bytes, tag_start: int) -> Optional[tuple[bytes, dict[bytes, bytes]]]:
+    """
+    解析 tag_start 处开始标签的标签名与属性（属性值保持HTML转义形式）
+
+    参数:
+        data: 页面字节
+        tag_start: 标签 < 的位置
+
+    返回:
+        Optional[tuple[bytes, dict[bytes, bytes]]]: (小写标签名, 小写属性名到属性值的映射)，不是开始标签时返回None
+    """
+    tag = _TAG_OPEN.match(data, tag_start)
+    if tag is None:
+        return None
+    attributes: dict[bytes, bytes] = {}
+    pos = tag.end()
+    while True:
+        attribute = _ATTRIBUTE.match(data, pos)
+        if attribute is None:
+            break
+        value = next((v for v in attribute.groups()[1:] if v is not None), b"")
+        attributes.setdefault(attribute.group(1).lower(), value)
+        pos = attribute.end()
+    return tag.group(1).lower(), attributes
+
+
+def extract_attribute_json(
+    data: bytes,
+    anchor: bytes,
+    attribute: Union[str, bytes],
+    tag: bytes = b"div",
+    class_name: Optional[bytes] = None,
+) -> Optional[Any]:
+    """
+    直接在页面字节中提取标签属性里的JSON（如 Yandex 的 data-state），无需解析DOM
+
+    定位 anchor 后回溯到所在的开始标签，只解析该标签的属性
+
+    参数:
+        data: 页面字节
+        anchor: 位于目标开始标签内的定位文本（如 id="ImagesApp-）
+        attribute: 属性名
+        tag: 标签名
+        class_name: 标签需包含的 class，None 表示不检查
+
+    返回:
+        Optional[Any]: 解析结果，未找到或解析失败时返回None（调用方应回退到DOM解析）
+    """
+    name = attribute.encode() if isinstance(attribute, str) else attribute
+    index = data.find(anchor)
+    while index != -1:
+        tag_start = data.rfind(b"<", 0, index)
+        parsed = tag_attributes(data, tag_start) if tag_start != -1 else None
+        if parsed is not None and parsed[0] == tag:
+            attributes = parsed[1]
+            classes = attributes.get(b"class", b"").split()
+            value = attributes.get(name)
+            if value and (class_name is None or class_name in classes):
+                try:
+                    return json_loads(unescape_attribute(value))
+                except (UnicodeDecodeError, ValueError):
+                    pass
+        index = data.find(anchor, index + len(anchor))
+    return None
@@ -0,0 +1,82 @@
+import asyncio
+from typing import Any, Awaitable, Optional, TypeVar
+from astrbot.api import logger
+
+T = TypeVar("T")
+
+# 附加信息级别：none 跳过全部附加请求；basic 附加请求与主结果并行，最多等待 BASIC_WAIT 秒；
+# full 等待附加请求完成
+ENRICH_NONE = "none"
+ENRICH_BASIC = "basic"
+ENRICH_FULL = "full"
+ENRICH_LEVELS = (ENRICH_NONE, ENRICH_BASIC, ENRICH_FULL)
+DEFAULT_ENRICH_LEVEL = ENRICH_BASIC
+BASIC_WAIT = 3.0
+
+# 超时后继续在后台运行的附加请求（如写入缓存），保存引用避免被回收
+_background: set[asyncio.Task] = set()
+
+
+def normalize_enrich_level(value: Any, default: str = DEFAULT_ENRICH_LEVEL) -> str:
+    """
+    规范化附加信息级别配置
+
+    参数:
+        value: 配置值，支持 none/basic/full 以及布尔值（True 为 full，False 为 none）
+        default: 配置为空或无法识别时使用的级别
+
+    返回:
+        str: 附加信息级别
+    """
+    if isinstance(value, bool):
+        return ENRICH_FULL if value else ENRICH_NONE
+    level = str(value or "").strip().lower()
+    if level in ENRICH_LEVELS:
+        return level
+    if level:
+        logger.warning(f"[Enrich] 无效的附加信息级别: {value}，使用 {default}")
+    return default
+
+
+def _discard(task: asyncio.Task) -> None:
+    _background.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"[Enrich] 后台附加请求失败: {task.exception()}")
+
+
+async def await_follow_up(
+    follow_up: Awaitable[T],
+    level: str,
+    name: str,
+    keep_running: bool = False,
+) -> Optional[T]:
+    """
+    按附加信息级别等待附加请求
+
+    附加请求失败或超时只记录日志并返回None，不影响主结果
+
+    参数:
+        follow_up: 附加请求（协程或已创建的任务）
+        level: 附加信息级别
+        name: 日志中显示的请求名称
+        keep_running: basic 级别超时后是否让请求继续在后台完成（用于写入缓存等副作用）
+
+    返回:
+        Optional[T]: 附加请求结果，跳过、超时或失败时返回None
+    """
+    task = asyncio.ensure_future(follow_up)
+    if level == ENRICH_NONE:
+        task.cancel()
+        return None
+    try:
+        if level == ENRICH_FULL:
+            return await task
+        return await asyncio.wait_for(asyncio.shield(task) if keep_running else task, BASIC_WAIT)
+    except asyncio.TimeoutError:
+        logger.info(f"[Enrich] {name} 超过 {BASIC_WAIT:.0f}s 未完成，跳过")
+        if keep_running and not task.done():
+            _background.add(task)
+            task.add_done_callback(_discard)
+    except Exception as e:
+        logger.warning(f"[Enrich] {name} 失败，跳过: {e}")
+    return None
@@ -0,0 +1,252 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+from astrbot.api import logger
+from .cpu_tasks import warm_worker
+
+R = TypeVar("R")
+
+CPU_BACKENDS = ("thread", "process")
+DEFAULT_IO_WORKERS = 16
+DEFAULT_CPU_WORKERS = 4
+# 进程池异常退出后最多重建的次数，超过后改用线程池
+MAX_PROCESS_POOL_RESTARTS = 3
+
+
+class InstrumentedThreadPool:
+    """
+    带统计信息的命名线程池
+
+    记录排队、执行中、已完成、失败的任务数以及平均排队/执行耗时
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        """
+        初始化线程池
+
+        参数:
+            name: 线程池名称
+            max_workers: 最大线程数
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"imgrev-{name}")
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    @property
+    def queued(self) -> int:
+        """
+        已提交但尚未开始执行的任务数
+        """
+        return self.submitted - self.active - self.completed - self.failed
+
+    async def run(self, func: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        """
+        在线程池中运行函数
+
+        参数:
+            func: 待执行的函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        返回:
+            R: 函数返回值
+        """
+        queued_at = time.perf_counter()
+
+        def task() -> R:
+            started_at = time.perf_counter()
+            with self._lock:
+                self.active += 1
+                self.total_wait += started_at - queued_at
+            ok = False
+            try:
+                result = func(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.total_run += time.perf_counter() - started_at
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+
+        with self._lock:
+            self.submitted += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, task)
+
+    def describe(self) -> str:
+        """
+        生成线程池统计信息文本
+
+        返回:
+            str: 统计信息
+        """
+        finished = self.completed + self.failed
+        avg_wait = self.total_wait / finished * 1000 if finished else 0.0
+        avg_run = self.total_run / finished * 1000 if finished else 0.0
+        return (
+            f"{self.name}: 线程 {self.max_workers}, 执行中 {self.active}, 排队 {self.queued}, "
+            f"完成 {self.completed}, 失败 {self.failed}, 平均排队 {avg_wait:.0f}ms, 平均执行 {avg_run:.0f}ms"
+        )
+
+    def shutdown(self) -> None:
+        """
+        关闭线程池（不等待未开始的任务）
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_workers = 0
+_process_restarts = 0
+_thread_pools: dict[str, InstrumentedThreadPool] = {}
+_pool_sizes: dict[str, int] = {"io": DEFAULT_IO_WORKERS, "cpu": DEFAULT_CPU_WORKERS}
+
+
+def _get_thread_pool(name: str) -> InstrumentedThreadPool:
+    """
+    获取（必要时创建）命名线程池
+
+    参数:
+        name: 线程池名称，"io" 或 "cpu"
+
+    返回:
+        InstrumentedThreadPool: 线程池
+    """
+    pool = _thread_pools.get(name)
+    if pool is None:
+        pool = _thread_pools[name] = InstrumentedThreadPool(name, _pool_sizes[name])
+    return pool
+
+
+def configure(cpu_backend: str = "thread", process_workers: int = 0,
+              io_workers: int = DEFAULT_IO_WORKERS, cpu_workers: int = DEFAULT_CPU_WORKERS) -> None:
+    """
+    配置执行后端
+
+    阻塞式网络请求与CPU密集任务（渲染、HTML解析、图片解码）使用各自独立的线程池，
+    慢速网络请求不会占满渲染所需的线程
+
+    参数:
+        cpu_backend: "thread" 使用CPU线程池执行；"process" 使用预热的进程池，可绕开GIL随核数扩展
+        process_workers: 进程池大小，0 表示按CPU核数自动设置
+        io_workers: 阻塞网络请求线程池大小
+        cpu_workers: CPU任务线程池大小
+    """
+    global _process_pool, _process_workers, _process_restarts
+    shutdown()
+    _process_restarts = 0
+    _pool_sizes["io"] = max(1, int(io_workers or DEFAULT_IO_WORKERS))
+    _pool_sizes["cpu"] = max(1, int(cpu_workers or DEFAULT_CPU_WORKERS))
+    if cpu_backend not in CPU_BACKENDS:
+        logger.warning(f"[Executors] 未知的CPU执行后端: {cpu_backend}，使用 thread")
+        return
+    if cpu_backend == "process":
+        workers = _process_workers = process_workers or max(1, (os.cpu_count() or 2) - 1)
+        _process_pool = ProcessPoolExecutor(max_workers=workers, initializer=warm_worker)
+        logger.info(f"[Executors] CPU任务使用进程池，工作进程数: {workers}")
+
+
+def _replace_broken_pool(broken: ProcessPoolExecutor) -> None:
+    """
+    关闭异常退出的进程池并重建，重建次数用完后改用线程池
+
+    同一进程池上并发的任务会同时失败，只有第一个任务负责处理
+
+    参数:
+        broken: 异常退出的进程池
+    """
+    global _process_pool, _process_restarts
+    if _process_pool is not broken:
+        return
+    broken.shutdown(wait=False, cancel_futures=True)
+    if _process_restarts >= MAX_PROCESS_POOL_RESTARTS:
+        _process_pool = None
+        logger.error("[Executors] 进程池多次异常退出，CPU任务改用线程池执行")
+        return
+    _process_restarts += 1
+    _process_pool = ProcessPoolExecutor(max_workers=_process_workers, initializer=warm_worker)
+    logger.error(f"[Executors] 进程池异常退出，已重建 (第 {_process_restarts} 次)")
+
+
+def shutdown() -> None:
+    """
+    关闭进程池与线程池（不等待未开始的任务）
+    """
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+    for pool in _thread_pools.values():
+        pool.shutdown()
+    _thread_pools.clear()
+
+
+async def run_io(func: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+    """
+    在阻塞I/O线程池中运行函数（同步网络请求、文件读写等）
+
+    参数:
+        func: 待执行的函数
+        *args: 位置参数
+        **kwargs: 关键字参数
+
+    返回:
+        R: 函数返回值
+    """
+    return await _get_thread_pool("io").run(func, *args, **kwargs)
+
+
+async def run_cpu(func: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+    """
+    在CPU执行后端中运行函数
+
+    使用进程池时，func 必须是模块级函数且参数与返回值可 pickle
+
+    参数:
+        func: 待执行的函数
+        *args: 位置参数
+        **kwargs: 关键字参数
+
+    返回:
+        R: 函数返回值
+    """
+    pool = _process_pool
+    if pool is not None:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, partial(func, *args, **kwargs))
+        except BrokenProcessPool:
+            _replace_broken_pool(pool)
+    return await _get_thread_pool("cpu").run(func, *args, **kwargs)
+
+
+def describe() -> str:
+    """
+    生成执行后端状态文本，供管理员查看
+
+    返回:
+        str: 状态文本
+    """
+    lines = [f"CPU执行后端: {'process' if _process_pool is not None else 'thread'}"]
+    for name in ("io", "cpu"):
+        if name in _thread_pools:
+            lines.append(_thread_pools[name].describe())
+        else:
+            lines.append(f"{name}: 线程 {_pool_sizes[name]}, 尚未使用")
+    return "\n".join(lines)
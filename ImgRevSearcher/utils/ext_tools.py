@@ -1,8 +1,48 @@
+import json
 import re
 from pathlib import Path
 from typing import Any, Optional, Union
-from lxml.html import HTMLParser, fromstring
+from lxml.html import HtmlElement, HTMLParser, fromstring
 from pyquery import PyQuery
+from pyquery.text import extract_text
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """
+    解析JSON数据，安装 orjson 时使用 orjson，否则使用标准库
+    
+    参数:
+        data: JSON文本或UTF-8字节
+        
+    返回:
+        Any: 解析结果
+        
+    异常:
+        ValueError: JSON格式错误时抛出（json.JSONDecodeError 的子类）
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> str:
+    """
+    将对象序列化为紧凑的JSON文本，安装 orjson 时使用 orjson，否则使用标准库
+    
+    参数:
+        obj: 待序列化对象
+        
+    返回:
+        str: JSON文本（非ASCII字符不转义）
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
 
 
 def deep_get(dictionary: dict[str, Any], keys: str) -> Optional[Any]:
@@ -55,15 +95,90 @@ def read_file(file: Union[str, bytes, Path]) -> bytes:
         raise type(e)(f"{error_type}：读取文件 {file} 时出错: {e}") from e
 
 
-def parse_html(html: str) -> PyQuery:
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+)
+
+
+def sniff_image_format(head: bytes) -> Optional[str]:
+    """
+    根据文件头魔数识别图片格式
+    
+    参数:
+        head: 文件开头的若干字节（至少16字节可识别全部格式）
+        
+    返回:
+        Optional[str]: 图片格式名称(jpeg/png/gif/webp/bmp/tiff/avif/heic)，无法识别时返回None
+    """
+    for signature, fmt in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return fmt
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in (b"avif", b"avis"):
+            return "avif"
+        if brand in (b"heic", b"heix", b"hevc", b"mif1", b"msf1"):
+            return "heic"
+    return None
+
+
+def parse_html(html: Union[str, bytes]) -> PyQuery:
     """
-    解析HTML字符串为PyQuery对象
+    解析HTML为PyQuery对象
     
     参数:
-        html: HTML字符串
+        html: HTML字符串或UTF-8字节（直接传入字节可省去解码）
         
     返回:
         PyQuery: 解析后的PyQuery对象，用于CSS选择器查询
     """
     utf8_parser = HTMLParser(encoding="utf-8")
     return PyQuery(fromstring(html, parser=utf8_parser))
+
+
+
+def parse_html_tree(html: Union[str, bytes]) -> HtmlElement:
+    """
+    解析HTML为 lxml 元素树，配合预编译的 etree.XPath 使用，省去 PyQuery 每次调用时的CSS转换
+
+    参数:
+        html: HTML字符串或UTF-8字节
+
+    返回:
+        HtmlElement: 根元素
+    """
+    return fromstring(html, parser=HTMLParser(encoding="utf-8"))
+
+
+def xpath_class(name: str) -> str:
+    """
+    生成匹配 class 的 XPath 谓词，与 CSS 选择器 .name 的语义一致
+
+    参数:
+        name: class 名称
+
+    返回:
+        str: XPath 谓词（不含方括号）
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def elements_text(elements: list[HtmlElement]) -> str:
+    """
+    提取元素文本，结果与 PyQuery(elements).text() 一致
+
+    参数:
+        elements: 元素列表
+
+    返回:
+        str: 各元素文本以空格连接
+    """
+    return " ".join(extract_text(element) for element in elements)
@@ -0,0 +1,243 @@
+import re
+from typing import Iterable, Optional, Sequence
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from .search_hit import SearchHit
+
+# 合并搜索使用的伪引擎名称
+FUSION_ENGINE = "all"
+DEFAULT_FUSION_ENGINES = ("saucenao", "iqdb", "ascii2d")
+DEFAULT_FUSION_RESULTS = 10
+# 参与合并时每个引擎最多解析的结果数
+DEFAULT_FUSION_TOP_K = 20
+
+# 没有相似度的引擎按排名计分: 1 / (RANK_OFFSET + 名次)，第1名约为 0.5
+RANK_OFFSET = 2
+# 同一链接每多一个引擎命中，得分乘以 (1 + AGREEMENT_BONUS)
+AGREEMENT_BONUS = 0.25
+
+_HOST_PREFIXES = ("www.", "m.", "mobile.", "touch.")
+_HOST_ALIASES = {
+    "x.com": "twitter.com",
+    "fxtwitter.com": "twitter.com",
+    "vxtwitter.com": "twitter.com",
+    "fixupx.com": "twitter.com",
+    "safebooru.donmai.us": "danbooru.donmai.us",
+    "konachan.net": "konachan.com",
+    "exhentai.org": "e-hentai.org",
+}
+_TRACKING_PARAMS = re.compile(r"^(?:utm_\w+|ref|ref_src|ref_url|si|fbclid|gclid|spm)$")
+_NUMERIC_ID = re.compile(r"\d+")
+
+# 站点规则: 规范化后的主机名 -> [(路径正则, 规范链接模板)]，模板中的 {0} {1} 为正则分组
+_PATH_RULES: dict[str, list[tuple[re.Pattern, str]]] = {
+    "pixiv.net": [
+        (re.compile(r"^/(?:[a-z]{2}/)?(?:artworks|i)/(\d+)"), "https://www.pixiv.net/artworks/{0}"),
+        (re.compile(r"^/(?:[a-z]{2}/)?users/(\d+)"), "https://www.pixiv.net/users/{0}"),
+    ],
+    "i.pximg.net": [
+        (re.compile(r"/(\d+)_(?:p\d+|ugoira\d*)"), "https://www.pixiv.net/artworks/{0}"),
+    ],
+    "twitter.com": [
+        (re.compile(r"^/(?:[^/]+|i(?:/web)?)/status(?:es)?/(\d+)"), "https://twitter.com/i/status/{0}"),
+    ],
+    "danbooru.donmai.us": [
+        (re.compile(r"^/posts?/(?:show/)?(\d+)"), "https://danbooru.donmai.us/posts/{0}"),
+    ],
+    "yande.re": [
+        (re.compile(r"^/post/show/(\d+)"), "https://yande.re/post/show/{0}"),
+    ],
+    "konachan.com": [
+        (re.compile(r"^/post/show/(\d+)"), "https://konachan.com/post/show/{0}"),
+    ],
+    "e-hentai.org": [
+        (re.compile(r"^/g/(\d+)/([0-9a-f]+)"), "https://e-hentai.org/g/{0}/{1}/"),
+    ],
+    "seiga.nicovideo.jp": [
+        (re.compile(r"^/seiga/(im\d+)"), "https://seiga.nicovideo.jp/seiga/{0}"),
+    ],
+    "deviantart.com": [
+        (re.compile(r"^/[^/]+/art/[^/]*?(\d+)$"), "https://www.deviantart.com/deviation/{0}"),
+    ],
+    "artstation.com": [
+        (re.compile(r"^/artwork/(\w+)"), "https://www.artstation.com/artwork/{0}"),
+    ],
+}
+# 以查询参数中的ID标识作品的站点: 主机名 -> (ID参数名, 规范链接模板)
+_QUERY_RULES: dict[str, tuple[str, str]] = {
+    "pixiv.net": ("illust_id", "https://www.pixiv.net/artworks/{0}"),
+    "gelbooru.com": ("id", "https://gelbooru.com/index.php?page=post&s=view&id={0}"),
+    "nijie.info": ("id", "https://nijie.info/view.php?id={0}"),
+    "anime-pictures.net": ("id", "https://anime-pictures.net/posts/{0}"),
+}
+# 只在这些路径上按查询参数识别作品（如 pixiv 旧版 member_illust.php）
+_QUERY_PATHS = {
+    "pixiv.net": "/member_illust.php",
+    "gelbooru.com": "/index.php",
+    "nijie.info": "/view.php",
+}
+
+
+def _normalize_host(host: str) -> str:
+    host = host.lower().rstrip(".")
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    return _HOST_ALIASES.get(host, host)
+
+
+def _canonicalize(url: str) -> tuple[str, bool]:
+    """
+    规范化链接，同时返回是否由站点规则重写（重写结果是可直接访问的作品链接）
+    """
+    url = url.strip()
+    if url.startswith("//"):
+        url = "https:" + url
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url, False
+    if not parts.netloc:
+        return url, False
+    host = _normalize_host(parts.hostname or "")
+    path = parts.path or "/"
+    for pattern, template in _PATH_RULES.get(host, ()):
+        match = pattern.search(path)
+        if match is not None:
+            return template.format(*match.groups()), True
+    query = parse_qsl(parts.query, keep_blank_values=False)
+    query_rule = _QUERY_RULES.get(host)
+    if query_rule is not None and _QUERY_PATHS.get(host, path) == path:
+        name, template = query_rule
+        value = next((v for k, v in query if k == name and _NUMERIC_ID.fullmatch(v)), None)
+        if value is not None:
+            return template.format(value), True
+    query = sorted((k, v) for k, v in query if not _TRACKING_PARAMS.match(k))
+    path = path.rstrip("/") or "/"
+    # 协议统一为 https 只用于比较；非默认端口是站点的一部分，需要保留
+    if port is not None and port not in (80, 443):
+        host = f"{host}:{port}"
+    canonical = f"https://{host}{path}"
+    if query:
+        canonical += "?" + urlencode(query)
+    return canonical, False
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    将结果链接规范化，使不同引擎返回的同一作品链接一致
+
+    统一协议与主机名（去掉 www./m. 前缀、合并 x.com 等别名，保留非默认端口）；对 pixiv、Twitter、
+    Danbooru 等站点按作品ID重写为固定形式；其他链接去掉片段、跟踪参数与末尾斜杠。
+    结果用作去重的键，未被站点规则重写的链接不一定能直接访问（如仅支持 http 的站点）
+
+    参数:
+        url: 原始链接（支持 //host/path 形式）
+
+    返回:
+        str: 规范化后的链接，无法解析时返回去除空白后的原链接
+    """
+    return _canonicalize(url)[0]
+
+
+def _hit_score(hit: SearchHit, rank: int) -> float:
+    """
+    单个结果的得分: 有相似度时取相似度(0-1)，否则按引擎内名次计分
+    """
+    if hit.similarity is not None:
+        return max(0.0, min(hit.similarity, 100.0)) / 100
+    return 1 / (RANK_OFFSET + rank)
+
+
+class _FusedEntry:
+    """
+    合并过程中同一规范链接对应的累积信息
+    """
+
+    __slots__ = ("url", "scores", "similarity", "title", "author", "thumbnail", "sources")
+
+    def __init__(self, url: str, hit: SearchHit, score: float):
+        self.url = url
+        self.scores: dict[str, float] = {hit.engine: score}
+        self.similarity = hit.similarity
+        self.title = hit.title
+        self.author = hit.author
+        self.thumbnail = hit.thumbnail
+        self.sources = [hit.url] if hit.url else []
+
+    def add(self, hit: SearchHit, score: float) -> None:
+        if score > self.scores.get(hit.engine, -1.0):
+            self.scores[hit.engine] = score
+        if hit.similarity is not None and (self.similarity is None or hit.similarity > self.similarity):
+            self.similarity = hit.similarity
+        # 字段取第一个非空值，引擎按传入顺序（优先级）排列
+        self.title = self.title or hit.title
+        self.author = self.author or hit.author
+        self.thumbnail = self.thumbnail or hit.thumbnail
+        if hit.url and hit.url not in self.sources:
+            self.sources.append(hit.url)
+
+    def score(self) -> float:
+        return sum(self.scores.values()) * (1 + AGREEMENT_BONUS * (len(self.scores) - 1))
+
+    def to_hit(self) -> SearchHit:
+        engines = sorted(self.scores, key=self.scores.__getitem__, reverse=True)
+        extra = {"engines": engines, "score": round(self.score(), 4)}
+        if len(self.sources) > 1:
+            extra["sources"] = self.sources
+        return SearchHit(
+            "+".join(engines),
+            similarity=self.similarity,
+            url=self.url,
+            title=self.title,
+            author=self.author,
+            thumbnail=self.thumbnail,
+            extra=extra,
+        )
+
+
+def fuse_hits(results: Iterable[Sequence[SearchHit]], limit: Optional[int] = DEFAULT_FUSION_RESULTS) -> list[SearchHit]:
+    """
+    合并多个引擎的搜索结果
+
+    按规范化链接建立哈希索引去重（显示的链接为站点规则重写后的作品链接或第一个原始链接）；同一链接在每个引擎中取最高得分，各引擎得分相加后
+    按命中引擎数加成，得到统一排序。合并后的 SearchHit.engine 为命中引擎以 + 连接，
+    similarity 为各引擎中的最高相似度，extra 中记录命中引擎、合并得分与原始链接
+
+    参数:
+        results: 各引擎的结果序列（按引擎内排名排列），排在前面的引擎在字段取值时优先
+        limit: 最多返回的条数，None 表示全部
+
+    返回:
+        list[SearchHit]: 按合并得分降序排列的结果
+    """
+    index: dict[str, _FusedEntry] = {}
+    canonical_cache: dict[str, tuple[str, bool]] = {}
+    for hits in results:
+        for rank, hit in enumerate(hits):
+            if not hit.url:
+                # 没有链接的结果（如角色识别）无法与其他引擎对齐，按标题单独保留
+                if not hit.title:
+                    continue
+                key = f"{hit.engine}:{hit.title}"
+                url = ""
+            else:
+                cached = canonical_cache.get(hit.url)
+                if cached is None:
+                    cached = canonical_cache[hit.url] = _canonicalize(hit.url)
+                key, rewritten = cached
+                # 显示站点规则重写后的作品链接，其他情况显示第一个引擎返回的原始链接
+                url = key if rewritten else hit.url.strip()
+                if url.startswith("//"):
+                    url = "https:" + url
+            score = _hit_score(hit, rank)
+            entry = index.get(key)
+            if entry is None:
+                index[key] = _FusedEntry(url, hit, score)
+            else:
+                entry.add(hit, score)
+    ranked = sorted(index.values(), key=_FusedEntry.score, reverse=True)
+    if limit is not None:
+        ranked = ranked[:limit]
+    return [entry.to_hit() for entry in ranked]
@@ -0,0 +1,273 @@
+import asyncio
+import io
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, Optional
+from PIL import Image, ImageDraw
+from astrbot.api import logger
+
+DEFAULT_MIN_INTERVAL = 600
+DEFAULT_MAX_INTERVAL = 6 * 3600
+# 连续失败达到该次数后判定引擎不健康
+UNHEALTHY_AFTER = 2
+# 需要API Key或有调用额度限制的引擎，默认不参与主动探测
+QUOTA_ENGINES = ("google", "copyseeker", "saucenao")
+
+
+@dataclass
+class EngineHealth:
+    """
+    单个引擎的健康状态
+    """
+    engine: str
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    latency_ms: Optional[float] = None
+    last_success: float = 0.0
+    last_failure: float = 0.0
+    last_error: str = ""
+    last_source: str = ""
+
+    @property
+    def healthy(self) -> bool:
+        """
+        是否健康（连续失败次数未达到阈值）
+        """
+        return self.consecutive_failures < UNHEALTHY_AFTER
+
+
+class HealthRegistry:
+    """
+    引擎健康状态登记表
+
+    同时记录真实搜索（被动）与后台探测（主动）的结果
+    """
+
+    def __init__(self):
+        self.engines: dict[str, EngineHealth] = {}
+
+    def get(self, engine: str) -> EngineHealth:
+        """
+        获取（必要时创建）引擎健康状态
+
+        参数:
+            engine: 引擎名称
+
+        返回:
+            EngineHealth: 健康状态
+        """
+        health = self.engines.get(engine)
+        if health is None:
+            health = self.engines[engine] = EngineHealth(engine)
+        return health
+
+    def record(self, engine: str, ok: bool, latency_ms: Optional[float] = None,
+               error: Optional[BaseException] = None, source: str = "search") -> None:
+        """
+        记录一次请求结果
+
+        参数:
+            engine: 引擎名称
+            ok: 是否成功
+            latency_ms: 耗时(毫秒)
+            error: 失败原因
+            source: 来源，"search" 为真实搜索，"probe" 为后台探测
+        """
+        health = self.get(engine)
+        was_healthy = health.healthy
+        health.last_source = source
+        if ok:
+            health.successes += 1
+            health.consecutive_failures = 0
+            health.last_success = time.time()
+            if latency_ms is not None:
+                if health.latency_ms is None:
+                    health.latency_ms = latency_ms
+                else:
+                    health.latency_ms = health.latency_ms * 0.7 + latency_ms * 0.3
+        else:
+            health.failures += 1
+            health.consecutive_failures += 1
+            health.last_failure = time.time()
+            health.last_error = f"{type(error).__name__}: {error}" if error else ""
+        if was_healthy != health.healthy:
+            if health.healthy:
+                logger.info(f"[Health] 引擎 {engine} 已恢复")
+            else:
+                logger.warning(f"[Health] 引擎 {engine} 连续失败，标记为不健康 ({health.last_error})")
+
+    def is_healthy(self, engine: str) -> bool:
+        """
+        判断引擎是否健康，没有记录的引擎视为健康
+
+        参数:
+            engine: 引擎名称
+
+        返回:
+            bool: 健康返回True
+        """
+        health = self.engines.get(engine)
+        return health is None or health.healthy
+
+    def healthy_engines(self, engines: Iterable[str]) -> list[str]:
+        """
+        过滤出健康的引擎
+
+        参数:
+            engines: 候选引擎
+
+        返回:
+            list[str]: 健康的引擎（保持原顺序）
+        """
+        return [e for e in engines if self.is_healthy(e)]
+
+    def describe(self) -> str:
+        """
+        生成健康状态文本，供管理员查看
+
+        返回:
+            str: 状态文本
+        """
+        if not self.engines:
+            return "引擎健康: 暂无记录"
+        lines = ["引擎健康:"]
+        for health in sorted(self.engines.values(), key=lambda h: h.engine):
+            latency = f"{health.latency_ms:.0f}ms" if health.latency_ms is not None else "-"
+            status = "正常" if health.healthy else f"异常 ({health.last_error})"
+            lines.append(
+                f"  {health.engine}: {status}, 成功 {health.successes}, 失败 {health.failures}, 延迟 {latency}"
+            )
+        return "\n".join(lines)
+
+
+def make_canary_image(size: int = 64) -> bytes:
+    """
+    生成探测用的小尺寸测试图片
+
+    参数:
+        size: 边长(像素)
+
+    返回:
+        bytes: JPEG图像数据
+    """
+    img = Image.new("RGB", (size, size), "white")
+    draw = ImageDraw.Draw(img)
+    for i in range(0, size, 8):
+        draw.rectangle([i, 0, i + 3, size], fill=(i * 4 % 256, 80, 255 - i * 4 % 256))
+    draw.ellipse([size // 4, size // 4, size * 3 // 4, size * 3 // 4], fill=(30, 30, 30))
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=80)
+    return output.getvalue()
+
+
+class HealthProber:
+    """
+    后台健康探测调度器
+
+    按低频率依次用测试图片调用各引擎，结果写入健康登记表；
+    探测成功时探测间隔加倍（直至上限），失败时回到最短间隔，
+    因此健康的引擎很少被探测，异常引擎会被更快地确认恢复
+    """
+
+    def __init__(
+        self,
+        search: Callable[..., Awaitable[Any]],
+        registry: HealthRegistry,
+        engines: Iterable[str],
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        timeout: float = 30,
+    ):
+        """
+        初始化探测调度器
+
+        参数:
+            search: 搜索协程函数（BaseSearchModel.search）
+            registry: 健康登记表
+            engines: 参与探测的引擎
+            min_interval: 最短探测间隔(秒)
+            max_interval: 最长探测间隔(秒)
+            timeout: 单次探测超时(秒)
+        """
+        self.search = search
+        self.registry = registry
+        self.engines = list(engines)
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.timeout = timeout
+        self.canary = make_canary_image()
+        self.intervals: dict[str, float] = {e: min_interval for e in self.engines}
+        # 启动后错开首次探测，避免同时请求所有引擎
+        now = time.monotonic()
+        self.next_due: dict[str, float] = {
+            e: now + random.uniform(10, min(60.0, min_interval)) for e in self.engines
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        启动探测协程
+        """
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        """
+        停止探测协程
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def probe(self, engine: str) -> bool:
+        """
+        对单个引擎执行一次探测并调整下次探测时间
+
+        参数:
+            engine: 引擎名称
+
+        返回:
+            bool: 探测成功返回True
+        """
+        start = time.perf_counter()
+        try:
+            # 探测只关心引擎能否返回结果：跳过附加请求、重排，且不写入本地索引
+            await self.search(api=engine, file=self.canary, timeout=self.timeout, top_k=1, enrich=False, record=False)
+        except Exception as e:
+            self.registry.record(engine, False, error=e, source="probe")
+            self.intervals[engine] = self.min_interval
+            ok = False
+        else:
+            self.registry.record(engine, True, (time.perf_counter() - start) * 1000, source="probe")
+            self.intervals[engine] = min(self.intervals[engine] * 2, self.max_interval)
+            ok = True
+        # 加入少量抖动，避免多个引擎的探测逐渐对齐
+        self.next_due[engine] = time.monotonic() + self.intervals[engine] * random.uniform(0.9, 1.1)
+        return ok
+
+    async def _run(self) -> None:
+        """
+        按到期时间依次探测引擎
+        """
+        while True:
+            engine = min(self.next_due, key=self.next_due.get)
+            delay = self.next_due[engine] - time.monotonic()
+            if delay > 0:
+                # 分段等待，使 note_search 提前的探测时间能及时生效
+                await asyncio.sleep(min(delay, self.min_interval))
+                continue
+            await self.probe(engine)
+
+    def note_search(self, engine: str, ok: bool) -> None:
+        """
+        真实搜索失败时提前安排探测，以便尽快确认引擎状态
+
+        参数:
+            engine: 引擎名称
+            ok: 真实搜索是否成功
+        """
+        if engine in self.next_due and not ok:
+            self.intervals[engine] = self.min_interval
+            self.next_due[engine] = min(self.next_due[engine], time.monotonic() + self.min_interval)
@@ -0,0 +1,247 @@
+import asyncio
+import io
+from functools import partial
+from typing import Any, Optional, Union
+from PIL import Image
+from . import cpu_tasks
+from .executors import run_cpu, run_io
+from .ext_tools import read_file
+from .preprocess import UploadProfile
+from .types import FileContent
+
+# 文件头魔数 -> 格式名称
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+)
+# 无论是否为动图都需要先提取单帧再使用的格式
+CONVERT_FORMATS = {"gif"}
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """
+    根据文件头判断图像格式，不解码图像
+
+    参数:
+        data: 图像数据
+
+    返回:
+        Optional[str]: 格式名称（jpeg/png/gif/bmp/webp），无法识别时返回None
+    """
+    for magic, name in _SIGNATURES:
+        if data.startswith(magic):
+            return name
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def is_animated(data: bytes, image_format: Optional[str]) -> bool:
+    """
+    根据文件头判断 WebP、PNG 是否为动图（动态 WebP / APNG），不解码图像
+
+    参数:
+        data: 图像数据
+        image_format: 由文件头判断的格式
+
+    返回:
+        bool: 为动图时返回True
+    """
+    if image_format == "webp":
+        # 扩展格式（VP8X）标志位中的动画位
+        return data[12:16] == b"VP8X" and len(data) > 20 and bool(data[20] & 0x02)
+    if image_format == "png":
+        # APNG 的 acTL 块必须位于第一个 IDAT 块之前
+        pos = 8
+        while pos + 8 <= len(data):
+            chunk = data[pos + 4:pos + 8]
+            if chunk == b"acTL":
+                return True
+            if chunk == b"IDAT":
+                return False
+            pos += 12 + int.from_bytes(data[pos:pos + 4], "big")
+    return False
+
+
+class ImageHandle:
+    """
+    一次搜索中共享的查询图像
+
+    格式由文件头判断，尺寸只读取文件头；GIF、动态 WebP、APNG 先提取单帧JPEG（只解码需要的帧），
+    之后的派生版本都基于该帧生成；上传用的JPEG、结果图预览、感知哈希等派生版本
+    在首次需要时由一次CPU任务解码生成（同时请求的多个版本共用一次解码）并缓存，
+    多个引擎、重排、本地索引与结果渲染并发请求同一版本时只计算一次；
+    按上传配置预处理后的图像以配置为键缓存，使用相同配置的引擎共用
+    """
+
+    def __init__(self, data: bytes, scan_frames: int = 0):
+        """
+        初始化图像句柄
+
+        参数:
+            data: 原始图像数据
+            scan_frames: 动图选取最清晰一帧时比较的帧数，0 表示使用第一帧
+        """
+        self.data = data
+        self.format = sniff_format(data)
+        self.scan_frames = scan_frames
+        # 需要先提取单帧（引擎不一定支持动图）
+        self.needs_frame = self.format in CONVERT_FORMATS or is_animated(data, self.format)
+        self._size: Optional[tuple[int, int]] = None
+        self._variants: dict[Any, Any] = {}
+        self._pending: dict[Any, asyncio.Future] = {}
+        if not self.needs_frame:
+            self._variants["jpeg"] = data
+
+    @classmethod
+    async def from_file(cls, file: "ImageSource", scan_frames: int = 0) -> "ImageHandle":
+        """
+        由文件内容创建句柄，已经是句柄时直接返回
+
+        参数:
+            file: 图像数据、文件路径或图像句柄
+            scan_frames: 动图选取最清晰一帧时比较的帧数，0 表示使用第一帧
+
+        返回:
+            ImageHandle: 图像句柄
+        """
+        if isinstance(file, ImageHandle):
+            return file
+        data = file if isinstance(file, bytes) else await run_io(read_file, file)
+        return cls(data, scan_frames)
+
+    @property
+    def size(self) -> Optional[tuple[int, int]]:
+        """
+        图像尺寸（只读取文件头），无法识别时为None
+        """
+        if self._size is None:
+            try:
+                self._size = Image.open(io.BytesIO(self.data)).size
+            except Exception:
+                return None
+        return self._size
+
+    def prefetch(self, *names: str) -> None:
+        """
+        在后台一次性生成多个派生版本，之后的请求直接复用
+
+        参数:
+            *names: 版本名称（jpeg/preview/phash）
+        """
+        self._schedule(names)
+
+    def _schedule(self, names: tuple[str, ...]) -> None:
+        missing = tuple(name for name in dict.fromkeys(names) if name not in self._variants and name not in self._pending)
+        if "jpeg" in missing:
+            # 动图的 jpeg 版本即提取出的单帧
+            self._start("jpeg", cpu_tasks.extract_frame, self.data, self.scan_frames)
+            missing = tuple(name for name in missing if name != "jpeg")
+        if "preview" in missing and not self.needs_frame:
+            size = self.size
+            if size is not None and size[0] <= cpu_tasks.PREVIEW_WIDTH:
+                # 尺寸已经足够小，渲染时直接使用原图
+                self._variants["preview"] = self.data
+                missing = tuple(name for name in missing if name != "preview")
+        if not missing:
+            return
+        future = asyncio.ensure_future(self._decode(missing))
+        for name in missing:
+            self._pending[name] = future
+        future.add_done_callback(partial(self._store, missing))
+
+    def _store(self, names: tuple[str, ...], future: asyncio.Future) -> None:
+        for name in names:
+            self._pending.pop(name, None)
+        # 失败时不缓存，下次请求重新生成
+        if not future.cancelled() and future.exception() is None:
+            self._variants.update(future.result())
+
+    async def _decode(self, names: tuple[str, ...]) -> dict[str, Any]:
+        return await run_cpu(cpu_tasks.image_variants, await self.still(), names)
+
+    def _store_value(self, key: Any, future: asyncio.Future) -> None:
+        self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self._variants[key] = future.result()
+
+    def _start(self, key: Any, func: Any, *args: Any) -> asyncio.Future:
+        future = self._pending.get(key)
+        if future is None:
+            future = self._pending[key] = asyncio.ensure_future(run_cpu(func, *args))
+            future.add_done_callback(partial(self._store_value, key))
+        return future
+
+    async def _derive(self, key: Any, func: Any, *args: Any) -> Any:
+        """
+        在CPU执行器中计算单个派生版本并缓存，并发请求共用同一次计算
+        """
+        if key in self._variants:
+            return self._variants[key]
+        return await asyncio.shield(self._start(key, func, *args))
+
+    async def still(self) -> bytes:
+        """
+        静态图像：动图为提取出的单帧JPEG，其他格式为原始数据
+
+        返回:
+            bytes: 图像数据
+        """
+        return await self._derive("jpeg", cpu_tasks.extract_frame, self.data, self.scan_frames)
+
+    async def variants(self, *names: str) -> dict[str, Any]:
+        """
+        获取派生版本，缺少的版本在一次解码中生成
+
+        参数:
+            *names: 版本名称（jpeg/preview/phash）
+
+        返回:
+            dict[str, Any]: 版本名到数据的映射
+        """
+        self._schedule(names)
+        waiting = {self._pending[name] for name in names if name in self._pending}
+        if waiting:
+            # 调用方被取消时不取消共享的计算
+            await asyncio.shield(asyncio.gather(*waiting))
+        return {name: self._variants.get(name) for name in names}
+
+    async def upload_bytes(self, profile: Optional[UploadProfile] = None) -> bytes:
+        """
+        上传给引擎的图像数据
+
+        参数:
+            profile: 引擎的预处理配置，None 表示不预处理（动图仍会提取单帧）
+
+        返回:
+            bytes: 图像数据，静态图像符合配置时直接返回
+        """
+        source = await self.still()
+        if profile is None or profile.accepts(sniff_format(source), self.size, len(source)):
+            return source
+        return await self._derive(("upload", profile), cpu_tasks.prepare_upload, source, profile.max_side, profile.quality)
+
+    async def preview(self) -> Optional[bytes]:
+        """
+        渲染结果图使用的源图像
+
+        返回:
+            Optional[bytes]: 宽度不超过 PREVIEW_WIDTH 的图像数据，无法解码时为None
+        """
+        return (await self.variants("preview"))["preview"]
+
+    async def phash(self) -> Optional[int]:
+        """
+        64位感知哈希
+
+        返回:
+            Optional[int]: 哈希值，无法解码或未安装 numpy 时为None
+        """
+        return (await self.variants("phash"))["phash"]
+
+
+# 可作为查询图像传入搜索接口的类型
+ImageSource = Union[FileContent, ImageHandle]
@@ -0,0 +1,209 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Iterable, Optional
+from astrbot.api import logger
+
+
+class DegradeMode(IntEnum):
+    """
+    过载降级模式枚举
+
+    数值越大降级越重，每一级都包含前面所有级别的降级措施
+    """
+    NORMAL = 0
+    TEXT_ONLY = 1
+    NO_ENRICH = 2
+    SHORT_TIMEOUT = 3
+    CHEAP_ONLY = 4
+
+
+MODE_DESCRIPTIONS = {
+    DegradeMode.NORMAL: "正常",
+    DegradeMode.TEXT_ONLY: "仅文本结果（跳过结果图渲染）",
+    DegradeMode.NO_ENRICH: "跳过附加信息（AniList/TinEye 域名等）",
+    DegradeMode.SHORT_TIMEOUT: "缩短请求超时",
+    DegradeMode.CHEAP_ONLY: "仅允许低开销引擎",
+}
+
+DEFAULT_DEPTH_THRESHOLDS = (4, 8, 12, 16)
+DEFAULT_LAG_THRESHOLDS_MS = (100.0, 250.0, 500.0, 1000.0)
+DEFAULT_CHEAP_ENGINES = ("animetrace", "saucenao", "tracemoe", "iqdb")
+
+
+def _level_for(value: float, thresholds: tuple) -> int:
+    """
+    根据阈值列表计算降级等级
+
+    参数:
+        value: 当前观测值
+        thresholds: 递增的阈值序列，第 i 个阈值对应第 i+1 级
+
+    返回:
+        int: 达到的最高等级，未达到任何阈值时为 0
+    """
+    level = 0
+    for i, threshold in enumerate(thresholds, 1):
+        if value >= threshold:
+            level = i
+    return level
+
+
+class LoadShedder:
+    """
+    过载降级控制器
+
+    根据正在执行的搜索数量（队列深度）与事件循环延迟自动选择降级模式，
+    在繁忙时优先保证快速、低开销的响应
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        depth_thresholds: Optional[Iterable[int]] = None,
+        lag_thresholds_ms: Optional[Iterable[float]] = None,
+        short_timeout: float = 20,
+        cheap_engines: Optional[Iterable[str]] = None,
+        sample_interval: float = 0.5,
+    ):
+        """
+        初始化降级控制器
+
+        参数:
+            enabled: 是否启用自动降级
+            depth_thresholds: 进入各级降级的并发搜索数阈值（4个，依次递增）
+            lag_thresholds_ms: 进入各级降级的事件循环延迟阈值（毫秒，4个，依次递增）
+            short_timeout: 缩短超时模式下使用的请求超时（秒）
+            cheap_engines: 仅允许低开销引擎模式下可用的引擎
+            sample_interval: 事件循环延迟采样间隔（秒）
+        """
+        self.enabled = enabled
+        self.depth_thresholds = tuple(int(v) for v in (depth_thresholds or DEFAULT_DEPTH_THRESHOLDS))
+        self.lag_thresholds_ms = tuple(float(v) for v in (lag_thresholds_ms or DEFAULT_LAG_THRESHOLDS_MS))
+        self.short_timeout = short_timeout
+        self.cheap_engines = tuple(cheap_engines or DEFAULT_CHEAP_ENGINES)
+        self.sample_interval = sample_interval
+        self.in_flight = 0
+        self.loop_lag_ms = 0.0
+        self._last_mode = DegradeMode.NORMAL
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        启动事件循环延迟采样协程
+        """
+        if self.enabled and self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor_loop())
+
+    def stop(self) -> None:
+        """
+        停止事件循环延迟采样协程
+        """
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+
+    async def _monitor_loop(self) -> None:
+        """
+        周期性测量 sleep 的实际唤醒延迟，作为事件循环拥塞程度的指标
+        """
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.sample_interval)
+            lag_ms = max(0.0, (time.perf_counter() - start - self.sample_interval) * 1000)
+            # 指数滑动平均，避免单次抖动导致模式频繁切换
+            self.loop_lag_ms = self.loop_lag_ms * 0.7 + lag_ms * 0.3
+            self._check_transition()
+
+    @property
+    def mode(self) -> DegradeMode:
+        """
+        当前降级模式
+
+        返回:
+            DegradeMode: 队列深度与事件循环延迟两者中较重的降级等级
+        """
+        if not self.enabled:
+            return DegradeMode.NORMAL
+        level = max(
+            _level_for(self.in_flight, self.depth_thresholds),
+            _level_for(self.loop_lag_ms, self.lag_thresholds_ms),
+        )
+        return DegradeMode(min(level, DegradeMode.CHEAP_ONLY))
+
+    def _check_transition(self) -> None:
+        """
+        检测模式变化并记录日志
+        """
+        mode = self.mode
+        if mode != self._last_mode:
+            logger.warning(
+                f"[LoadShedder] 降级模式切换: {self._last_mode.name} -> {mode.name} "
+                f"(并发 {self.in_flight}, 循环延迟 {self.loop_lag_ms:.0f}ms)"
+            )
+            self._last_mode = mode
+
+    @asynccontextmanager
+    async def track(self) -> AsyncIterator[DegradeMode]:
+        """
+        登记一次搜索的执行区间
+
+        返回:
+            AsyncIterator[DegradeMode]: 进入时的降级模式
+        """
+        self.in_flight += 1
+        self._check_transition()
+        try:
+            yield self.mode
+        finally:
+            self.in_flight -= 1
+            self._check_transition()
+
+    def allows_engine(self, engine: str, mode: Optional[DegradeMode] = None) -> bool:
+        """
+        判断在指定模式下是否允许使用某个引擎
+
+        参数:
+            engine: 引擎名称
+            mode: 降级模式，默认为当前模式
+
+        返回:
+            bool: 允许则为True
+        """
+        mode = self.mode if mode is None else mode
+        return mode < DegradeMode.CHEAP_ONLY or engine in self.cheap_engines
+
+    def timeout_for(self, default: float, mode: Optional[DegradeMode] = None) -> float:
+        """
+        获取当前模式下应使用的请求超时
+
+        参数:
+            default: 正常模式下的超时（秒）
+            mode: 降级模式，默认为当前模式
+
+        返回:
+            float: 请求超时（秒）
+        """
+        mode = self.mode if mode is None else mode
+        if mode >= DegradeMode.SHORT_TIMEOUT:
+            return min(default, self.short_timeout)
+        return default
+
+    def describe(self) -> str:
+        """
+        生成当前降级状态的可读描述，供管理员查看
+
+        返回:
+            str: 状态描述文本
+        """
+        mode = self.mode
+        lines = [
+            f"降级模式: {mode.name} ({MODE_DESCRIPTIONS[mode]})",
+            f"自动降级: {'启用' if self.enabled else '停用'}",
+            f"进行中的搜索: {self.in_flight} (阈值 {', '.join(map(str, self.depth_thresholds))})",
+            f"事件循环延迟: {self.loop_lag_ms:.0f}ms (阈值 {', '.join(f'{v:.0f}' for v in self.lag_thresholds_ms)})",
+        ]
+        if mode >= DegradeMode.CHEAP_ONLY:
+            lines.append(f"当前可用引擎: {', '.join(self.cheap_engines)}")
+        return "\n".join(lines)
@@ -0,0 +1,424 @@
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+from httpx import AsyncClient
+from astrbot.api import logger
+from . import cpu_tasks
+from .executors import run_cpu, run_io
+from .ext_tools import json_dumps, json_loads
+from .fusion import FUSION_ENGINE
+from .image_handle import ImageHandle
+from .rerank import fetch_thumbnails
+from .search_hit import SearchHit
+from .url_guard import UrlGuard
+
+np = cpu_tasks.np
+
+DEFAULT_INDEX_DIR = Path("data/plugins/img_rev_searcher/local_index")
+# 本地索引结果在结果图标题中显示的引擎名称
+LOCAL_ENGINE = "local"
+# 直接用本地结果回答要求近乎相同的图像，阈值比缩略图重排严格
+DEFAULT_MAX_DISTANCE = 6
+DEFAULT_MAX_RESULTS = 5
+# 查询图像只与相似度不低于该值的结果建立对应（即已确定来源）
+DEFAULT_MIN_SIMILARITY = 85.0
+DEFAULT_RECORD_RESULTS = 3
+# 每次搜索最多下载并索引的结果缩略图数，0 表示只索引查询图像
+DEFAULT_RECORD_THUMBNAILS = 5
+DEFAULT_MAX_ENTRIES = 500_000
+# 返回作品来源链接的引擎：只记录这些引擎的结果，也只对这些引擎（及合并搜索）直接用本地结果回答；
+# TraceMoe、AnimeTrace 等返回番剧集数、角色等其他类型的结果，不能用来源链接代替
+DEFAULT_LOCAL_ENGINES = ("saucenao", "iqdb", "ascii2d")
+# 超过上限这么多倍时在写入后自动整理
+AUTO_COMPACT_RATIO = 1.1
+THUMBNAIL_BYTE_BUDGET = 1024 * 1024
+THUMBNAIL_TIME_BUDGET = 5.0
+SCAN_CHUNK = 1 << 20
+
+HASH_FILE = "hashes.u64"
+DB_FILE = "entries.sqlite3"
+ORIGIN_QUERY = "query"
+ORIGIN_THUMBNAIL = "thumbnail"
+_SIGN_BIT = 1 << 63
+
+
+def _to_signed(value: int) -> int:
+    # SQLite 整数为有符号64位
+    return value - (1 << 64) if value >= _SIGN_BIT else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+@lru_cache(maxsize=1)
+def _popcount_table() -> Any:
+    return np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def _popcount(values: Any) -> Any:
+    """
+    逐元素统计 uint64 数组中置位的比特数
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _popcount_table()[values.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.uint8)
+
+
+class LocalIndex:
+    """
+    本地离线以图搜图索引
+
+    保存历史搜索中已确定来源的图像（查询图像与结果缩略图）的64位感知哈希及对应结果。
+    结果记录保存在 SQLite 中，作为唯一数据源；哈希按记录顺序另存为连续的 uint64 文件，
+    查询时以内存映射方式读取并暴力计算汉明距离（百万条约十毫秒），哈希文件随时可由数据库重建。
+    数据库读写与扫描都是阻塞操作，异步接口统一放到I/O线程池执行
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_INDEX_DIR,
+        max_distance: int = DEFAULT_MAX_DISTANCE,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+        record_thumbnails: int = DEFAULT_RECORD_THUMBNAILS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        engines: Iterable[str] = DEFAULT_LOCAL_ENGINES,
+    ):
+        """
+        初始化本地索引
+
+        参数:
+            path: 索引目录
+            max_distance: 视为命中的最大汉明距离(0-64)
+            max_results: 命中时最多返回的结果数
+            min_similarity: 查询图像与结果建立对应所需的最低相似度
+            record_thumbnails: 每次搜索最多索引的结果缩略图数
+            max_entries: 最多保存的条目数，整理时删除最早的条目
+            engines: 记录结果并可用本地结果回答的引擎
+        """
+        self.path = Path(path)
+        self.max_distance = max_distance
+        self.max_results = max_results
+        self.min_similarity = min_similarity
+        self.record_thumbnails = record_thumbnails
+        self.max_entries = max_entries
+        self.engines = set(engines)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._map: Optional[Any] = None
+        self._count = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def available(self) -> bool:
+        """
+        是否可用（需要安装 numpy）
+        """
+        return np is not None
+
+    def applies_to(self, engine: str) -> bool:
+        """
+        判断该引擎的搜索能否直接用本地结果回答
+
+        参数:
+            engine: 引擎名称（合并搜索为 FUSION_ENGINE）
+
+        返回:
+            bool: 可以用本地结果回答时返回True
+        """
+        return self.available and (engine == FUSION_ENGINE or engine in self.engines)
+
+    def records(self, engine: str) -> bool:
+        """
+        判断是否记录该引擎的结果
+
+        参数:
+            engine: 引擎名称
+
+        返回:
+            bool: 需要记录时返回True
+        """
+        return self.available and engine in self.engines
+
+    @property
+    def _hash_path(self) -> Path:
+        return self.path / HASH_FILE
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        打开（必要时创建）数据库，并在哈希文件与数据库不一致时重建，需在持有锁时调用
+        """
+        if self._conn is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path / DB_FILE), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "pos INTEGER PRIMARY KEY, hash INTEGER NOT NULL, origin TEXT NOT NULL, "
+                "url TEXT NOT NULL, hit TEXT NOT NULL, added REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS entries_hash_url ON entries (hash, url)")
+            count, last = self._conn.execute("SELECT COUNT(*), MAX(pos) FROM entries").fetchone()
+            self._count = count
+            size = self._hash_path.stat().st_size if self._hash_path.exists() else 0
+            if (last is not None and last + 1 != count) or size != count * 8:
+                logger.warning(f"[LocalIndex] 哈希文件与数据库不一致，正在重建 ({size // 8}/{count} 条)")
+                self._rebuild_locked()
+        return self._conn
+
+    def _hashes(self) -> Optional[Any]:
+        """
+        以内存映射方式打开哈希文件，需在持有锁时调用
+        """
+        if self._count == 0:
+            return None
+        if self._map is None:
+            self._map = np.memmap(self._hash_path, dtype="<u8", mode="r", shape=(self._count,))
+        return self._map
+
+    def _rebuild_locked(self) -> None:
+        """
+        按数据库记录重新编号并重写哈希文件，需在持有锁时调用
+        """
+        conn = self._conn
+        last = conn.execute("SELECT MAX(pos) FROM entries").fetchone()[0]
+        if last is not None and last + 1 != self._count:
+            # 编号存在空洞时按原顺序重新编号，先取负避免与新编号冲突
+            old = [row[0] for row in conn.execute("SELECT pos FROM entries ORDER BY pos")]
+            with conn:
+                conn.execute("UPDATE entries SET pos = -1 - pos")
+                conn.executemany("UPDATE entries SET pos = ? WHERE pos = ?", ((new, -1 - pos) for new, pos in enumerate(old)))
+        self._map = None
+        tmp = self._hash_path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            cursor = conn.execute("SELECT hash FROM entries ORDER BY pos")
+            while True:
+                rows = cursor.fetchmany(SCAN_CHUNK)
+                if not rows:
+                    break
+                f.write(np.array([_to_unsigned(row[0]) for row in rows], dtype="<u8").tobytes())
+        os.replace(tmp, self._hash_path)
+
+    def lookup_sync(self, value: int) -> list[SearchHit]:
+        """
+        查找与给定哈希相近的已索引图像（同步）
+
+        参数:
+            value: 查询图像的64位感知哈希
+
+        返回:
+            list[SearchHit]: 按距离升序排列的结果，extra 中记录 distance 与 origin；未命中时为空列表
+        """
+        with self._lock:
+            self._connect()
+            hashes = self._hashes()
+            if hashes is None:
+                self.misses += 1
+                return []
+            target = np.uint64(value)
+            positions, distances = [], []
+            for start in range(0, len(hashes), SCAN_CHUNK):
+                chunk = _popcount(hashes[start:start + SCAN_CHUNK] ^ target)
+                found = np.flatnonzero(chunk <= self.max_distance)
+                positions.append(found + start)
+                distances.append(chunk[found])
+            positions, distances = np.concatenate(positions), np.concatenate(distances)
+            # 同一来源常有多条相近哈希，多取一些候选再按链接去重
+            keep = self.max_results * 4
+            if len(positions) > keep:
+                nearest = np.argpartition(distances, keep)[:keep]
+                positions, distances = positions[nearest], distances[nearest]
+            found_distances = dict(zip(positions.tolist(), distances.tolist()))
+            rows = []
+            if found_distances:
+                placeholders = ",".join("?" * len(found_distances))
+                rows = self._conn.execute(
+                    f"SELECT pos, origin, hit FROM entries WHERE pos IN ({placeholders})", list(found_distances)
+                ).fetchall()
+            if rows:
+                self.hits += 1
+            else:
+                self.misses += 1
+        best: dict[str, SearchHit] = {}
+        for pos, origin, data in sorted(rows, key=lambda row: found_distances[row[0]]):
+            hit = SearchHit.from_dict(json_loads(data))
+            # 跳过已不在记录范围内的引擎留下的条目
+            if hit.url in best or hit.engine not in self.engines:
+                continue
+            hit.extra = {"distance": found_distances[pos], "origin": origin}
+            best[hit.url] = hit
+        return sorted(best.values(), key=lambda h: (h.extra["distance"], -(h.similarity or 0)))[:self.max_results]
+
+    def add_sync(self, entries: Iterable[tuple[int, str, SearchHit]]) -> int:
+        """
+        写入索引条目，已存在的 (哈希, 链接) 组合会被跳过（同步）
+
+        参数:
+            entries: (64位感知哈希, 来源 query/thumbnail, 对应结果) 列表
+
+        返回:
+            int: 新写入的条目数
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            added = []
+            with conn:
+                for value, origin, hit in entries:
+                    record = SearchHit(
+                        hit.engine, hit.similarity, hit.url, hit.title, hit.author, hit.thumbnail
+                    ).to_dict()
+                    del record["extra"]
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO entries (pos, hash, origin, url, hit, added) VALUES (?, ?, ?, ?, ?, ?)",
+                        (self._count + len(added), _to_signed(value), origin, hit.url, json_dumps(record), now),
+                    )
+                    if cursor.rowcount == 1:
+                        added.append(value)
+            if added:
+                # 先提交数据库再追加哈希文件：中途失败时下次打开会按数据库重建
+                with open(self._hash_path, "ab") as f:
+                    f.write(np.array(added, dtype="<u8").tobytes())
+                self._count += len(added)
+                self._map = None
+            if self._count > self.max_entries * AUTO_COMPACT_RATIO:
+                self._compact_locked()
+        return len(added)
+
+    def _compact_locked(self) -> int:
+        """
+        删除超出上限的最早条目、重新编号并重写哈希文件，需在持有锁时调用
+        """
+        conn = self._connect()
+        removed = max(0, self._count - self.max_entries)
+        if removed:
+            with conn:
+                conn.execute("DELETE FROM entries WHERE pos < ?", (removed,))
+                conn.execute("UPDATE entries SET pos = pos - ?", (removed,))
+            self._count -= removed
+        self._rebuild_locked()
+        conn.execute("VACUUM")
+        logger.info(f"[LocalIndex] 整理完成，删除 {removed} 条，剩余 {self._count} 条")
+        return removed
+
+    def compact_sync(self) -> int:
+        """
+        整理索引：删除超出上限的最早条目，按数据库重建哈希文件并回收空间（同步）
+
+        返回:
+            int: 删除的条目数
+        """
+        with self._lock:
+            return self._compact_locked()
+
+    async def compact(self) -> int:
+        """
+        整理索引
+
+        返回:
+            int: 删除的条目数
+        """
+        return await run_io(self.compact_sync)
+
+    async def lookup(self, image: ImageHandle) -> list[SearchHit]:
+        """
+        在本地索引中查找与图像近乎相同的已知来源
+
+        参数:
+            image: 查询图像
+
+        返回:
+            list[SearchHit]: 命中的结果，未命中或无法计算哈希时为空列表
+        """
+        value = await image.phash()
+        if value is None:
+            return []
+        return await run_io(self.lookup_sync, value)
+
+    async def record(
+        self,
+        image: ImageHandle,
+        hits: Iterable[SearchHit],
+        client: Optional[AsyncClient] = None,
+        guard: Optional[UrlGuard] = None,
+    ) -> int:
+        """
+        将一次搜索的结果写入索引
+
+        查询图像只与相似度达到 min_similarity 的结果建立对应；提供 client 时还会在预算内
+        下载排在前面的结果缩略图，以缩略图的哈希索引对应结果
+
+        参数:
+            image: 查询图像
+            hits: 搜索结果记录（按排名排列）
+            client: 下载缩略图使用的HTTP客户端，None 表示不索引缩略图
+            guard: URL安全检查器
+
+        返回:
+            int: 新写入的条目数
+        """
+        resolved, thumbnailed = [], []
+        for hit in hits:
+            if not hit.url:
+                continue
+            if hit.similarity is not None and hit.similarity >= self.min_similarity and len(resolved) < DEFAULT_RECORD_RESULTS:
+                resolved.append(hit)
+            if hit.thumbnail.startswith(("http://", "https://")) and len(thumbnailed) < self.record_thumbnails:
+                thumbnailed.append(hit)
+            if len(resolved) >= DEFAULT_RECORD_RESULTS and len(thumbnailed) >= self.record_thumbnails:
+                break
+        if client is None:
+            thumbnailed = []
+        if not resolved and not thumbnailed:
+            return 0
+        thumbnails = await fetch_thumbnails(
+            client,
+            [hit.thumbnail for hit in thumbnailed],
+            byte_budget=THUMBNAIL_BYTE_BUDGET,
+            time_budget=THUMBNAIL_TIME_BUDGET,
+            guard=guard,
+        ) if thumbnailed else []
+        query_hash = await image.phash() if resolved else None
+        values = await run_cpu(cpu_tasks.phash_values, thumbnails) if thumbnails else []
+        entries = []
+        if query_hash is not None:
+            entries.extend((query_hash, ORIGIN_QUERY, hit) for hit in resolved)
+        entries.extend(
+            (value, ORIGIN_THUMBNAIL, hit) for value, hit in zip(values, thumbnailed) if value is not None
+        )
+        if not entries:
+            return 0
+        return await run_io(self.add_sync, entries)
+
+    def close(self) -> None:
+        """
+        关闭数据库连接与哈希文件映射
+        """
+        with self._lock:
+            self._map = None
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def describe(self) -> str:
+        """
+        生成索引状态文本，供管理员查看
+
+        返回:
+            str: 状态文本
+        """
+        if not self.available:
+            return "本地索引: 未安装 numpy，已停用"
+        total = self.hits + self.misses
+        ratio = f"{self.hits / total * 100:.0f}%" if total else "-"
+        return (
+            f"本地索引: {self._count if self._conn is not None else '未加载'}/{self.max_entries} 条, "
+            f"引擎 {', '.join(sorted(self.engines)) or '无'}, 距离阈值 {self.max_distance}, "
+            f"命中 {self.hits}, 未命中 {self.misses}, 命中率 {ratio}"
+        )
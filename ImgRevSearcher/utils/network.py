@@ -1,7 +1,10 @@
-from dataclasses import dataclass
 from types import TracebackType
-from typing import Any, Optional, Union
-from httpx import AsyncClient, QueryParams, create_ssl_context
+from typing import Any, Mapping, Optional, Union
+from urllib.parse import urljoin
+from httpx import AsyncClient, AsyncHTTPTransport, Limits, QueryParams, Response, create_ssl_context
+from .ext_tools import json_loads, sniff_image_format
+from .url_guard import DEFAULT_GUARD, UnsafeURLError, UrlGuard
+from .transport import CURL_CFFI, HTTPX, AsyncTransport, CurlCffiTransport, HttpxTransport, charset_from_headers
 
 DEFAULT_HEADERS = {
     "User-Agent": (
@@ -11,6 +14,142 @@ DEFAULT_HEADERS = {
     )
 }
 
+DEFAULT_MAX_DOWNLOAD_BYTES = 20 * 1024 * 1024
+# 下载图片时直接拒绝的 Content-Type 前缀（错误页、接口报错等）
+REJECTED_CONTENT_TYPES = ("text/", "application/json", "application/xml", "application/javascript")
+SNIFF_BYTES = 32
+MAX_REDIRECTS = 5
+# 共享客户端的空闲连接保留时间（秒），配合预热探测保持连接
+DEFAULT_KEEPALIVE_EXPIRY = 300
+
+
+def parse_cookies(cookies: Union[str, dict, None]) -> dict[str, str]:
+    """
+    解析Cookie配置
+
+    参数:
+        cookies: "k1=v1; k2=v2" 形式的字符串或字典
+
+    返回:
+        dict[str, str]: Cookie字典
+    """
+    if not cookies:
+        return {}
+    if isinstance(cookies, dict):
+        return {str(k): str(v) for k, v in cookies.items()}
+    return {k.strip(): v for k, v in (c.strip().split("=", 1) for c in cookies.split(";") if "=" in c)}
+
+
+class DownloadRejected(ValueError):
+    """
+    下载被拒绝异常
+
+    响应状态、大小或内容类型不符合要求时抛出，此时响应体不会被完整下载
+    """
+
+
+async def _read_limited(resp: Response, max_bytes: int, require_image: bool) -> bytes:
+    """
+    读取响应体，同时检查状态码、大小与内容类型
+
+    参数:
+        resp: 以流式方式打开的响应
+        max_bytes: 允许下载的最大字节数
+        require_image: 是否要求内容为图片
+
+    返回:
+        bytes: 响应体内容
+
+    异常:
+        DownloadRejected: 状态码、大小或内容类型不符合要求时抛出
+    """
+    if resp.status_code >= 400:
+        raise DownloadRejected(f"下载失败: HTTP {resp.status_code}")
+    content_type = resp.headers.get("content-type", "").split(";")[0].strip().lower()
+    if require_image and content_type.startswith(REJECTED_CONTENT_TYPES):
+        raise DownloadRejected(f"内容类型不是图片: {content_type}")
+    length_header = resp.headers.get("content-length", "")
+    expected = int(length_header) if length_header.isdigit() else None
+    if expected is not None and expected > max_bytes:
+        raise DownloadRejected(f"文件过大: {expected} 字节 (上限 {max_bytes})")
+    # 压缩传输时 Content-Length 为压缩后大小，不能用于预分配
+    preallocate = expected if expected is not None and "content-encoding" not in resp.headers else 0
+    buffer = bytearray(preallocate)
+    size = 0
+    sniffed = not require_image
+    async for chunk in resp.aiter_bytes():
+        end = size + len(chunk)
+        if end > max_bytes:
+            raise DownloadRejected(f"文件过大: 超过 {max_bytes} 字节")
+        buffer[size:end] = chunk
+        size = end
+        if not sniffed and size >= SNIFF_BYTES:
+            if sniff_image_format(bytes(buffer[:SNIFF_BYTES])) is None:
+                raise DownloadRejected("内容不是可识别的图片格式")
+            sniffed = True
+    if not sniffed and sniff_image_format(bytes(buffer[:size])) is None:
+        raise DownloadRejected("内容不是可识别的图片格式")
+    if size < len(buffer):
+        del buffer[size:]
+    return bytes(buffer)
+
+
+async def stream_download(
+    client: AsyncClient,
+    url: str,
+    headers: Optional[dict[str, str]] = None,
+    max_bytes: int = DEFAULT_MAX_DOWNLOAD_BYTES,
+    require_image: bool = True,
+    guard: Optional[UrlGuard] = None,
+    **kwargs: Any,
+) -> bytes:
+    """
+    流式下载文件
+
+    先检查 Content-Length 与 Content-Type，再根据首个数据块的魔数判断是否为图片，
+    超过大小上限立即中止；已知长度时写入一次性预分配的缓冲区
+
+    提供 guard 时，每一跳（含重定向）都先经过URL安全检查，并直接连接检查时解析到的IP，
+    不会再次解析域名
+
+    参数:
+        client: HTTP客户端实例
+        url: 下载URL
+        headers: 自定义HTTP头部
+        max_bytes: 允许下载的最大字节数
+        require_image: 是否要求内容为图片
+        guard: URL安全检查器（可选）
+        **kwargs: 其他请求参数（如 timeout）
+
+    返回:
+        bytes: 下载的文件内容
+
+    异常:
+        DownloadRejected: 状态码、大小、内容类型不符合要求或URL不安全时抛出
+    """
+    if guard is None:
+        async with client.stream("GET", url, headers=headers, **kwargs) as resp:
+            return await _read_limited(resp, max_bytes, require_image)
+    kwargs.pop("follow_redirects", None)
+    for _ in range(MAX_REDIRECTS + 1):
+        try:
+            target = await guard.check(url)
+        except UnsafeURLError as e:
+            raise DownloadRejected(str(e)) from e
+        async with client.stream(
+            "GET",
+            target.pinned_url,
+            headers={**(headers or {}), **target.request_headers},
+            extensions=target.request_extensions or None,
+            follow_redirects=False,
+            **kwargs,
+        ) as resp:
+            if resp.is_redirect:
+                url = urljoin(url, resp.headers["location"])
+                continue
+            return await _read_limited(resp, max_bytes, require_image)
+    raise DownloadRejected(f"重定向次数超过 {MAX_REDIRECTS} 次")
+
 
 class Network:
     """
@@ -29,6 +168,8 @@ class Network:
         timeout: float = 30,
         verify_ssl: bool = True,
         http2: bool = False,
+        proxy_mounts: Optional[dict[str, Optional[str]]] = None,
+        keepalive_expiry: Optional[float] = None,
     ):
         """
         初始化网络客户端
@@ -41,21 +182,30 @@ class Network:
             timeout: 请求超时时间(秒)
             verify_ssl: 是否验证SSL证书
             http2: 是否启用HTTP/2
+            proxy_mounts: 按主机覆盖代理，键为 httpx URL 匹配模式（如 "all://*.baidu.com"），
+                值为代理地址，None 表示直连
+            keepalive_expiry: 空闲连接保留时间(秒)，默认使用 httpx 的设置
         """
         self.internal: bool = internal
         headers = {**DEFAULT_HEADERS, **(headers or {})}
-        self.cookies: dict[str, str] = {}
-        if cookies:
-            self.cookies = {k.strip(): v for k, v in (c.strip().split("=", 1) 
-                           for c in cookies.split(";") if "=" in c)}
+        self.cookies: dict[str, str] = parse_cookies(cookies)
         ssl_context = create_ssl_context(verify=verify_ssl)
         ssl_context.set_ciphers("DEFAULT")
+        limits = Limits() if keepalive_expiry is None else Limits(keepalive_expiry=keepalive_expiry)
+        mounts = None
+        if proxy_mounts:
+            mounts = {
+                pattern: AsyncHTTPTransport(proxy=proxy, verify=ssl_context, http2=http2, limits=limits)
+                for pattern, proxy in proxy_mounts.items()
+            }
         self.client: AsyncClient = AsyncClient(
             headers=headers,
             cookies=self.cookies,
             verify=ssl_context,
             http2=http2,
             proxy=proxies,
+            mounts=mounts,
+            limits=limits,
             timeout=timeout,
             follow_redirects=True,
         )
@@ -101,6 +251,86 @@ class Network:
         await self.client.aclose()
 
 
+class ClientPool:
+    """
+    共享客户端池
+
+    按网络配置（代理、Cookie、超时等）复用长期存活的 Network 实例与各后端传输层，
+    同一配置的请求共享连接池，空闲连接保留较长时间以便复用
+    """
+
+    def __init__(self, keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY):
+        """
+        初始化客户端池
+
+        参数:
+            keepalive_expiry: 空闲连接保留时间(秒)
+        """
+        self.keepalive_expiry = keepalive_expiry
+        self._clients: dict[str, Network] = {}
+        self._transports: dict[str, AsyncTransport] = {}
+
+    @staticmethod
+    def _key(network_kwargs: dict[str, Any]) -> str:
+        return repr(sorted((k, repr(v)) for k, v in network_kwargs.items() if v is not None))
+
+    def get(self, **network_kwargs: Any) -> AsyncClient:
+        """
+        获取（必要时创建）与配置对应的共享客户端
+
+        参数:
+            **network_kwargs: Network 构造参数
+
+        返回:
+            AsyncClient: HTTP客户端实例
+        """
+        key = self._key(network_kwargs)
+        network = self._clients.get(key)
+        if network is None:
+            network = self._clients[key] = Network(keepalive_expiry=self.keepalive_expiry, **network_kwargs)
+        return network.start()
+
+    def transport(self, backend: str = HTTPX, **network_kwargs: Any) -> AsyncTransport:
+        """
+        获取（必要时创建）与配置对应的共享传输层
+
+        参数:
+            backend: 传输后端，"httpx" 或 "curl_cffi"
+            **network_kwargs: Network 构造参数（curl_cffi 后端不支持按主机覆盖代理）
+
+        返回:
+            AsyncTransport: 传输层实例
+        """
+        key = f"{backend}:{self._key(network_kwargs)}"
+        transport = self._transports.get(key)
+        if transport is None:
+            if backend == CURL_CFFI:
+                transport = CurlCffiTransport(
+                    proxies=network_kwargs.get("proxies"),
+                    cookies=parse_cookies(network_kwargs.get("cookies")),
+                    timeout=network_kwargs.get("timeout", 30),
+                    verify_ssl=network_kwargs.get("verify_ssl", True),
+                )
+            else:
+                transport = HttpxTransport(self.get(**network_kwargs))
+            self._transports[key] = transport
+        return transport
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def aclose(self) -> None:
+        """
+        关闭所有共享客户端与传输层
+        """
+        transports, self._transports = list(self._transports.values()), {}
+        for transport in transports:
+            await transport.aclose()
+        clients, self._clients = list(self._clients.values()), {}
+        for network in clients:
+            await network.close()
+
+
 class ClientManager:
     """
     客户端管理器类
@@ -167,25 +397,84 @@ class ClientManager:
             await self.client.close()
 
 
-@dataclass
 class RESP:
     """
-    HTTP响应数据类
+    HTTP响应对象
     
-    简化的HTTP响应表示，包含文本内容、URL和状态码
+    保留原始响应字节；文本、JSON与响应头字典在首次访问时才解码，
+    解析器可直接使用 content，省去整页的字符集解码与复制
     """
-    text: str
-    url: str
-    status_code: int
-    headers: dict = None
+    __slots__ = ("content", "url", "status_code", "encoding", "_raw_headers", "_headers", "_text")
+
+    def __init__(
+        self,
+        content: bytes,
+        url: str,
+        status_code: int,
+        headers: Optional[Mapping[str, str]] = None,
+        encoding: Optional[str] = None,
+    ):
+        """
+        初始化响应对象
+        
+        参数:
+            content: 原始响应字节
+            url: 最终响应URL
+            status_code: HTTP状态码
+            headers: 原始响应头
+            encoding: 文本编码，未指定时使用 Content-Type 中的字符集，默认UTF-8
+        """
+        self.content: bytes = content
+        self.url: str = url
+        self.status_code: int = status_code
+        self.encoding: Optional[str] = encoding
+        self._raw_headers = headers
+        self._headers: Optional[dict[str, str]] = None
+        self._text: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """
+        解码后的响应文本
+        """
+        if self._text is None:
+            encoding = self.encoding or charset_from_headers(self._raw_headers) or "utf-8"
+            try:
+                self._text = self.content.decode(encoding, errors="replace")
+            except LookupError:
+                self._text = self.content.decode("utf-8", errors="replace")
+        return self._text
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """
+        响应头字典
+        """
+        if self._headers is None:
+            self._headers = dict(self._raw_headers) if self._raw_headers else {}
+        return self._headers
+
+    def json(self) -> Any:
+        """
+        将响应内容解析为JSON
+        
+        返回:
+            Any: 解析结果
+            
+        异常:
+            ValueError: 响应不是合法JSON时抛出
+        """
+        return json_loads(self.content)
 
 
 class HandOver:
     """
     HTTP请求转发类
     
-    提供简化的HTTP请求接口，支持GET、POST和下载操作
+    提供简化的HTTP请求接口，支持GET、POST和下载操作；
+    GET/POST 经由传输层发送，子类通过 transport_backend 声明所需的后端
     """
+    transport_backend: str = HTTPX
     
     def __init__(
         self,
@@ -196,6 +485,9 @@ class HandOver:
         timeout: float = 30,
         verify_ssl: bool = True,
         http2: bool = False,
+        max_download_bytes: int = DEFAULT_MAX_DOWNLOAD_BYTES,
+        url_guard: Optional[UrlGuard] = DEFAULT_GUARD,
+        transport: Optional[AsyncTransport] = None,
     ):
         """
         初始化HTTP请求转发器
@@ -208,6 +500,9 @@ class HandOver:
             timeout: 请求超时时间(秒)
             verify_ssl: 是否验证SSL证书
             http2: 是否启用HTTP/2
+            max_download_bytes: download() 允许下载的最大字节数
+            url_guard: download() 使用的URL安全检查器，None 表示不检查
+            transport: 共享的传输层实例，未提供时按 transport_backend 自行创建
         """
         self.client: Optional[AsyncClient] = client
         self.proxies: Optional[str] = proxies
@@ -216,6 +511,8 @@ class HandOver:
         self.timeout: float = timeout
         self.verify_ssl: bool = verify_ssl
         self.http2: bool = http2
+        self.max_download_bytes: int = max_download_bytes
+        self.url_guard: Optional[UrlGuard] = url_guard
         # 创建一个单一的ClientManager实例
         self.client_manager = ClientManager(
             self.client,
@@ -228,6 +525,28 @@ class HandOver:
         )
         self._client_initialized = False
         self._managed_client = None
+        self.transport: Optional[AsyncTransport] = transport
+        self._shared_transport = transport is not None
+
+    async def _get_transport(self) -> AsyncTransport:
+        """
+        获取传输层实例
+
+        返回:
+            AsyncTransport: 传输层实例
+        """
+        if self.transport is None:
+            if self.transport_backend == CURL_CFFI:
+                self.transport = CurlCffiTransport(
+                    proxies=self.proxies,
+                    headers=self.headers,
+                    cookies=parse_cookies(self.cookies),
+                    timeout=self.timeout,
+                    verify_ssl=self.verify_ssl,
+                )
+            else:
+                self.transport = HttpxTransport(await self._get_client())
+        return self.transport
 
     async def _get_client(self) -> AsyncClient:
         """
@@ -245,6 +564,11 @@ class HandOver:
         """
         关闭HTTP客户端连接
         """
+        if not self._shared_transport and self.transport is not None:
+            # 自行创建的 httpx 传输层只是包装了客户端，客户端由 client_manager 关闭
+            if self.transport.backend == CURL_CFFI:
+                await self.transport.aclose()
+            self.transport = None
         if self._client_initialized:
             await self.client_manager.__aexit__(None, None, None)
             self._client_initialized = False
@@ -290,9 +614,9 @@ class HandOver:
         返回:
             RESP: 简化的HTTP响应对象
         """
-        client = await self._get_client()
-        resp = await client.get(url, params=params, headers=headers, **kwargs)
-        return RESP(resp.text, str(resp.url), resp.status_code, dict(resp.headers))
+        transport = await self._get_transport()
+        resp = await transport.request("GET", url, params=params, headers=headers, **kwargs)
+        return RESP(resp.content, resp.url, resp.status_code, resp.headers)
 
     async def post(
         self,
@@ -319,8 +643,9 @@ class HandOver:
         返回:
             RESP: 简化的HTTP响应对象
         """
-        client = await self._get_client()
-        resp = await client.post(
+        transport = await self._get_transport()
+        resp = await transport.request(
+            "POST",
             url,
             params=params,
             headers=headers,
@@ -329,7 +654,7 @@ class HandOver:
             json=json,
             **kwargs,
         )
-        return RESP(resp.text, str(resp.url), resp.status_code, dict(resp.headers))
+        return RESP(resp.content, resp.url, resp.status_code, resp.headers)
 
     async def download(self, url: str, headers: Optional[dict[str, str]] = None) -> bytes:
         """
@@ -341,7 +666,11 @@ class HandOver:
             
         返回:
             bytes: 下载的文件内容
+            
+        异常:
+            DownloadRejected: 文件过大、不是图片或URL不安全时抛出
         """
         client = await self._get_client()
-        resp = await client.get(url, headers=headers)
-        return resp.read()
+        return await stream_download(
+            client, url, headers=headers, max_bytes=self.max_download_bytes, guard=self.url_guard
+        )
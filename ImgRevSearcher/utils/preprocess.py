@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+# 满足配置时可直接上传原图的格式（GIF 需要取第一帧，BMP 体积过大）
+PASSTHROUGH_FORMATS = {"jpeg", "png", "webp"}
+
+
+@dataclass(frozen=True)
+class UploadProfile:
+    """
+    引擎上传前的图像预处理配置
+
+    原图格式可直接上传、最长边不超过 max_side 且不超过 max_bytes 时直接上传原图；
+    否则取第一帧、按EXIF方向旋转、缩小到最长边不超过 max_side，并去除元数据重新编码为JPEG。
+    gate_by_bytes 为 True 时只按体积判断，不超过 max_bytes 的原图不论尺寸都直接上传。
+    max_side 与 max_bytes 都为 0 时只转换不支持的格式，其余图像总是上传原文件
+    """
+    # 最长边上限(像素)，0 表示不限制
+    max_side: int
+    # JPEG质量
+    quality: int = 90
+    # 可直接上传原图的最大字节数，0 表示不限制
+    max_bytes: int = 2 * 1024 * 1024
+    # 只按体积决定是否处理
+    gate_by_bytes: bool = False
+
+    def accepts(self, image_format: Optional[str], size: Optional[tuple[int, int]], length: int) -> bool:
+        """
+        判断原图是否无需处理即可上传
+
+        参数:
+            image_format: 由文件头判断的格式
+            size: 图像尺寸，未知时为None
+            length: 原图字节数
+
+        返回:
+            bool: 可直接上传原图时返回True
+        """
+        if image_format not in PASSTHROUGH_FORMATS or size is None:
+            return False
+        within_bytes = not self.max_bytes or length <= self.max_bytes
+        if self.gate_by_bytes:
+            return within_bytes
+        return (not self.max_side or max(size) <= self.max_side) and within_bytes
+
+
+# 未单独配置的引擎使用的配置
+DEFAULT_PROFILE = UploadProfile(2048, 92, gate_by_bytes=True)
+# 各引擎在服务端都会缩小图像后再比对，上传更大的图像只增加上传耗时
+DEFAULT_PROFILES = {
+    "saucenao": UploadProfile(1200, 90, 1024 * 1024),
+    "iqdb": UploadProfile(1200, 90, 1024 * 1024),
+    "tracemoe": UploadProfile(1024, 90, 1024 * 1024),
+    # E-Hentai 文件搜索会先按文件哈希精确匹配，重新编码后无法匹配，始终上传原文件（动图等仍会转换）
+    "ehentai": UploadProfile(0, 92, 0),
+    # 以下引擎先上传到 Litterbox 再由引擎按链接下载，尺寸不影响引擎，只在原图过大时缩小
+    "ascii2d": UploadProfile(2048, 92, gate_by_bytes=True),
+    "yandex": UploadProfile(2048, 92, gate_by_bytes=True),
+    "google": UploadProfile(2048, 92, gate_by_bytes=True),
+    "copyseeker": UploadProfile(2048, 92, gate_by_bytes=True),
+}
+
+
+def parse_profiles(rules: Optional[Iterable[str]], engines: Iterable[str]) -> dict[str, UploadProfile]:
+    """
+    生成各引擎的预处理配置，规则覆盖默认配置
+
+    规则格式为 "引擎=最长边" 或 "引擎=最长边/质量"，最长边为 0 表示不缩小（仍会转换GIF等格式）
+
+    参数:
+        rules: 规则列表
+        engines: 需要生成配置的引擎
+
+    返回:
+        dict[str, UploadProfile]: 引擎名称到预处理配置的映射
+    """
+    profiles = {engine: DEFAULT_PROFILES.get(engine, DEFAULT_PROFILE) for engine in engines}
+    for rule in rules or []:
+        if not rule or "=" not in rule:
+            continue
+        name, value = rule.split("=", 1)
+        name = name.strip().lower()
+        side, _, quality = value.strip().partition("/")
+        base = profiles.get(name, DEFAULT_PROFILE)
+        try:
+            profiles[name] = UploadProfile(
+                max(0, int(side)),
+                min(100, max(1, int(quality))) if quality else base.quality,
+                base.max_bytes,
+                base.gate_by_bytes,
+            )
+        except ValueError:
+            continue
+    return profiles
@@ -0,0 +1,415 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+import httpx
+from httpx import URL
+from curl_cffi.requests import exceptions as curl_exceptions
+from astrbot.api import logger
+from .network import Network
+from .transport import HTTPX
+
+DIRECT = "direct"
+POOL = "pool"
+DEFAULT_CHECK_URL = "https://www.gstatic.com/generate_204"
+# 连接代理或经代理建立连接失败的异常（httpx 与 curl_cffi 后端），可换用其他代理重试
+PROXY_FAILURE_ERRORS: tuple[type[BaseException], ...] = (
+    httpx.ProxyError,
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.RemoteProtocolError,
+    curl_exceptions.ProxyError,
+    curl_exceptions.ConnectionError,
+)
+
+
+@dataclass
+class ProxyState:
+    """
+    代理池中单个代理的状态
+    """
+    url: str
+    healthy: bool = True
+    latency_ms: Optional[float] = None
+    failures: int = 0
+    last_check: float = 0.0
+    last_error: str = ""
+
+
+def is_proxy_failure(error: BaseException) -> bool:
+    """
+    判断异常是否由代理连接失败引起（可换用其他代理重试）
+
+    参数:
+        error: 捕获到的异常
+
+    返回:
+        bool: 属于连接层失败返回True
+    """
+    return isinstance(error, PROXY_FAILURE_ERRORS)
+
+
+class ProxyPool:
+    """
+    带健康检查的代理池
+
+    定期通过每个代理访问探测地址，记录延迟的指数滑动平均；
+    选择代理时在健康代理中按延迟倒数加权随机，连续失败的代理自动剔除，
+    恢复后重新加入
+    """
+
+    def __init__(
+        self,
+        proxies: Iterable[str],
+        check_url: str = DEFAULT_CHECK_URL,
+        check_interval: float = 60,
+        check_timeout: float = 8,
+        max_failures: int = 2,
+    ):
+        """
+        初始化代理池
+
+        参数:
+            proxies: 代理地址列表
+            check_url: 健康检查探测地址
+            check_interval: 健康检查间隔(秒)
+            check_timeout: 单次健康检查超时(秒)
+            max_failures: 连续失败多少次后标记为不可用
+        """
+        self.states: dict[str, ProxyState] = {}
+        for proxy in proxies:
+            proxy = proxy.strip()
+            if proxy and proxy not in self.states:
+                self.states[proxy] = ProxyState(url=proxy)
+        self.check_url = check_url
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.max_failures = max_failures
+        self._check_task: Optional[asyncio.Task] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.states)
+
+    def start(self) -> None:
+        """
+        启动周期性健康检查协程
+        """
+        if self.states and self._check_task is None:
+            self._check_task = asyncio.create_task(self._check_loop())
+
+    def stop(self) -> None:
+        """
+        停止周期性健康检查协程
+        """
+        if self._check_task is not None:
+            self._check_task.cancel()
+            self._check_task = None
+
+    async def _check_loop(self) -> None:
+        """
+        周期性检查所有代理
+        """
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.check_interval)
+
+    async def check_all(self) -> None:
+        """
+        并发检查池中所有代理
+        """
+        await asyncio.gather(*(self._check(state) for state in self.states.values()))
+
+    async def _check(self, state: ProxyState) -> None:
+        """
+        通过代理访问探测地址，更新代理状态
+
+        参数:
+            state: 代理状态
+        """
+        start = time.perf_counter()
+        try:
+            async with Network(proxies=state.url, timeout=self.check_timeout) as client:
+                resp = await client.get(self.check_url)
+            if resp.status_code >= 500:
+                raise RuntimeError(f"HTTP {resp.status_code}")
+        except Exception as e:
+            self.mark_failure(state.url, e)
+        else:
+            self.mark_success(state.url, (time.perf_counter() - start) * 1000)
+        state.last_check = time.monotonic()
+
+    def mark_success(self, proxy: str, latency_ms: Optional[float] = None) -> None:
+        """
+        记录代理请求成功
+
+        参数:
+            proxy: 代理地址
+            latency_ms: 本次请求耗时(毫秒)，可选
+        """
+        state = self.states.get(proxy)
+        if state is None:
+            return
+        if not state.healthy:
+            logger.info(f"[ProxyPool] 代理恢复可用: {proxy}")
+        state.healthy = True
+        state.failures = 0
+        state.last_error = ""
+        if latency_ms is not None:
+            if state.latency_ms is None:
+                state.latency_ms = latency_ms
+            else:
+                state.latency_ms = state.latency_ms * 0.7 + latency_ms * 0.3
+
+    def mark_failure(self, proxy: str, error: Optional[BaseException] = None) -> None:
+        """
+        记录代理请求失败，连续失败达到阈值时标记为不可用
+
+        参数:
+            proxy: 代理地址
+            error: 失败原因，可选
+        """
+        state = self.states.get(proxy)
+        if state is None:
+            return
+        state.failures += 1
+        state.last_error = f"{type(error).__name__}: {error}" if error else ""
+        if state.healthy and state.failures >= self.max_failures:
+            state.healthy = False
+            logger.warning(f"[ProxyPool] 代理不可用，已移出轮换: {proxy} ({state.last_error})")
+
+    def choose(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        """
+        按延迟加权随机选择一个健康代理
+
+        参数:
+            exclude: 本次不再使用的代理（如刚刚失败的代理）
+
+        返回:
+            Optional[str]: 代理地址，无可用代理时返回None
+        """
+        excluded = set(exclude)
+        candidates = [s for s in self.states.values() if s.healthy and s.url not in excluded]
+        if not candidates:
+            # 全部不可用时仍尝试失败次数最少的代理，避免健康检查误判导致完全无法访问
+            candidates = sorted(
+                (s for s in self.states.values() if s.url not in excluded), key=lambda s: s.failures
+            )[:1]
+        if not candidates:
+            return None
+        weights = [1000.0 / max(s.latency_ms or 1000.0, 1.0) for s in candidates]
+        return random.choices(candidates, weights=weights)[0].url
+
+    def describe(self) -> str:
+        """
+        生成代理池状态文本，供管理员查看
+
+        返回:
+            str: 状态文本
+        """
+        lines = [f"代理池: {sum(s.healthy for s in self.states.values())}/{len(self.states)} 可用"]
+        for state in self.states.values():
+            latency = f"{state.latency_ms:.0f}ms" if state.latency_ms is not None else "未测"
+            status = "可用" if state.healthy else f"不可用 ({state.last_error})"
+            lines.append(f"  {state.url}: {status}, 延迟 {latency}")
+        return "\n".join(lines)
+
+
+def parse_rules(rules: Optional[Iterable[str]]) -> dict[str, str]:
+    """
+    解析 "名称=目标" 形式的路由规则
+
+    参数:
+        rules: 规则列表，目标为 direct、pool 或代理地址
+
+    返回:
+        dict[str, str]: 名称(小写) 到目标的映射
+    """
+    parsed = {}
+    for rule in rules or []:
+        if not rule or "=" not in rule:
+            continue
+        name, target = rule.split("=", 1)
+        name, target = name.strip().lower(), target.strip()
+        if name and target:
+            parsed[name] = target
+    return parsed
+
+
+class ProxyRouter:
+    """
+    代理路由
+
+    按引擎、按主机选择直连、指定代理或代理池，未匹配规则时使用默认代理
+    """
+
+    def __init__(
+        self,
+        default: Optional[str] = None,
+        engine_rules: Optional[dict[str, str]] = None,
+        host_rules: Optional[dict[str, str]] = None,
+        pool: Optional[ProxyPool] = None,
+    ):
+        """
+        初始化代理路由
+
+        参数:
+            default: 默认代理地址（direct 或空表示直连，pool 表示使用代理池）
+            engine_rules: 引擎名到目标的映射
+            host_rules: 主机名到目标的映射，同时匹配其子域名
+            pool: 代理池
+        """
+        self.default = default or None
+        self.engine_rules = engine_rules or {}
+        self.host_rules = host_rules or {}
+        self.pool = pool
+
+    def _materialize(self, target: Optional[str], exclude: Iterable[str] = ()) -> Optional[str]:
+        """
+        将路由目标转换为实际代理地址
+
+        参数:
+            target: 路由目标
+            exclude: 从代理池选择时需要排除的代理
+
+        返回:
+            Optional[str]: 代理地址，直连时返回None
+        """
+        if not target or target == DIRECT:
+            return None
+        if target == POOL:
+            return self.pool.choose(exclude) if self.pool else None
+        return target
+
+    def target_for_engine(self, engine: str) -> Optional[str]:
+        """
+        获取引擎的路由目标（未转换为实际代理）
+
+        参数:
+            engine: 引擎名称
+
+        返回:
+            Optional[str]: 路由目标
+        """
+        return self.engine_rules.get(engine, self.default)
+
+    def for_engine(self, engine: str, exclude: Iterable[str] = ()) -> Optional[str]:
+        """
+        获取引擎使用的代理地址
+
+        参数:
+            engine: 引擎名称
+            exclude: 从代理池选择时需要排除的代理
+
+        返回:
+            Optional[str]: 代理地址，直连时返回None
+        """
+        return self._materialize(self.target_for_engine(engine), exclude)
+
+    def for_url(self, url: str) -> Optional[str]:
+        """
+        获取访问某个URL使用的代理地址
+
+        参数:
+            url: 目标URL
+
+        返回:
+            Optional[str]: 代理地址，直连时返回None
+        """
+        try:
+            host = URL(url).host.lower()
+        except Exception:
+            return self._materialize(self.default)
+        return self._materialize(self._host_target(host) or self.default)
+
+    def _host_target(self, host: str) -> Optional[str]:
+        """
+        查找主机匹配的主机规则目标
+
+        参数:
+            host: 主机名(小写)
+
+        返回:
+            Optional[str]: 路由目标，未匹配任何主机规则时返回None
+        """
+        for rule_host, target in self.host_rules.items():
+            if host == rule_host or host.endswith("." + rule_host):
+                return target
+        return None
+
+    def uses_pool(self, engine: str, backend: str = HTTPX) -> bool:
+        """
+        判断引擎的请求是否会经过代理池（引擎规则或任一主机规则指向代理池）
+
+        参数:
+            engine: 引擎名称
+            backend: 引擎使用的传输后端，curl_cffi 后端不支持按主机覆盖代理，主机规则对其不生效
+
+        返回:
+            bool: 会经过代理池时返回True
+        """
+        if not self.pool:
+            return False
+        if self.target_for_engine(engine) == POOL:
+            return True
+        return backend == HTTPX and POOL in self.host_rules.values()
+
+    def routed_through_pool(self, engine: str, error: BaseException, backend: str = HTTPX) -> bool:
+        """
+        判断失败的请求是否确实经过了代理池选定的代理
+
+        httpx 异常带有出错请求的URL，按主机规则判断；无法得知请求URL时按引擎规则判断
+
+        参数:
+            engine: 引擎名称
+            error: 请求抛出的异常
+            backend: 引擎使用的传输后端
+
+        返回:
+            bool: 出错的请求经过代理池时返回True
+        """
+        target = self.target_for_engine(engine)
+        if backend == HTTPX:
+            try:
+                host = error.request.url.host.lower()
+            except (AttributeError, RuntimeError):
+                host = None
+            if host:
+                target = self._host_target(host) or target
+        return target == POOL
+
+    def host_mounts(self, pool_proxy: Optional[str] = None) -> dict[str, Optional[str]]:
+        """
+        生成按主机覆盖代理的 httpx 挂载配置
+
+        指向代理池的主机使用调用方为本次请求选定的 pool_proxy，不在此处随机选择，
+        以免每次生成不同的配置导致共享客户端无法复用
+
+        参数:
+            pool_proxy: 本次请求从代理池选定的代理，None 表示这些主机直连
+
+        返回:
+            dict[str, Optional[str]]: URL 匹配模式到代理地址的映射
+        """
+        mounts = {}
+        for host, target in self.host_rules.items():
+            proxy = pool_proxy if target == POOL else self._materialize(target)
+            mounts[f"all://{host}"] = proxy
+            mounts[f"all://*.{host}"] = proxy
+        return mounts
+
+    def describe(self) -> str:
+        """
+        生成代理路由状态文本，供管理员查看
+
+        返回:
+            str: 状态文本
+        """
+        lines = [f"默认代理: {self.default or DIRECT}"]
+        if self.engine_rules:
+            lines.append("引擎规则: " + ", ".join(f"{k}={v}" for k, v in self.engine_rules.items()))
+        if self.host_rules:
+            lines.append("主机规则: " + ", ".join(f"{k}={v}" for k, v in self.host_rules.items()))
+        if self.pool:
+            lines.append(self.pool.describe())
+        return "\n".join(lines)
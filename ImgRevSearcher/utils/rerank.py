@@ -0,0 +1,233 @@
+import asyncio
+import time
+from typing import Any, Iterable, Optional, Sequence
+from httpx import AsyncClient
+from astrbot.api import logger
+from . import cpu_tasks
+from .executors import run_cpu
+from .image_handle import ImageHandle
+from .network import stream_download
+from .search_hit import SearchHit
+from .url_guard import UrlGuard
+
+# 结果中通常只有缩略图、没有可用相似度的引擎
+DEFAULT_RERANK_ENGINES = ("copyseeker", "yandex", "google")
+DEFAULT_MAX_THUMBNAILS = 30
+DEFAULT_THUMBNAIL_BYTES = 256 * 1024
+DEFAULT_BYTE_BUDGET = 4 * 1024 * 1024
+DEFAULT_TIME_BUDGET = 4.0
+# 64位感知哈希的汉明距离阈值：缩放、重新压缩通常在 10 以内，轻度裁剪约 15-20，无关图像约 32
+DEFAULT_MAX_DISTANCE = 16
+DOWNLOAD_CONCURRENCY = 8
+
+
+async def fetch_thumbnails(
+    client: AsyncClient,
+    urls: Sequence[Optional[str]],
+    max_bytes: int = DEFAULT_THUMBNAIL_BYTES,
+    byte_budget: int = DEFAULT_BYTE_BUDGET,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+    guard: Optional[UrlGuard] = None,
+) -> list[Optional[bytes]]:
+    """
+    在总字节数与总时间预算内并发下载缩略图
+
+    每次下载前从预算中预留 max_bytes（不足时预留剩余部分），完成后退还未用部分；
+    预算用尽或超时后未完成的下载直接放弃
+
+    参数:
+        client: HTTP客户端实例
+        urls: 缩略图链接，None 或非 http(s) 链接会被跳过
+        max_bytes: 单张缩略图的大小上限
+        byte_budget: 全部缩略图的总字节数上限
+        time_budget: 总耗时上限(秒)
+        guard: URL安全检查器（缩略图链接来自第三方页面，应当提供）
+
+    返回:
+        list[Optional[bytes]]: 与 urls 一一对应的缩略图数据，失败、跳过或超出预算时为None
+    """
+    remaining = byte_budget
+    semaphore = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+    deadline = time.monotonic() + time_budget
+
+    async def fetch(url: str) -> Optional[bytes]:
+        nonlocal remaining
+        async with semaphore:
+            timeout = deadline - time.monotonic()
+            if remaining <= 0 or timeout <= 0:
+                return None
+            limit = min(max_bytes, remaining)
+            remaining -= limit
+            data = None
+            try:
+                data = await stream_download(client, url, max_bytes=limit, guard=guard, timeout=timeout)
+            except Exception:
+                pass
+            remaining += limit - (len(data) if data else 0)
+            return data
+
+    tasks: dict[int, asyncio.Task] = {
+        i: asyncio.ensure_future(fetch(url))
+        for i, url in enumerate(urls)
+        if url and url.startswith(("http://", "https://"))
+    }
+    results: list[Optional[bytes]] = [None] * len(urls)
+    if not tasks:
+        return results
+    done, pending = await asyncio.wait(tasks.values(), timeout=time_budget)
+    for task in pending:
+        task.cancel()
+    for i, task in tasks.items():
+        if task in done and not task.cancelled() and task.exception() is None:
+            results[i] = task.result()
+    return results
+
+
+class ThumbnailReranker:
+    """
+    基于缩略图感知哈希的本地重排
+
+    下载结果缩略图，与查询图像比较感知哈希：相近的结果按距离排到最前，
+    明显不同的结果被剔除，无法比较的结果（无缩略图、下载失败）保持原顺序排在其后。
+    不会发起额外的引擎请求
+    """
+
+    def __init__(
+        self,
+        engines: Iterable[str] = DEFAULT_RERANK_ENGINES,
+        max_thumbnails: int = DEFAULT_MAX_THUMBNAILS,
+        max_bytes: int = DEFAULT_THUMBNAIL_BYTES,
+        byte_budget: int = DEFAULT_BYTE_BUDGET,
+        time_budget: float = DEFAULT_TIME_BUDGET,
+        max_distance: int = DEFAULT_MAX_DISTANCE,
+        prune: bool = True,
+    ):
+        """
+        初始化重排器
+
+        参数:
+            engines: 启用重排的引擎
+            max_thumbnails: 每次最多下载比较的缩略图数（取排在前面的结果）
+            max_bytes: 单张缩略图的大小上限
+            byte_budget: 每次重排下载的总字节数上限
+            time_budget: 每次重排下载的总耗时上限(秒)
+            max_distance: 视为同一图像的最大汉明距离(0-64)
+            prune: 是否剔除距离超过阈值的结果（否则排到最后）
+        """
+        self.engines = set(engines)
+        self.max_thumbnails = max_thumbnails
+        self.max_bytes = max_bytes
+        self.byte_budget = byte_budget
+        self.time_budget = time_budget
+        self.max_distance = max_distance
+        self.prune = prune
+
+    @property
+    def available(self) -> bool:
+        """
+        是否可用（需要安装 numpy）
+        """
+        return cpu_tasks.np is not None
+
+    def applies_to(self, engine: str) -> bool:
+        """
+        判断是否对该引擎的结果重排
+
+        参数:
+            engine: 引擎名称
+
+        返回:
+            bool: 需要重排时返回True
+        """
+        return engine in self.engines and self.available
+
+    async def rank(
+        self,
+        query: ImageHandle,
+        hits: Sequence[Optional[SearchHit]],
+        client: AsyncClient,
+        guard: Optional[UrlGuard] = None,
+    ) -> Optional[list[int]]:
+        """
+        计算重排后的结果顺序
+
+        参数:
+            query: 查询图像
+            hits: 搜索结果记录，None 表示该结果无法转换（保持原顺序）
+            client: 下载缩略图使用的HTTP客户端
+            guard: URL安全检查器
+
+        返回:
+            Optional[list[int]]: 保留结果的原下标（按新顺序），没有任何缩略图可比较时返回None
+        """
+        candidates = [
+            i for i, hit in enumerate(hits)
+            if hit is not None and hit.thumbnail.startswith(("http://", "https://"))
+        ][:self.max_thumbnails]
+        if not candidates:
+            return None
+        started = time.perf_counter()
+        query_hash = await query.phash()
+        if query_hash is None:
+            return None
+        thumbnails = await fetch_thumbnails(
+            client,
+            [hits[i].thumbnail for i in candidates],
+            max_bytes=self.max_bytes,
+            byte_budget=self.byte_budget,
+            time_budget=self.time_budget,
+            guard=guard,
+        )
+        values = await run_cpu(cpu_tasks.phash_values, thumbnails)
+        measured: dict[int, int] = {
+            i: bin(value ^ query_hash).count("1") for i, value in zip(candidates, values) if value is not None
+        }
+        if not measured:
+            return None
+        matched = sorted((i for i, d in measured.items() if d <= self.max_distance), key=lambda i: (measured[i], i))
+        rejected = sorted((i for i, d in measured.items() if d > self.max_distance), key=lambda i: (measured[i], i))
+        unknown = [i for i in range(len(hits)) if i not in measured]
+        order = matched + unknown + ([] if self.prune else rejected)
+        logger.info(
+            f"[Rerank] 比较 {len(measured)}/{len(candidates)} 张缩略图，匹配 {len(matched)} 条，"
+            f"{'剔除' if self.prune else '后移'} {len(rejected)} 条，耗时 {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return order
+
+    async def rerank_response(
+        self,
+        response: Any,
+        query: ImageHandle,
+        client: AsyncClient,
+        guard: Optional[UrlGuard] = None,
+    ) -> None:
+        """
+        原地重排搜索响应的结果（raw 与 hits），重排失败只记录日志
+
+        参数:
+            response: 搜索响应解析对象（BaseSearchResponse）
+            query: 查询图像
+            client: 下载缩略图使用的HTTP客户端
+            guard: URL安全检查器
+        """
+        try:
+            order = await self.rank(query, response.raw_hits(), client, guard)
+        except Exception as e:
+            logger.warning(f"[Rerank] {response.engine} 缩略图重排失败，保持原顺序: {e}")
+            return
+        if order is not None:
+            response.reorder(order)
+
+    def describe(self) -> str:
+        """
+        生成重排配置文本，供管理员查看
+
+        返回:
+            str: 状态文本
+        """
+        if not self.available:
+            return "缩略图重排: 未安装 numpy，已停用"
+        return (
+            f"缩略图重排: {', '.join(sorted(self.engines)) or '无'} | 最多 {self.max_thumbnails} 张, "
+            f"总计 {self.byte_budget // 1024}KB / {self.time_budget:g}s, 距离阈值 {self.max_distance}"
+        )
@@ -9,6 +9,7 @@ from .google_lens_parser import (
     GoogleLensResponse,
 )
 from .iqdb_parser import IqdbResponse
+from ..search_hit import SearchHit
 from .saucenao_parser import SauceNAOItem, SauceNAOResponse
 from .tracemoe_parser import TraceMoeResponse
 from .tineye_parser import TineyeItem, TineyeResponse
@@ -28,6 +29,7 @@ __all__ = [
     "GoogleLensItem",
     "GoogleLensResponse",
     "SauceNAOItem",
+    "SearchHit",
     "SauceNAOResponse",
     "TineyeItem",
     "TineyeResponse",
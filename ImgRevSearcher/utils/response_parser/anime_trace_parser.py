@@ -1,6 +1,7 @@
 from typing import Any, Optional, NamedTuple
 from typing_extensions import override
-from .base_parser import BaseResParser, BaseSearchResponse
+from ..search_hit import SearchHit
+from .base_parser import BaseResParser, BaseSearchResponse, LazyItems
 
 
 class Character(NamedTuple):
@@ -55,6 +56,8 @@ class AnimeTraceResponse(BaseSearchResponse[AnimeTraceItem]):
     解析完整的AnimeTrace API响应，包含多个识别结果
     """
     
+    engine = "animetrace"
+    
     def __init__(self, resp_data: dict[str, Any], resp_url: str, **kwargs: Any) -> None:
         """
         初始化AnimeTrace响应解析器
@@ -79,7 +82,32 @@ class AnimeTraceResponse(BaseSearchResponse[AnimeTraceItem]):
         self.ai: bool = resp_data.get("ai", False)
         self.trace_id: str = resp_data["trace_id"]
         results = resp_data["data"]
-        self.raw: list[AnimeTraceItem] = [AnimeTraceItem(item) for item in results]
+        self.raw: LazyItems[AnimeTraceItem] = self._lazy(results, AnimeTraceItem)
+
+    @override
+    def _to_hit(self, item: AnimeTraceItem) -> Optional[SearchHit]:
+        """
+        将识别框转换为 SearchHit：标题为最可能的作品名，作者位置放角色名，全部候选角色放在附加字段中
+        
+        参数:
+            item: 识别结果项
+            
+        返回:
+            Optional[SearchHit]: 搜索结果记录，未识别出角色时返回None
+        """
+        if not item.characters:
+            return None
+        best = item.characters[0]
+        return SearchHit(
+            self.engine,
+            title=best.work,
+            author=best.name,
+            extra={
+                "characters": [character._asdict() for character in item.characters],
+                "box": item.box,
+                "ai": self.ai,
+            },
+        )
         
     def show_result(self) -> Optional[str]:
         """
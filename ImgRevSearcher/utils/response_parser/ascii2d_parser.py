@@ -1,68 +1,64 @@
-from typing import Any, List, Dict
-from pyquery import PyQuery
+from typing import Any, List, Dict, Optional
+from lxml.etree import XPath
+from lxml.html import HtmlElement
+from ..ext_tools import elements_text, parse_html_tree, xpath_class
 from typing_extensions import override
-from .base_parser import BaseSearchResponse
+from .base_parser import BaseSearchResponse, LazyItems
 
 BASE_URL = "https://ascii2d.net"
 
+# 预编译的 XPath，对应原 CSS 选择器 div.row.item-box / div.detail-box a / div.hash / div.text-muted / img
+_ITEMS = XPath(f"descendant-or-self::div[{xpath_class('row')} and {xpath_class('item-box')}]")
+_DETAIL_LINKS = XPath(f"descendant::div[{xpath_class('detail-box')}]/descendant::a")
+_HASH = XPath(f"descendant::div[{xpath_class('hash')}]")
+_PARAMS = XPath(f"descendant::div[{xpath_class('text-muted')}]")
+_IMAGE_SRC = XPath("descendant::img[1]/@src", smart_strings=False)
+
 class Ascii2DResponse(BaseSearchResponse):
     """
     Ascii2D 搜索结果解析类
     """
-    def __init__(self, resp_data: str, resp_url: str, **kwargs: Any):
+    engine = "ascii2d"
+
+    def __init__(self, resp_data: bytes, resp_url: str, **kwargs: Any):
         super().__init__(resp_data, resp_url, **kwargs)
 
     @override
-    def _parse_response(self, resp_data: str, **kwargs: Any) -> None:
-        dom = PyQuery(resp_data)
-        self.raw = []
+    def _parse_response(self, resp_data: bytes, **kwargs: Any) -> None:
+        root = parse_html_tree(resp_data)
         
         # ASCII2D 结果通常在 .item-box 中
         # 第一个是上传的图片，通常跳过 (但有时需要校验)
-        items = dom("div.row.item-box")
-        
-        for item in items.items():
-            # 忽略没有详情链接的项（通常是自身的缩略图）
-            if not item.find("div.detail-box a"):
-                continue
-                
-            result = self._parse_item(item)
-            if result:
-                self.raw.append(result)
+        self.raw: LazyItems[Dict[str, Any]] = self._lazy(_ITEMS(root), self._parse_item)
 
-    def _parse_item(self, item: PyQuery) -> Dict[str, Any]:
+    def _parse_item(self, item: HtmlElement) -> Optional[Dict[str, Any]]:
+        # 忽略没有详情链接的项（通常是自身的缩略图）
+        links = _DETAIL_LINKS(item)
+        if not links:
+            return None
         try:
             # 提取图片哈希 (hash)
-            hash_txt = item.find("div.hash").text()
+            hash_txt = elements_text(_HASH(item))
             
             # 提取详情信息 (分辨率，大小等)
-            params = item.find("div.text-muted").text() # e.g. 1000x1000 png 100kb
+            params = elements_text(_PARAMS(item)) # e.g. 1000x1000 png 100kb
             
             # 缩略图
-            img_src = item.find("img").attr("src")
+            img_src = next(iter(_IMAGE_SRC(item)), None)
             if img_src and img_src.startswith("/"):
                 img_src = f"{BASE_URL}{img_src}"
                 
             # 提取外部链接 (pixiv, twitter 等)
-            detail_box = item.find("div.detail-box")
-            links = detail_box.find("a")
-            
-            title = ""
-            url = ""
+            # 第一个链接通常是作品链接
+            title = elements_text(links[:1]) or "No Title"
+            url = links[0].get("href")
             author = ""
             author_url = ""
             
-            if links:
-                # 第一个链接通常是作品链接
-                first_link = links.eq(0)
-                title = first_link.text() or "No Title"
-                url = first_link.attr("href")
-                
-                # 第二个链接通常是作者
-                if len(links) > 1:
-                    second_link = links.eq(1)
-                    author = second_link.text()
-                    author_url = second_link.attr("href")
+            # 第二个链接通常是作者
+            if len(links) > 1:
+                author = elements_text(links[1:2])
+                author_url = links[1].get("href")
             
             return {
                 "title": title,
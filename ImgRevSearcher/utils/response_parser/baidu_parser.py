@@ -1,7 +1,8 @@
-from typing import Any, Optional
+from itertools import chain
+from typing import Any, Iterable, Optional
 from typing_extensions import override
 from ..ext_tools import deep_get
-from .base_parser import BaseResParser, BaseSearchResponse
+from .base_parser import BaseResParser, BaseSearchResponse, LazyItems
 
 
 class BaiDuItem(BaseResParser):
@@ -42,6 +43,8 @@ class BaiDuResponse(BaseSearchResponse[BaiDuItem]):
     解析完整的百度识图API响应，包含相似图片和相同图片的搜索结果
     """
     
+    engine = "baidu"
+    
     def __init__(self, resp_data: dict[str, Any], resp_url: str, **kwargs: Any):
         """
         初始化百度识图响应解析器
@@ -62,13 +65,34 @@ class BaiDuResponse(BaseSearchResponse[BaiDuItem]):
             resp_data: 原始响应数据
             **kwargs: 其他解析参数
         """
-        self.raw: list[BaiDuItem] = []
         self.exact_matches: list[BaiDuItem] = []
         if same_data := resp_data.get("same"):
             if "list" in same_data:
                 self.exact_matches.extend(BaiDuItem(i) for i in same_data["list"] if "url" in i and "image_src" in i)
-        if data_list := deep_get(resp_data, "data.list"):
-            self.raw.extend([BaiDuItem(i) for i in data_list])
+        self.raw: LazyItems[BaiDuItem] = self._lazy(deep_get(resp_data, "data.list") or [], BaiDuItem)
+
+    @override
+    def _hit_sources(self) -> Iterable[BaiDuItem]:
+        """
+        相同图片结果排在相似图片结果之前
+        
+        返回:
+            Iterable[BaiDuItem]: 结果项
+        """
+        return chain(self.exact_matches, self.raw)
+
+    @override
+    def _hit_extra(self, item: BaiDuItem) -> dict[str, Any]:
+        """
+        返回结果项中的附加字段
+        
+        参数:
+            item: 结果项
+            
+        返回:
+            dict[str, Any]: 附加字段
+        """
+        return {"exact": item in self.exact_matches}
             
     def show_result(self) -> Optional[str]:
         """
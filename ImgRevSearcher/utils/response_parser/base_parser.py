@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Any, Generic, TypeVar, Optional
+from collections.abc import Sequence
+from typing import Any, Callable, Generic, Iterable, Iterator, TypeVar, Optional, Union
+from ..search_hit import HIT_FIELDS, SearchHit, parse_similarity
 
 T = TypeVar("T")
+_EXHAUSTED = object()
 
 
 class BaseResParser(ABC):
@@ -26,6 +29,14 @@ class BaseResParser(ABC):
         self.similarity: float = 0.0
         self._parse_data(data, **kwargs)
 
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        序列化时丢弃原始数据，减少跨进程传输量
+        """
+        state = self.__dict__.copy()
+        state["origin"] = None
+        return state
+
     @abstractmethod
     def _parse_data(self, data: Any, **kwargs: Any) -> None:
         """
@@ -41,13 +52,99 @@ class BaseResParser(ABC):
         pass
 
 
+class LazyItems(Sequence, Generic[T]):
+    """
+    按需解析的结果序列
+    
+    保存待解析的原始条目，访问到第 n 项时才解析前 n 项；工厂函数返回None的条目会被跳过。
+    show_result 通常只读取前几项，解析开销因此只与实际显示的条目数相关
+    """
+    
+    def __init__(self, sources: Iterable[Any], factory: Callable[[Any], Optional[T]], limit: Optional[int] = None):
+        """
+        初始化按需解析序列
+        
+        参数:
+            sources: 待解析的原始条目
+            factory: 将原始条目解析为结果项的函数，返回None表示跳过该条目
+            limit: 最多解析的结果数，None 表示不限制
+        """
+        self._sources: Optional[Iterator[Any]] = iter(sources)
+        self._factory = factory
+        self._limit = limit
+        self._items: list[T] = []
+
+    def _fill(self, count: Optional[int] = None) -> None:
+        """
+        解析直到已有 count 项（None 表示全部）或原始条目耗尽
+        """
+        if self._limit is not None:
+            count = self._limit if count is None else min(count, self._limit)
+        while self._sources is not None and (count is None or len(self._items) < count):
+            source = next(self._sources, _EXHAUSTED)
+            if source is _EXHAUSTED:
+                self._sources = None
+                break
+            item = self._factory(source)
+            if item is not None:
+                self._items.append(item)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.start or 0, index.stop, index.step or 1
+            self._fill(stop if stop is not None and stop >= 0 and start >= 0 and step > 0 else None)
+        else:
+            self._fill(index + 1 if index >= 0 else None)
+        return self._items[index]
+
+    def __len__(self) -> int:
+        self._fill()
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        self._fill(1)
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        index = 0
+        while True:
+            self._fill(index + 1)
+            if index >= len(self._items):
+                return
+            yield self._items[index]
+            index += 1
+
+    def __eq__(self, other: object) -> bool:
+        # 与列表一样按值比较（会解析全部条目）
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return list(self) == list(other)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __reduce__(self) -> tuple:
+        # 跨进程传输时先解析剩余条目，以普通列表形式传输（原始条目通常是无法序列化的DOM节点）
+        self._fill()
+        return list, (self._items,)
+
+    def __repr__(self) -> str:
+        pending = "" if self._sources is None else ", ..."
+        return f"LazyItems({self._items!r}{pending})"
+
+
+
 class BaseSearchResponse(ABC, Generic[T]):
     """
     搜索响应基类
     
-    解析完整搜索响应的基类，包含多个搜索结果项
+    解析完整搜索响应的基类，包含多个搜索结果项；hits 提供统一格式的结果记录
     """
     
+    # 引擎名称，与 ENGINE_MAP 的键一致，写入 SearchHit.engine
+    engine: str = ""
+    # 引擎是否提供相似度，未提供时 SearchHit.similarity 为None（结果项上的默认值 0.0 没有意义）
+    reports_similarity: bool = False
+    
     def __init__(self, resp_data: Any, resp_url: str, **kwargs: Any):
         """
         初始化搜索响应解析器
@@ -55,13 +152,115 @@ class BaseSearchResponse(ABC, Generic[T]):
         参数:
             resp_data: 原始响应数据
             resp_url: 响应URL
-            **kwargs: 其他解析参数
+            **kwargs: 其他解析参数，top_k 为最多解析的结果数
         """
         self.origin: Any = resp_data
         self.url: str = resp_url
-        self.raw: list[T] = []
+        # 调用方只需要前 top_k 条结果时传入，按需解析的结果序列最多解析这么多条
+        self.top_k: Optional[int] = kwargs.pop("top_k", None)
+        self.raw: Sequence[T] = []
+        self._hits: Optional[LazyItems[SearchHit]] = None
         self._parse_response(resp_data, resp_url=resp_url, **kwargs)
 
+    def _lazy(self, sources: Iterable[Any], factory: Callable[[Any], Optional[T]]) -> LazyItems[T]:
+        """
+        创建按需解析的结果序列，受 top_k 限制
+        
+        参数:
+            sources: 待解析的原始条目
+            factory: 将原始条目解析为结果项的函数，返回None表示跳过该条目
+            
+        返回:
+            LazyItems[T]: 按需解析的结果序列
+        """
+        return LazyItems(sources, factory, self.top_k)
+
+    @property
+    def hits(self) -> Sequence[SearchHit]:
+        """
+        统一格式的搜索结果记录，按需由 raw 转换，同样受 top_k 限制
+        
+        返回:
+            Sequence[SearchHit]: 搜索结果记录序列
+        """
+        if self._hits is None:
+            self._hits = LazyItems(self._hit_sources(), self._to_hit, self.top_k)
+        return self._hits
+
+    def _hit_sources(self) -> Iterable[Any]:
+        """
+        返回需要转换为 SearchHit 的结果项，子类可覆盖以加入 raw 之外的结果
+        
+        返回:
+            Iterable[Any]: 结果项
+        """
+        return self.raw
+
+    def _hit_extra(self, item: Any) -> dict[str, Any]:
+        """
+        返回结果项中引擎特有的附加字段，子类可覆盖
+        
+        字典形式的结果项默认取 SearchHit 固定字段之外的全部键
+        
+        参数:
+            item: 结果项
+            
+        返回:
+            dict[str, Any]: 附加字段
+        """
+        if isinstance(item, dict):
+            return {key: value for key, value in item.items() if key not in HIT_FIELDS}
+        return {}
+
+    def _to_hit(self, item: Any) -> Optional[SearchHit]:
+        """
+        将单个结果项转换为 SearchHit，结果项可以是 BaseResParser 或字典
+        
+        参数:
+            item: 结果项
+            
+        返回:
+            Optional[SearchHit]: 搜索结果记录，返回None表示跳过该结果项
+        """
+        get = item.get if isinstance(item, dict) else lambda key: getattr(item, key, None)
+        return SearchHit(
+            self.engine,
+            similarity=parse_similarity(get("similarity")) if self.reports_similarity else None,
+            url=get("url") or "",
+            title=get("title") or "",
+            author=get("author") or "",
+            thumbnail=get("thumbnail") or "",
+            extra=self._hit_extra(item),
+        )
+
+    def raw_hits(self) -> list[Optional[SearchHit]]:
+        """
+        将 raw 中的结果项逐一转换为 SearchHit，下标与 raw 对应（不受 top_k 与 _hit_sources 影响）
+        
+        返回:
+            list[Optional[SearchHit]]: 搜索结果记录，无法转换的结果项为None
+        """
+        return [self._to_hit(item) for item in self.raw]
+
+    def reorder(self, order: Sequence[int]) -> None:
+        """
+        按给定下标重排并筛选 raw，之后生成的 hits 与结果文本使用新顺序
+        
+        参数:
+            order: 保留的 raw 下标，按新顺序排列
+        """
+        raw = self.raw
+        self.raw = [raw[i] for i in order]
+        self._hits = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        序列化时丢弃原始响应数据（如整页HTML），减少跨进程传输量
+        """
+        state = self.__dict__.copy()
+        state["origin"] = None
+        return state
+
     @abstractmethod
     def _parse_response(self, resp_data: Any, **kwargs: Any) -> None:
         """
@@ -1,4 +1,4 @@
-from typing import Any, Optional, Union
+from typing import Any, Optional, Sequence, Union
 from typing_extensions import override
 from .base_parser import BaseResParser, BaseSearchResponse
 
@@ -57,6 +57,8 @@ class CopyseekerResponse(BaseSearchResponse[CopyseekerItem]):
     解析完整的Copyseeker API响应，包含匹配结果、相似图片和EXIF信息等
     """
     
+    engine = "copyseeker"
+    
     def __init__(self, resp_data: dict[str, Any], resp_url: str, **kwargs: Any) -> None:
         """
         初始化Copyseeker响应解析器
@@ -105,6 +107,30 @@ class CopyseekerResponse(BaseSearchResponse[CopyseekerItem]):
 
         return items
 
+    @override
+    def _hit_extra(self, item: CopyseekerItem) -> dict[str, Any]:
+        """
+        返回结果项中的附加字段
+        
+        参数:
+            item: 结果项
+            
+        返回:
+            dict[str, Any]: 附加字段
+        """
+        return {"website_rank": item.website_rank}
+
+    @override
+    def reorder(self, order: Sequence[int]) -> None:
+        """
+        重排结果并同步相似图片链接列表
+        
+        参数:
+            order: 保留的 raw 下标，按新顺序排列
+        """
+        super().reorder(order)
+        self.similar_image_urls = [i.thumbnail for i in self.raw if i.title == "Visually Similar Image"]
+
     @override
     def show_result(self) -> Optional[str]:
         """
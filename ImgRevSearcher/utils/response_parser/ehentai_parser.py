@@ -1,10 +1,52 @@
-from typing import Any, Optional
-import json
+from typing import Any, Iterable, Optional
 from pathlib import Path
-from pyquery import PyQuery
+from lxml.etree import XPath
+from lxml.html import HtmlElement
 from typing_extensions import override
-from ..ext_tools import parse_html
-from .base_parser import BaseResParser, BaseSearchResponse
+from ..ext_tools import elements_text, parse_html_tree, xpath_class
+from ..cpu_tasks import load_translations
+from .base_parser import BaseResParser, BaseSearchResponse, LazyItems
+
+# 预编译的 XPath，对应原 PyQuery 使用的 CSS 选择器
+_ROWS = XPath(f"descendant-or-self::*[{xpath_class('itg')}]/tr[td]")
+_THUMBNAIL_ITEMS = XPath(f"descendant-or-self::*[{xpath_class('itg')}]/*[{xpath_class('gl1t')}]")
+_GLINK = XPath(f"descendant::*[{xpath_class('glink')}]")
+_THUMBNAILS = tuple(
+    XPath(f"descendant::*[{xpath_class(name)}]/descendant::img") for name in ("glthumb", "gl1e", "gl3t")
+)
+_TYPES = tuple(XPath(f"descendant::*[{xpath_class(name)}]") for name in ("cs", "cn"))
+_POSTED = XPath("descendant::*[starts-with(@id, 'posted')]")
+_PAGES_DIVS = XPath(f"descendant::*[{xpath_class('gl4c')}]/descendant::div")
+_TAGS = XPath("descendant::div[@class='gt' or @class='gtl']")
+
+
+def _parents(elements: Iterable[HtmlElement], tag: Optional[str] = None) -> list[HtmlElement]:
+    """
+    获取去重后的父元素，与 PyQuery 的 parent(tag) 一致
+
+    参数:
+        elements: 元素列表
+        tag: 只保留该标签的父元素，None 表示不过滤
+
+    返回:
+        list[HtmlElement]: 父元素列表（保持顺序）
+    """
+    parents: list[HtmlElement] = []
+    for element in elements:
+        parent = element.getparent()
+        if parent is not None and (tag is None or parent.tag == tag) and parent not in parents:
+            parents.append(parent)
+    return parents
+
+
+def _first_match(element: HtmlElement, selectors: tuple[XPath, ...]) -> list[HtmlElement]:
+    """
+    依次尝试多个 XPath，返回第一个非空结果
+    """
+    for selector in selectors:
+        if found := selector(element):
+            return found
+    return []
 
 
 class EHentaiItem(BaseResParser):
@@ -14,62 +56,63 @@ class EHentaiItem(BaseResParser):
     解析单个画廊结果，提取标题、URL、缩略图、类型、日期、页数和标签等信息
     """
     
-    def __init__(self, data: PyQuery, **kwargs: Any):
+    def __init__(self, data: HtmlElement, **kwargs: Any):
         """
         初始化E-Hentai结果项解析器
         
         参数:
-            data: 包含结果项HTML的PyQuery对象
+            data: 结果项对应的 lxml 元素（列表模式为 tr，缩略图模式为 .gl1t）
             **kwargs: 其他解析参数
         """
         super().__init__(data, **kwargs)
 
     @override
-    def _parse_data(self, data: PyQuery, **kwargs: Any) -> None:
+    def _parse_data(self, data: HtmlElement, **kwargs: Any) -> None:
         """
         解析E-Hentai结果数据
         
         参数:
-            data: 包含结果项HTML的PyQuery对象
+            data: 结果项对应的 lxml 元素
             **kwargs: 其他解析参数
         """
         self._arrange(data)
 
-    def _arrange(self, data: PyQuery) -> None:
+    def _arrange(self, data: HtmlElement) -> None:
         """
         整理和提取E-Hentai结果项中的各项数据
         
         参数:
-            data: 包含结果项HTML的PyQuery对象
+            data: 结果项对应的 lxml 元素
         """
-        glink = data.find(".glink")
-        self.title: str = glink.text()
-        if glink.parent("div"):
-            self.url: str = glink.parent("div").parent("a").attr("href")
+        glink = _GLINK(data)
+        self.title: str = elements_text(glink)
+        glink_parents = _parents(glink)
+        if link_divs := [e for e in glink_parents if e.tag == "div"]:
+            links = _parents(link_divs, "a")
         else:
-            self.url = glink.parent("a").attr("href")
-        thumbnail = data.find(".glthumb img") or data.find(".gl1e img") or data.find(".gl3t img")
-        self.thumbnail: str = thumbnail.attr("data-src") or thumbnail.attr("src")
-        _type = data.find(".cs") or data.find(".cn")
-        self.type: str = _type.eq(0).text() or ""
-        self.date: str = data.find("[id^='posted']").eq(0).text() or ""
+            links = [e for e in glink_parents if e.tag == "a"]
+        self.url: str = links[0].get("href") if links else None
+        thumbnail = _first_match(data, _THUMBNAILS)
+        self.thumbnail: str = (thumbnail[0].get("data-src") or thumbnail[0].get("src")) if thumbnail else None
+        _type = _first_match(data, _TYPES)
+        self.type: str = elements_text(_type[:1]) or ""
+        self.date: str = elements_text(_POSTED(data)[:1]) or ""
         self.pages: str = "解析失败"
-        if glink and len(glink) > 0:
+        if glink:
             try:
-                tr_element = glink.parent().parent().parent()
-                if len(tr_element) > 0:
-                    pages_div = tr_element.find(".gl4c div").filter(
-                        lambda i, e: "pages" in PyQuery(e).text()
+                # glink 向上三层为所在的结果行
+                rows = _parents(_parents(glink_parents))
+                for row in rows:
+                    pages_text = next(
+                        (text for div in _PAGES_DIVS(row) if "pages" in (text := elements_text([div]))), None
                     )
-                    if len(pages_div) > 0:
-                        pages_text = pages_div.eq(0).text().strip()
+                    if pages_text is not None:
+                        pages_text = pages_text.strip()
                         self.pages = pages_text.split()[0] if pages_text else "解析失败"
+                        break
             except Exception:
                 pass
-        self.tags: list[str] = []
-        for i in data.find("div[class=gt],div[class=gtl]").items():
-            if tag := i.attr("title"):
-                self.tags.append(tag)
+        self.tags: list[str] = [tag for i in _TAGS(data) if (tag := i.get("title"))]
 
 
 class EHentaiResponse(BaseSearchResponse[EHentaiItem]):
@@ -79,7 +122,9 @@ class EHentaiResponse(BaseSearchResponse[EHentaiItem]):
     解析完整的E-Hentai搜索响应，包含多个画廊结果
     """
     
-    def __init__(self, resp_data: str, resp_url: str, **kwargs: Any):
+    engine = "ehentai"
+    
+    def __init__(self, resp_data: bytes, resp_url: str, **kwargs: Any):
         """
         初始化E-Hentai响应解析器
         
@@ -91,7 +136,7 @@ class EHentaiResponse(BaseSearchResponse[EHentaiItem]):
         super().__init__(resp_data, resp_url, **kwargs)
 
     @override
-    def _parse_response(self, resp_data: str, **kwargs: Any) -> None:
+    def _parse_response(self, resp_data: bytes, **kwargs: Any) -> None:
         """
         解析E-Hentai响应数据
         
@@ -99,15 +144,25 @@ class EHentaiResponse(BaseSearchResponse[EHentaiItem]):
             resp_data: 原始HTML响应数据
             **kwargs: 其他解析参数
         """
-        data = parse_html(resp_data)
-        self.origin: PyQuery = data
-        if "No unfiltered results" in resp_data:
-            self.raw: list[EHentaiItem] = []
-        elif tr_items := data.find(".itg").children("tr").items():
-            self.raw = [EHentaiItem(i) for i in tr_items if i.children("td")]
+        root = parse_html_tree(resp_data)
+        self.origin: HtmlElement = root
+        if b"No unfiltered results" in resp_data:
+            self.raw: LazyItems[EHentaiItem] = self._lazy((), EHentaiItem)
         else:
-            gl1t_items = data.find(".itg").children(".gl1t").items()
-            self.raw = [EHentaiItem(i) for i in gl1t_items]
+            self.raw = self._lazy(_ROWS(root) or _THUMBNAIL_ITEMS(root), EHentaiItem)
+
+    @override
+    def _hit_extra(self, item: EHentaiItem) -> dict[str, Any]:
+        """
+        返回结果项中的附加字段
+        
+        参数:
+            item: 结果项
+            
+        返回:
+            dict[str, Any]: 附加字段
+        """
+        return {"type": item.type, "date": item.date, "pages": item.pages, "tags": item.tags}
             
     def show_result(self, translations_file: str = "resource/translations/ehviewer_translations.json") -> Optional[str]:
         """
@@ -121,13 +176,8 @@ class EHentaiResponse(BaseSearchResponse[EHentaiItem]):
         返回:
             str: 格式化的搜索结果文本
         """
-        try:
-            base_dir = Path(__file__).parent.parent.parent
-            abs_translations_file = base_dir / translations_file
-            with open(abs_translations_file, 'r', encoding='utf-8') as f:
-                translations = json.load(f)
-        except Exception:
-            translations = {}
+        base_dir = Path(__file__).parent.parent.parent
+        translations = load_translations(str(base_dir / translations_file))
         has_valid_results = False
         if self.raw:
             for item in self.raw:
@@ -1,8 +1,8 @@
 
-import json
 from typing import Any, Optional
 from pyquery import PyQuery
 from typing_extensions import override
+from ..search_hit import SearchHit
 from .base_parser import BaseResParser, BaseSearchResponse
 
 class GoogleLensItem(BaseResParser):
@@ -20,17 +20,16 @@ class GoogleLensItem(BaseResParser):
 
 
 class GoogleLensResponse(BaseSearchResponse[GoogleLensItem]):
-    def __init__(self, resp_data: str, resp_url: str, **kwargs: Any):
+    engine = "google"
+
+    def __init__(self, resp_data: dict[str, Any], resp_url: str, **kwargs: Any):
         super().__init__(resp_data, resp_url, **kwargs)
         self.max_results = kwargs.get("max_results", 10)
 
-    def _parse_response(self, resp_data: str, **kwargs: Any) -> None:
+    def _parse_response(self, resp_data: dict[str, Any], **kwargs: Any) -> None:
         self.ai_overview = ""
         self.raw: list[GoogleLensItem] = []
-        try:
-            data = json.loads(resp_data)
-        except json.JSONDecodeError:
-            return
+        data = resp_data
 
         # Auto-detect engine based on JSON structure
         if "visual_matches" in data or "knowledge_graph" in data or "search_metadata" in data:
@@ -107,6 +106,14 @@ class GoogleLensResponse(BaseSearchResponse[GoogleLensItem]):
         #      for match in res["similar_images"]:
         #          self._add_zenserp_item(match, original_group="visual")
 
+    @override
+    def _to_hit(self, item: GoogleLensItem) -> Optional[SearchHit]:
+        hit = super()._to_hit(item)
+        # 来源站点作为作者位置显示，分组用于区分精确匹配与相似结果
+        hit.author = item.source
+        hit.extra = {"source": item.source, "group": item.group}
+        return hit
+
     def _add_serpapi_item(self, match: dict, group: str):
         # Helper to get stripped string
         def _get(key):
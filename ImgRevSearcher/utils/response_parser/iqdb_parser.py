@@ -1,52 +1,66 @@
-from typing import Any, Dict, List
-from pyquery import PyQuery
+from typing import Any, Dict, List, Optional
+from lxml.etree import XPath
+from lxml.html import HtmlElement
+from ..ext_tools import elements_text, parse_html_tree, xpath_class
 
 from .base_parser import BaseSearchResponse
 
+# 预编译的 XPath，对应原 CSS 选择器 .pages table / th / td.image / a / img / tr
+_TABLES = XPath(f"descendant-or-self::*[{xpath_class('pages')}]/descendant::table")
+_HEADERS = XPath("descendant::th")
+_IMAGE_CELLS = XPath(f"descendant::td[{xpath_class('image')}]")
+_LINKS = XPath("descendant-or-self::a")
+_IMAGES = XPath("descendant::img")
+_ROWS = XPath("descendant::tr")
+
 class IqdbResponse(BaseSearchResponse):
     """
     IQDB 搜索结果解析类
     """
-    def __init__(self, resp_data: str, resp_url: str, **kwargs: Any):
+    engine = "iqdb"
+    reports_similarity = True
+
+    def __init__(self, resp_data: bytes, resp_url: str, **kwargs: Any):
         super().__init__(resp_data, resp_url, **kwargs)
 
 
-    def _parse_response(self, resp_data: str, **kwargs: Any) -> None:
-        dom = PyQuery(resp_data)
+    def _parse_response(self, resp_data: bytes, **kwargs: Any) -> None:
+        root = parse_html_tree(resp_data)
         self.raw = []
         
         # 查找所有 .pages 下的 table (排除最外层布局 table)
         # HTML 结构: <div class='pages'><div><table>...</table></div></div>
-        tables = dom(".pages table")
-        
-        for table in tables.items():
+        for table in _TABLES(root):
             # 检查是否为结果表格
             # 特征: 包含 "Best match" 或 "Additional match" 的 th
-            header = table("th").text()
+            header = elements_text(_HEADERS(table))
             if "match" not in header:
                 continue
                 
-            result = self._parse_item(table)
+            result = self._parse_item(table, header)
             if result:
                 self.raw.append(result)
         
         self.raw.sort(key=lambda x: x.get("similarity", 0), reverse=True)
+        # 需要全部解析后按相似度排序，无法按需解析，只按 top_k 截断
+        if self.top_k:
+            del self.raw[self.top_k:]
 
-    def _parse_item(self, table: PyQuery) -> Dict[str, Any]:
+    def _parse_item(self, table: HtmlElement, header: str) -> Optional[Dict[str, Any]]:
         try:
             # 1. 获取 URL 和 缩略图
             # <td class='image'><a href='...'><img src='...'></a></td>
-            td_img = table("td.image")
-            if not td_img:
+            image_cells = _IMAGE_CELLS(table)
+            if not image_cells:
                 return None
                 
-            link_tag = td_img("a")
-            if not link_tag:
+            links = [a for td in image_cells for a in _LINKS(td)]
+            if not links:
                 return None
                 
-            url = link_tag.attr("href")
-            img_tag = link_tag("img")
-            thumbnail = img_tag.attr("src")
+            url = links[0].get("href")
+            images = [img for a in links for img in _IMAGES(a)]
+            thumbnail = images[0].get("src") if images else None
             
             if not url:
                 return None
@@ -60,12 +74,15 @@ class IqdbResponse(BaseSearchResponse):
             if thumbnail and thumbnail.startswith("/"):
                 thumbnail = "https://iqdb.org" + thumbnail
                 
-            # 2. 获取相似度
-            # 通常在某一行 <td>96% similarity</td>
+            # 2. 一次遍历所有行：获取相似度并收集其他信息
+            # 相似度通常在某一行 <td>96% similarity</td>
+            # 来源通常在第二行: <td><img src=icon>Danbooru ...</td>，尺寸在后面: 1435x1011 [Safe]
+            # tr0: th(Best match) / tr1: td.image / tr2: td(Source) / tr3: td(Size) / tr4: td(Sim)
             similarity = 0.0
-            rows = table("tr")
-            for tr in rows.items():
-                text = tr.text()
+            other_info = []
+            stripped_header = header.strip()
+            for tr in _ROWS(table):
+                text = elements_text([tr])
                 if "% similarity" in text:
                     try:
                         # "96% similarity"
@@ -73,40 +90,16 @@ class IqdbResponse(BaseSearchResponse):
                         similarity = float(sim_str)
                     except:
                         pass
-            
-            # 3. 其他信息 (尺寸, 评级, 来源)
-            # 来源通常在第二行: <td><img src=icon>Danbooru ...</td>
-            # 尺寸在后面: 1435x1011 [Safe]
-            other_info = []
-            
-            # 尝试提取 source
-            source_text = ""
-            try:
-                # 假设第二行是来源 (index 1)
-                # table("tr").eq(1) 可能是图片行 (index 1 if header is 0)
-                # Inspecting HTML:
-                # tr0: th(Best match)
-                # tr1: td.image
-                # tr2: td(Source: Danbooru ...)
-                # tr3: td(Size...)
-                # tr4: td(Sim...)
-                
-                # Let's iterate and concat useful texts
-                for tr in rows.items():
-                    txt = tr.text().strip()
-                    if "match" in txt: continue
-                    if "% similarity" in txt: continue
-                    if not txt: continue
-                    if txt == table("th").text().strip(): continue
-                    
-                    # 避免重复图片链接文本
-                    if not tr.find("td.image"): 
-                        other_info.append(txt)
-            except:
-                pass
+                    continue
+                txt = text.strip()
+                if "match" in txt or not txt or txt == stripped_header:
+                    continue
+                # 避免重复图片链接文本
+                if not _IMAGE_CELLS(tr):
+                    other_info.append(txt)
 
             return {
-                "title": table("th").text() or "Result",
+                "title": header or "Result",
                 "url": url,
                 "thumbnail": thumbnail,
                 "author": "",
@@ -1,6 +1,6 @@
 from typing import Any, Optional
 from typing_extensions import override
-from .base_parser import BaseResParser, BaseSearchResponse
+from .base_parser import BaseResParser, BaseSearchResponse, LazyItems
 
 
 class SauceNAOItem(BaseResParser):
@@ -163,6 +163,9 @@ class SauceNAOResponse(BaseSearchResponse[SauceNAOItem]):
     解析完整的SauceNAO API响应，包含多个搜索结果和API限制信息
     """
     
+    engine = "saucenao"
+    reports_similarity = True
+    
     def __init__(self, resp_data: dict[str, Any], resp_url: str, **kwargs: Any) -> None:
         """
         初始化SauceNAO响应解析器
@@ -186,7 +189,7 @@ class SauceNAOResponse(BaseSearchResponse[SauceNAOItem]):
         self.status_code: int = resp_data["status_code"]
         header = resp_data["header"]
         results = resp_data.get("results", [])
-        self.raw: list[SauceNAOItem] = [SauceNAOItem(i) for i in results]
+        self.raw: LazyItems[SauceNAOItem] = self._lazy(results, SauceNAOItem)
         self.short_remaining: Optional[int] = header.get("short_remaining")
         self.long_remaining: Optional[int] = header.get("long_remaining")
         self.user_id: Optional[int] = header.get("user_id")
@@ -200,6 +203,24 @@ class SauceNAOResponse(BaseSearchResponse[SauceNAOItem]):
         self.results_returned: Optional[int] = header.get("results_returned")
         self.url: str = f"https://saucenao.com/search.php?url=https://saucenao.com{header.get('query_image_display')}"
 
+    @override
+    def _hit_extra(self, item: SauceNAOItem) -> dict[str, Any]:
+        """
+        返回结果项中的附加字段
+        
+        参数:
+            item: 结果项
+            
+        返回:
+            dict[str, Any]: 附加字段
+        """
+        return {
+            "author_url": item.author_url,
+            "source": item.source,
+            "ext_urls": item.ext_urls,
+            "index_name": item.index_name,
+        }
+
     def show_result(self) -> Optional[str]:
         """
         生成可读的搜索结果文本
@@ -1,7 +1,7 @@
 from typing import Any, Optional
 from typing_extensions import override
 from ..types import DomainInfo
-from .base_parser import BaseResParser, BaseSearchResponse
+from .base_parser import BaseResParser, BaseSearchResponse, LazyItems
 
 
 class TineyeItem(BaseResParser):
@@ -45,12 +45,15 @@ class TineyeResponse(BaseSearchResponse[TineyeItem]):
     解析完整的TinEye API响应，包含多个匹配结果和分页信息
     """
     
+    engine = "tineye"
+    
     def __init__(
         self,
         resp_data: dict[str, Any],
         resp_url: str,
         domains: list[DomainInfo],
         page_number: int = 1,
+        top_k: Optional[int] = None,
     ):
         """
         初始化TinEye响应解析器
@@ -60,12 +63,14 @@ class TineyeResponse(BaseSearchResponse[TineyeItem]):
             resp_url: 响应URL
             domains: 域名信息列表
             page_number: 当前页码
+            top_k: 最多解析的结果数，None 表示不限制
         """
         super().__init__(
             resp_data,
             resp_url,
             domains=domains,
             page_number=page_number,
+            top_k=top_k,
         )
         self.domains: list[DomainInfo] = domains
         self.page_number: int = page_number
@@ -83,7 +88,25 @@ class TineyeResponse(BaseSearchResponse[TineyeItem]):
         self.status_code: int = resp_data["status_code"]
         self.total_pages: int = resp_data["total_pages"]
         matches = resp_data["matches"]
-        self.raw: list[TineyeItem] = [TineyeItem(i) for i in matches] if matches else []
+        self.raw: LazyItems[TineyeItem] = self._lazy(matches or [], TineyeItem)
+
+    @override
+    def _hit_extra(self, item: TineyeItem) -> dict[str, Any]:
+        """
+        返回结果项中的附加字段
+        
+        参数:
+            item: 结果项
+            
+        返回:
+            dict[str, Any]: 附加字段
+        """
+        return {
+            "image_url": item.image_url,
+            "domain": item.domain,
+            "size": item.size,
+            "crawl_date": item.crawl_date,
+        }
         
     def show_result(self) -> Optional[str]:
         """
@@ -1,71 +1,72 @@
-import json
-from typing import Any, Dict, List
-from pyquery import PyQuery
+from typing import Any, Dict, List, Optional
 from typing_extensions import override
+from ..ext_tools import json_loads, parse_html
+from ..embedded_json import extract_attribute_json
 from .base_parser import BaseSearchResponse
 
 class YandexResponse(BaseSearchResponse):
     """
     Yandex 搜索结果解析类
     """
-    def __init__(self, resp_data: str, resp_url: str, **kwargs: Any):
+    engine = "yandex"
+
+    def __init__(self, resp_data: bytes, resp_url: str, **kwargs: Any):
         super().__init__(resp_data, resp_url, **kwargs)
         self.max_results = kwargs.get("max_results", 10)
 
     @override
-    def _parse_response(self, resp_data: str, **kwargs: Any) -> None:
-        dom = PyQuery(resp_data)
-        # ... (rest is same) ...
+    def _parse_response(self, resp_data: bytes, **kwargs: Any) -> None:
         self.raw = []
         
-        # Yandex 结果通常存储在 div.Root 的 data-state 属性中 (JSON)
-        # Upstream logic:
-        # data_div = data.find('div.Root[id^="ImagesApp-"]')
-        # data_state = data_div.attr("data-state")
-        
-        data_div = dom('div.Root[id^="ImagesApp-"]')
-        data_state = data_div.attr("data-state")
-        
-        if not data_state:
+        # Yandex 结果存储在 div.Root[id^="ImagesApp-"] 的 data-state 属性中 (JSON)；
+        # 先直接在字节流中定位该标签读取属性，失败时才回退到完整的DOM解析
+        data_json = extract_attribute_json(resp_data, b'id="ImagesApp-', "data-state", class_name=b"Root")
+        if data_json is None:
+            data_state = parse_html(resp_data)('div.Root[id^="ImagesApp-"]').attr("data-state")
+            if not data_state:
+                return
+            try:
+                data_json = json_loads(data_state)
+            except ValueError:
+                return
+
+        if not isinstance(data_json, dict):
             return
 
+        # 路径: initialState.cbirSites.sites
+        # 使用简单的 dict.get 链式获取，避免深度依赖
+        initial_state = data_json.get("initialState", {})
+        cbir_sites = initial_state.get("cbirSites", {})
+        sites = cbir_sites.get("sites", [])
+        self.raw = self._lazy(sites, self._parse_site)
+
+    @staticmethod
+    def _parse_site(site: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         try:
-            data_json = json.loads(data_state)
+            url = site.get("url", "")
+            title = site.get("title", "")
+            content = site.get("description", "")
+            domain = site.get("domain", "")
+            
+            thumb_info = site.get("thumb", {})
+            thumb_url = thumb_info.get("url", "")
+            if thumb_url and thumb_url.startswith("//"):
+                thumb_url = "https:" + thumb_url
             
-            # 路径: initialState.cbirSites.sites
-            # 使用简单的 dict.get 链式获取，避免深度依赖
-            initial_state = data_json.get("initialState", {})
-            cbir_sites = initial_state.get("cbirSites", {})
-            sites = cbir_sites.get("sites", [])
+            original_image = site.get("originalImage", {})
+            width = original_image.get("width", 0)
+            height = original_image.get("height", 0)
+            size_str = f"{width}x{height}"
             
-            for site in sites:
-                try:
-                    url = site.get("url", "")
-                    title = site.get("title", "")
-                    content = site.get("description", "")
-                    domain = site.get("domain", "")
-                    
-                    thumb_info = site.get("thumb", {})
-                    thumb_url = thumb_info.get("url", "")
-                    if thumb_url and thumb_url.startswith("//"):
-                        thumb_url = "https:" + thumb_url
-                    
-                    original_image = site.get("originalImage", {})
-                    width = original_image.get("width", 0)
-                    height = original_image.get("height", 0)
-                    size_str = f"{width}x{height}"
-                    
-                    self.raw.append({
-                        "title": title,
-                        "url": url,
-                        "thumbnail": thumb_url,
-                        "author": domain, # 使用域名作为来源/作者
-                        "other_info": f"{size_str} {content[:50]}...",
-                    })
-                except:
-                    continue
-        except json.JSONDecodeError:
-            pass
+            return {
+                "title": title,
+                "url": url,
+                "thumbnail": thumb_url,
+                "author": domain, # 使用域名作为来源/作者
+                "other_info": f"{size_str} {content[:50]}...",
+            }
+        except:
+            return None
 
     @override
     def show_result(self) -> str:
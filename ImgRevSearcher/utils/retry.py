@@ -0,0 +1,235 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+from astrbot.api import logger
+from .transport import TRANSPORT_ERRORS, is_read_timeout
+
+R = TypeVar("R")
+
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    声明式重试策略
+
+    max_attempts 包含首次请求；退避时间为 base_delay * multiplier^(n-1)，
+    上限 max_delay，并在 [0, 退避时间] 内随机抖动（full jitter）。
+    上传请求在连接建立后超时时默认不重试：每次等待都是完整的超时时间，
+    且服务端可能仍在处理，重试只会让一次搜索阻塞数倍超时时间
+    """
+    max_attempts: int = 2
+    retry_on: tuple[type[BaseException], ...] = TRANSPORT_ERRORS
+    retry_statuses: frozenset[int] = field(default=RETRYABLE_STATUSES)
+    base_delay: float = 0.5
+    multiplier: float = 2.0
+    max_delay: float = 8.0
+    respect_retry_after: bool = True
+    # Retry-After 超过该值(秒)时不再重试，直接返回响应
+    max_retry_after: float = 30.0
+    # 上传请求读取/写入超时后是否重试
+    retry_upload_timeouts: bool = False
+
+    def with_overrides(self, **changes: Any) -> "RetryPolicy":
+        """
+        基于当前策略生成修改部分字段的新策略
+
+        参数:
+            **changes: 需要修改的字段
+
+        返回:
+            RetryPolicy: 新策略
+        """
+        return replace(self, **changes)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        计算第 attempt 次失败后的等待时间
+
+        参数:
+            attempt: 已完成的尝试次数（从1开始）
+
+        返回:
+            float: 等待时间(秒)
+        """
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def delay_for_response(self, attempt: int, headers: Optional[dict]) -> Optional[float]:
+        """
+        计算可重试状态码响应后的等待时间，优先使用 Retry-After
+
+        参数:
+            attempt: 已完成的尝试次数
+            headers: 响应头
+
+        返回:
+            Optional[float]: 等待时间(秒)，Retry-After 超出上限时返回None（不重试）
+        """
+        if self.respect_retry_after:
+            retry_after = parse_retry_after(headers)
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+        return self.backoff(attempt)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+DEFAULT_POLICY = RetryPolicy()
+
+
+def parse_retry_after(headers: Optional[dict]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头（秒数或HTTP日期）
+
+    参数:
+        headers: 响应头
+
+    返回:
+        Optional[float]: 等待时间(秒)，不存在或无法解析时返回None
+    """
+    if not headers:
+        return None
+    value = None
+    for key, val in headers.items():
+        if key.lower() == "retry-after":
+            value = str(val).strip()
+            break
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """
+    全局重试预算（令牌桶）
+
+    每次首次请求存入 ratio 个令牌，每次重试消耗 1 个令牌，另有按时间补充的最低额度；
+    故障期间重试量最多约为正常请求量的 ratio 倍，不会成倍放大对故障服务的压力
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 0.5, max_tokens: float = 20.0):
+        """
+        初始化重试预算
+
+        参数:
+            ratio: 每次首次请求补充的令牌数
+            min_per_second: 每秒补充的最低令牌数
+            max_tokens: 令牌上限
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.spent = 0
+        self.denied = 0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, amount: float = 0.0) -> None:
+        now = time.monotonic()
+        amount += (now - self._updated) * self.min_per_second
+        self._updated = now
+        self.tokens = min(self.max_tokens, self.tokens + amount)
+
+    def record_request(self) -> None:
+        """
+        登记一次首次请求
+        """
+        with self._lock:
+            self._refill(self.ratio)
+
+    def try_spend(self) -> bool:
+        """
+        尝试为一次重试消耗令牌
+
+        返回:
+            bool: 预算充足返回True
+        """
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.spent += 1
+                return True
+            self.denied += 1
+            return False
+
+    def describe(self) -> str:
+        """
+        生成重试预算状态文本，供管理员查看
+
+        返回:
+            str: 状态文本
+        """
+        with self._lock:
+            self._refill()
+            return f"重试预算: 剩余 {self.tokens:.1f}/{self.max_tokens:.0f}, 已重试 {self.spent}, 因预算不足放弃 {self.denied}"
+
+
+DEFAULT_BUDGET = RetryBudget()
+
+
+def _status_and_headers(result: Any) -> tuple[Optional[int], Optional[dict]]:
+    return getattr(result, "status_code", None), getattr(result, "headers", None)
+
+
+async def call_with_retry(
+    func: Callable[[], Awaitable[R]],
+    policy: RetryPolicy = DEFAULT_POLICY,
+    budget: Optional[RetryBudget] = DEFAULT_BUDGET,
+    name: str = "",
+    upload: bool = False,
+) -> R:
+    """
+    按重试策略执行异步调用
+
+    返回值带 status_code 属性时，可重试状态码也会触发重试；重试用尽后返回最后一次响应
+
+    参数:
+        func: 无参协程函数
+        policy: 重试策略
+        budget: 重试预算，None 表示不受预算限制
+        name: 日志中显示的调用名称
+        upload: 是否为上传请求（连接建立后超时不重试，除非策略设置 retry_upload_timeouts）
+
+    返回:
+        R: 调用结果
+
+    异常:
+        最后一次尝试的异常，或不可重试的异常
+    """
+    if budget is not None:
+        budget.record_request()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            result = await func()
+        except policy.retry_on as e:
+            if upload and not policy.retry_upload_timeouts and is_read_timeout(e):
+                raise
+            if attempt >= policy.max_attempts or (budget is not None and not budget.try_spend()):
+                raise
+            delay = policy.backoff(attempt)
+            reason = f"{type(e).__name__}: {e}"
+        else:
+            status, headers = _status_and_headers(result)
+            if status not in policy.retry_statuses or attempt >= policy.max_attempts:
+                return result
+            delay = policy.delay_for_response(attempt, headers)
+            if delay is None or (budget is not None and not budget.try_spend()):
+                return result
+            reason = f"HTTP {status}"
+        logger.warning(f"[Retry] {name or 'request'} 第 {attempt} 次尝试失败 ({reason})，{delay:.1f}s 后重试")
+        await asyncio.sleep(delay)
+
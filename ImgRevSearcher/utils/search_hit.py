@@ -0,0 +1,154 @@
+from typing import Any, Iterable, Optional
+
+HIT_FIELDS = ("engine", "similarity", "url", "title", "author", "thumbnail", "extra")
+HIT_SEPARATOR = "-" * 50
+
+
+class SearchHit:
+    """
+    统一的搜索结果记录
+
+    各引擎的响应解析器都会产出该记录，字段固定、使用 __slots__ 存储，
+    可直接转换为元组或字典，便于缓存、序列化、跨进程传输以及多引擎结果合并
+    """
+
+    __slots__ = HIT_FIELDS
+
+    def __init__(
+        self,
+        engine: str,
+        similarity: Optional[float] = None,
+        url: str = "",
+        title: str = "",
+        author: str = "",
+        thumbnail: str = "",
+        extra: Optional[dict[str, Any]] = None,
+    ):
+        """
+        初始化搜索结果记录
+
+        参数:
+            engine: 产出该结果的引擎名称
+            similarity: 相似度(0-100)，引擎未提供时为None
+            url: 结果链接
+            title: 标题
+            author: 作者或来源
+            thumbnail: 缩略图链接
+            extra: 引擎特有的附加字段（应可JSON序列化）
+        """
+        self.engine = engine
+        self.similarity = similarity
+        self.url = url
+        self.title = title
+        self.author = author
+        self.thumbnail = thumbnail
+        self.extra = extra or {}
+
+    def to_tuple(self) -> tuple:
+        """
+        转换为按 HIT_FIELDS 顺序排列的元组
+
+        返回:
+            tuple: 字段值元组
+        """
+        return (self.engine, self.similarity, self.url, self.title, self.author, self.thumbnail, self.extra)
+
+    @classmethod
+    def from_tuple(cls, values: Iterable[Any]) -> "SearchHit":
+        """
+        从 to_tuple 生成的元组还原记录
+
+        参数:
+            values: 字段值元组
+
+        返回:
+            SearchHit: 搜索结果记录
+        """
+        return cls(*values)
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        转换为字典，用于JSON序列化
+
+        返回:
+            dict[str, Any]: 字段名到字段值的映射
+        """
+        return dict(zip(HIT_FIELDS, self.to_tuple()))
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SearchHit":
+        """
+        从字典还原记录，忽略未知字段
+
+        参数:
+            data: 字段名到字段值的映射
+
+        返回:
+            SearchHit: 搜索结果记录
+        """
+        return cls(**{field: data[field] for field in HIT_FIELDS if field in data})
+
+    def __reduce__(self) -> tuple:
+        return SearchHit.from_tuple, (self.to_tuple(),)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, SearchHit):
+            return NotImplemented
+        return self.to_tuple() == other.to_tuple()
+
+    def __repr__(self) -> str:
+        return f"SearchHit(engine={self.engine!r}, similarity={self.similarity!r}, url={self.url!r}, title={self.title!r})"
+
+
+def parse_similarity(value: Any) -> Optional[float]:
+    """
+    将各引擎的相似度字段统一转换为浮点数
+
+    参数:
+        value: 原始相似度（数字或 "92.5" / "92.5%" 形式的字符串）
+
+    返回:
+        Optional[float]: 相似度，无法转换时返回None
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return float(str(value).rstrip("%"))
+    except ValueError:
+        return None
+
+
+def format_hits(hits: Iterable[SearchHit], limit: Optional[int] = None, show_engine: bool = False) -> Optional[str]:
+    """
+    将搜索结果记录格式化为通用的结果文本
+
+    参数:
+        hits: 搜索结果记录
+        limit: 最多显示的条数，None 表示全部
+        show_engine: 是否在每条结果中标注来源引擎（多引擎合并结果时使用）
+
+    返回:
+        Optional[str]: 结果文本，没有可显示的结果时返回None
+    """
+    lines = []
+    count = 0
+    for hit in hits:
+        if limit is not None and count >= limit:
+            break
+        if not (hit.url or hit.title):
+            continue
+        count += 1
+        header = f"结果 #{count}"
+        if show_engine:
+            header += f" [{hit.engine}]"
+        if hit.similarity is not None:
+            header += f" 相似度: {hit.similarity:g}%"
+        lines.append(header)
+        if hit.title:
+            lines.append(f"标题: {hit.title}")
+        if hit.author:
+            lines.append(f"作者: {hit.author}")
+        if hit.url:
+            lines.append(f"链接: {hit.url}")
+        lines.append(HIT_SEPARATOR)
+    return "\n".join(lines) if lines else None
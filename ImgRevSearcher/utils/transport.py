@@ -0,0 +1,273 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+from httpx import URL, AsyncClient, ReadTimeout, TransportError, WriteTimeout
+from curl_cffi import CurlMime
+from curl_cffi.requests import AsyncSession
+from curl_cffi.requests.exceptions import ConnectTimeout as CurlConnectTimeout
+from curl_cffi.requests.exceptions import RequestException as CurlRequestException
+from curl_cffi.requests.exceptions import Timeout as CurlTimeout
+
+HTTPX = "httpx"
+CURL_CFFI = "curl_cffi"
+TRANSPORT_BACKENDS = (HTTPX, CURL_CFFI)
+# 各后端的连接层异常，重试策略与代理故障切换据此判断
+TRANSPORT_ERRORS: tuple[type[BaseException], ...] = (TransportError, CurlRequestException)
+DEFAULT_IMPERSONATE = "chrome120"
+
+
+def is_read_timeout(error: BaseException) -> bool:
+    """
+    判断异常是否为连接建立后的超时（读取或写入），连接超时不算
+
+    参数:
+        error: 捕获到的异常
+
+    返回:
+        bool: 属于连接建立后的超时返回True
+    """
+    if isinstance(error, (ReadTimeout, WriteTimeout)):
+        return True
+    # curl 不区分读取与写入超时，统一为 Timeout
+    return isinstance(error, CurlTimeout) and not isinstance(error, CurlConnectTimeout)
+
+
+@dataclass
+class TransportResponse:
+    """
+    传输层统一响应
+
+    headers 为后端原始的响应头对象（不区分大小写），不做复制
+    """
+    content: bytes
+    url: str
+    status_code: int
+    headers: Mapping[str, str]
+
+
+def charset_from_headers(headers: Optional[Mapping[str, str]]) -> Optional[str]:
+    """
+    从 Content-Type 响应头中提取字符集
+
+    参数:
+        headers: 响应头
+
+    返回:
+        Optional[str]: 字符集名称，未声明时返回None
+    """
+    if not headers:
+        return None
+    content_type = headers.get("content-type") or headers.get("Content-Type") or ""
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset" and value.strip():
+            return value.strip().strip('"\'')
+    return None
+
+
+class TransportMetrics:
+    """
+    传输层请求统计
+
+    按 (后端, 主机) 记录请求数、失败数、接收字节数与累计耗时，所有后端共用
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats: dict[tuple[str, str], list[float]] = {}
+
+    def record(self, backend: str, url: str, elapsed: float, size: int = 0, failed: bool = False) -> None:
+        """
+        记录一次请求
+
+        参数:
+            backend: 后端名称
+            url: 请求URL
+            elapsed: 耗时(秒)
+            size: 接收字节数
+            failed: 是否失败
+        """
+        try:
+            host = URL(url).host
+        except Exception:
+            host = "?"
+        with self._lock:
+            entry = self.stats.setdefault((backend, host), [0, 0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += int(failed)
+            entry[2] += size
+            entry[3] += elapsed
+
+    def describe(self, limit: int = 10) -> str:
+        """
+        生成统计文本，供管理员查看
+
+        参数:
+            limit: 最多显示的主机数（按请求数排序）
+
+        返回:
+            str: 统计文本
+        """
+        with self._lock:
+            items = sorted(self.stats.items(), key=lambda kv: kv[1][0], reverse=True)[:limit]
+        if not items:
+            return "网络请求: 暂无记录"
+        lines = ["网络请求:"]
+        for (backend, host), (count, failed, size, elapsed) in items:
+            lines.append(
+                f"  [{backend}] {host}: {count:.0f} 次, 失败 {failed:.0f}, "
+                f"平均 {elapsed / count * 1000:.0f}ms, 接收 {size / 1024:.0f}KB"
+            )
+        return "\n".join(lines)
+
+
+METRICS = TransportMetrics()
+
+
+class AsyncTransport(ABC):
+    """
+    异步传输层接口
+
+    引擎请求经由 HandOver 统一发送到具体后端，后端负责连接池、代理与超时
+    """
+    backend: str
+
+    @abstractmethod
+    async def _send(self, method: str, url: str, **kwargs: Any) -> TransportResponse:
+        """
+        由后端实现的实际请求
+
+        参数:
+            method: HTTP方法
+            url: 请求URL
+            **kwargs: params、headers、data、files、json、timeout、follow_redirects
+
+        返回:
+            TransportResponse: 响应
+        """
+        raise NotImplementedError
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> TransportResponse:
+        """
+        发送请求并记录统计信息
+
+        参数:
+            method: HTTP方法
+            url: 请求URL
+            **kwargs: params、headers、data、files、json、timeout、follow_redirects
+
+        返回:
+            TransportResponse: 响应
+        """
+        start = time.perf_counter()
+        try:
+            resp = await self._send(method.upper(), url, **kwargs)
+        except Exception:
+            METRICS.record(self.backend, url, time.perf_counter() - start, failed=True)
+            raise
+        METRICS.record(
+            self.backend, url, time.perf_counter() - start, len(resp.content), failed=resp.status_code >= 500
+        )
+        return resp
+
+    async def aclose(self) -> None:
+        """
+        关闭底层连接
+        """
+
+
+class HttpxTransport(AsyncTransport):
+    """
+    httpx 后端
+    """
+    backend = HTTPX
+
+    def __init__(self, client: AsyncClient):
+        """
+        参数:
+            client: httpx 客户端，生命周期由客户端池或 ClientManager 管理
+        """
+        self.client = client
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> TransportResponse:
+        if "timeout" in kwargs and kwargs["timeout"] is None:
+            kwargs.pop("timeout")
+        resp = await self.client.request(method, url, **kwargs)
+        return TransportResponse(resp.content, str(resp.url), resp.status_code, resp.headers)
+
+
+def _to_multipart(data: Optional[dict], files: dict) -> CurlMime:
+    """
+    将 httpx 风格的 data/files 转换为 curl 的 multipart 表单
+
+    参数:
+        data: 普通表单字段
+        files: 文件字段，值为 (文件名, 内容, 类型) 或内容
+
+    返回:
+        CurlMime: multipart 表单
+    """
+    mime = CurlMime()
+    for name, value in (data or {}).items():
+        mime.addpart(name=name, data=str(value).encode())
+    for name, value in files.items():
+        filename, content, content_type = None, value, None
+        if isinstance(value, tuple):
+            filename, content = value[0], value[1]
+            content_type = value[2] if len(value) > 2 else None
+        if hasattr(content, "read"):
+            content = content.read()
+        mime.addpart(name=name, filename=filename, content_type=content_type, data=content)
+    return mime
+
+
+class CurlCffiTransport(AsyncTransport):
+    """
+    curl_cffi 后端，模拟浏览器 TLS 指纹，用于有 Cloudflare 等防护的站点
+    """
+    backend = CURL_CFFI
+
+    def __init__(
+        self,
+        proxies: Optional[str] = None,
+        headers: Optional[dict[str, str]] = None,
+        cookies: Optional[dict[str, str]] = None,
+        timeout: float = 30,
+        verify_ssl: bool = True,
+        impersonate: str = DEFAULT_IMPERSONATE,
+    ):
+        """
+        参数:
+            proxies: 代理服务器地址
+            headers: 默认请求头
+            cookies: 默认Cookie
+            timeout: 请求超时(秒)
+            verify_ssl: 是否验证SSL证书
+            impersonate: 模拟的浏览器指纹
+        """
+        self.session = AsyncSession(
+            impersonate=impersonate,
+            proxy=proxies or None,
+            headers=headers,
+            cookies=cookies,
+            timeout=timeout,
+            verify=verify_ssl,
+        )
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> TransportResponse:
+        files = kwargs.pop("files", None)
+        mime = _to_multipart(kwargs.pop("data", None), files) if files else None
+        if kwargs.get("timeout") is None:
+            kwargs.pop("timeout", None)
+        kwargs["allow_redirects"] = kwargs.pop("follow_redirects", True)
+        try:
+            resp = await self.session.request(method, url, multipart=mime, **kwargs)
+        finally:
+            if mime is not None:
+                mime.close()
+        return TransportResponse(resp.content, str(resp.url), resp.status_code, resp.headers)
+
+    async def aclose(self) -> None:
+        await self.session.close()
@@ -0,0 +1,215 @@
+import asyncio
+import ipaddress
+import socket
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+from httpx import URL
+
+try:
+    import aiodns
+except ImportError:
+    aiodns = None
+
+
+class UnsafeURLError(ValueError):
+    """
+    URL安全检查失败异常
+
+    URL 协议不受支持、域名无法解析或解析到内网/保留地址时抛出
+    """
+
+
+@dataclass
+class GuardedTarget:
+    """
+    通过安全检查的请求目标
+
+    pinned_url 为把域名替换为已校验IP后的URL，实际连接直接使用该IP，
+    不再进行第二次DNS解析，避免DNS重绑定
+    """
+    url: str
+    host: str
+    ip: Optional[str]
+    pinned_url: str
+
+    @property
+    def request_headers(self) -> dict[str, str]:
+        """
+        连接固定IP时需要附加的请求头（保留原始 Host）
+        """
+        if self.ip is None:
+            return {}
+        netloc = urlsplit(self.url).netloc.rsplit("@", 1)[-1]
+        return {"Host": netloc}
+
+    @property
+    def request_extensions(self) -> dict[str, str]:
+        """
+        连接固定IP时需要附加的 httpx 扩展（TLS SNI 使用原始域名）
+        """
+        if self.ip is None or not self.url.lower().startswith("https"):
+            return {}
+        return {"sni_hostname": self.host}
+
+
+def _is_public_ip(ip_str: str) -> bool:
+    """
+    判断IP是否为可访问的公网地址
+
+    参数:
+        ip_str: IP地址字符串
+
+    返回:
+        bool: 公网地址返回True
+    """
+    try:
+        ip = ipaddress.ip_address(ip_str.split("%", 1)[0])
+    except ValueError:
+        return False
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return not (ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_multicast
+                or ip.is_reserved or ip.is_unspecified)
+
+
+class UrlGuard:
+    """
+    异步URL安全检查器（防止 SSRF）
+
+    使用异步DNS解析（安装 aiodns 时优先使用，否则使用事件循环的 getaddrinfo），
+    解析结果按TTL缓存，成功与失败分别使用不同的缓存时间
+    """
+
+    def __init__(
+        self,
+        positive_ttl: float = 300,
+        negative_ttl: float = 30,
+        max_entries: int = 1024,
+        trusted_hosts: Optional[Iterable[str]] = None,
+    ):
+        """
+        初始化URL安全检查器
+
+        参数:
+            positive_ttl: 解析成功结果的缓存时间(秒)
+            negative_ttl: 解析失败结果的缓存时间(秒)
+            max_entries: 最大缓存条目数
+            trusted_hosts: 跳过内网地址检查的主机名（如本地 OneBot 文件服务）
+        """
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.trusted_hosts = {h.strip().lower() for h in (trusted_hosts or []) if h and h.strip()}
+        self._cache: dict[str, tuple[float, Optional[list[str]]]] = {}
+        self._resolver = None
+
+    async def _lookup(self, host: str) -> list[str]:
+        """
+        执行一次异步DNS解析
+
+        参数:
+            host: 主机名
+
+        返回:
+            list[str]: 解析到的IP地址列表
+        """
+        if aiodns is not None:
+            if self._resolver is None:
+                self._resolver = aiodns.DNSResolver()
+            answers = await asyncio.gather(
+                self._resolver.query(host, "A"),
+                self._resolver.query(host, "AAAA"),
+                return_exceptions=True,
+            )
+            ips = [r.host for answer in answers if not isinstance(answer, Exception) for r in answer]
+            if ips:
+                return ips
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    async def resolve(self, host: str) -> Optional[list[str]]:
+        """
+        解析主机名（带缓存）
+
+        参数:
+            host: 主机名
+
+        返回:
+            Optional[list[str]]: IP地址列表，解析失败时返回None
+        """
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+        now = time.monotonic()
+        cached = self._cache.get(host)
+        if cached and cached[0] > now:
+            return cached[1]
+        try:
+            ips: Optional[list[str]] = await self._lookup(host) or None
+        except Exception:
+            ips = None
+        if len(self._cache) >= self.max_entries:
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            if len(self._cache) >= self.max_entries:
+                self._cache.clear()
+        ttl = self.positive_ttl if ips else self.negative_ttl
+        self._cache[host] = (now + ttl, ips)
+        return ips
+
+    async def check(self, url: str) -> GuardedTarget:
+        """
+        检查URL是否安全，并返回固定IP后的请求目标
+
+        参数:
+            url: 待检查的URL
+
+        返回:
+            GuardedTarget: 通过检查的请求目标
+
+        异常:
+            UnsafeURLError: URL不安全时抛出
+        """
+        try:
+            parsed = URL(url)
+        except Exception as e:
+            raise UnsafeURLError(f"无效的URL: {url}") from e
+        if parsed.scheme not in ("http", "https"):
+            raise UnsafeURLError(f"不支持的协议: {parsed.scheme}")
+        host = parsed.host.lower()
+        if not host:
+            raise UnsafeURLError("URL缺少主机名")
+        if host in self.trusted_hosts:
+            return GuardedTarget(url=url, host=host, ip=None, pinned_url=url)
+        ips = await self.resolve(host)
+        if not ips:
+            raise UnsafeURLError(f"无法解析主机: {host}")
+        unsafe = [ip for ip in ips if not _is_public_ip(ip)]
+        if unsafe:
+            raise UnsafeURLError(f"主机 {host} 解析到不安全的地址: {unsafe[0]}")
+        ip = ips[0]
+        pinned_url = str(parsed.copy_with(host=ip)) if ip != host else url
+        return GuardedTarget(url=url, host=host, ip=ip, pinned_url=pinned_url)
+
+    async def is_safe(self, url: str) -> bool:
+        """
+        判断URL是否安全
+
+        参数:
+            url: 待检查的URL
+
+        返回:
+            bool: 安全返回True
+        """
+        try:
+            await self.check(url)
+            return True
+        except UnsafeURLError:
+            return False
+
+
+DEFAULT_GUARD = UrlGuard()
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Iterable, Optional
+from astrbot.api import logger
+
+# 本地图片先上传到 Litterbox 再按链接搜索的引擎都会访问的图床主机
+LITTERBOX_HOST = "litterbox.catbox.moe"
+# 各引擎搜索时访问的主机，经由与搜索相同的共享传输层预热
+ENGINE_HOSTS: dict[str, tuple[str, ...]] = {
+    "animetrace": ("api.animetrace.com",),
+    "ascii2d": ("ascii2d.net", LITTERBOX_HOST),
+    "iqdb": ("iqdb.org",),
+    "tracemoe": ("api.trace.moe", "graphql.anilist.co"),
+    "yandex": ("yandex.com", LITTERBOX_HOST),
+    "baidu": ("graph.baidu.com",),
+    "copyseeker": ("reverse-image-search-by-copyseeker.p.rapidapi.com", LITTERBOX_HOST),
+    "ehentai": ("upld.e-hentai.org",),
+    # SerpApi 为主、Zenserp 为备用
+    "google": ("serpapi.com", "app.zenserp.com", LITTERBOX_HOST),
+    "saucenao": ("saucenao.com",),
+    "tineye": ("tineye.com",),
+}
+WARMUP_TIMEOUT = 10
+DEFAULT_KEEPALIVE_INTERVAL = 60
+
+
+class ConnectionWarmer:
+    """
+    引擎连接预热器
+
+    启动时为每个启用的引擎预先建立连接，之后按固定间隔发送轻量探测请求，
+    使空闲连接保持可用，避免首次搜索或长时间空闲后重新握手
+    """
+
+    def __init__(
+        self,
+        warm: Callable[[str], Awaitable[int]],
+        engines: Iterable[str],
+        keepalive_interval: float = DEFAULT_KEEPALIVE_INTERVAL,
+    ):
+        """
+        初始化预热器
+
+        参数:
+            warm: 预热单个引擎的协程函数，返回成功连接的主机数
+            engines: 需要预热的引擎列表
+            keepalive_interval: 保活探测间隔(秒)，0 表示只在启动时预热一次
+        """
+        self.warm = warm
+        self.engines = list(engines)
+        self.keepalive_interval = keepalive_interval
+        self.rounds = 0
+        self.last_round: float = 0.0
+        self.last_connected: dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        启动预热协程
+        """
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        """
+        取消预热与保活协程
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _warm_engine(self, engine: str) -> None:
+        """
+        预热单个引擎，失败只记录不抛出
+
+        参数:
+            engine: 引擎名称
+        """
+        try:
+            self.last_connected[engine] = await self.warm(engine)
+        except Exception as e:
+            self.last_connected[engine] = 0
+            logger.debug(f"[Warmup] {engine} 预热失败: {e}")
+
+    async def warm_all(self) -> None:
+        """
+        并发预热所有引擎
+        """
+        start = time.perf_counter()
+        await asyncio.gather(*(self._warm_engine(engine) for engine in self.engines))
+        self.rounds += 1
+        self.last_round = time.time()
+        if self.rounds == 1:
+            ready = [e for e in self.engines if self.last_connected.get(e)]
+            logger.info(
+                f"[Warmup] 连接预热完成 ({(time.perf_counter() - start) * 1000:.0f}ms)，"
+                f"已连接: {', '.join(ready) or '无'}"
+            )
+
+    async def _run(self) -> None:
+        """
+        启动时预热一次，之后周期性保活
+        """
+        await self.warm_all()
+        while self.keepalive_interval > 0:
+            await asyncio.sleep(self.keepalive_interval)
+            await self.warm_all()
+
+    def describe(self) -> str:
+        """
+        生成预热状态文本，供管理员查看
+
+        返回:
+            str: 状态文本
+        """
+        if self._task is None and not self.rounds:
+            return "连接预热: 未启用"
+        ready = [e for e in self.engines if self.last_connected.get(e)]
+        last = time.strftime("%H:%M:%S", time.localtime(self.last_round)) if self.last_round else "尚未完成"
+        return (
+            f"连接预热: 已执行 {self.rounds} 轮，最近一次 {last}\n"
+            f"已连接引擎: {', '.join(ready) or '无'}"
+        )
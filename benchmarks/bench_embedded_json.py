@@ -0,0 +1,159 @@
+"""
+内嵌JSON提取基准测试：字节流定位 + 括号匹配 vs 完整DOM解析
+
+用法（在插件目录下、已安装 AstrBot 依赖的环境中运行）:
+    python benchmarks/bench_embedded_json.py [--baidu 百度结果页.html] [--yandex Yandex结果页.html] [-n 次数]
+
+未提供保存的页面时使用生成的模拟页面。内存为子进程中单次提取前后的峰值RSS增量
+（lxml 的内存由 libxml2 分配，tracemalloc 无法统计）。
+"""
+import argparse
+import html
+import json
+import multiprocessing
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ImgRevSearcher.utils.embedded_json import extract_attribute_json, extract_script_json  # noqa: E402
+from ImgRevSearcher.utils.ext_tools import json_loads, parse_html  # noqa: E402
+
+
+def make_baidu_page(cards: int = 40, items: int = 60) -> bytes:
+    card_data = [
+        {
+            "cardName": "simipic" if c == 0 else f"card{c}",
+            "tplData": {
+                "firstUrl": "https://graph.baidu.com/ajax/simi?x=1",
+                "list": [
+                    {"url": f"https://example.com/{c}/{i}", "title": f"标题 [{i}] {{\"q\"}}", "image_src": "x" * 80}
+                    for i in range(items)
+                ],
+            },
+        }
+        for c in range(cards)
+    ]
+    filler = "".join(f'<div class="item"><a href="/p/{i}">链接 {i}</a><span>{"文本" * 20}</span></div>' for i in range(4000))
+    scripts = "".join(f"<script>var s{i} = {{a: [{i}, {i + 1}]}};</script>" for i in range(30))
+    return (
+        f"<html><head>{scripts}</head><body>{filler}"
+        f"<script>window.cardData = {json.dumps(card_data, ensure_ascii=False)};</script>"
+        f"</body></html>"
+    ).encode("utf-8")
+
+
+def make_yandex_page(sites: int = 300) -> bytes:
+    state = {
+        "initialState": {
+            "cbirSites": {
+                "sites": [
+                    {
+                        "url": f"https://example.com/{i}",
+                        "title": f"Title <{i}> & \"quoted\"",
+                        "description": "описание " * 10,
+                        "domain": "example.com",
+                        "thumb": {"url": f"//avatars.example.com/{i}"},
+                        "originalImage": {"width": 800, "height": 600},
+                    }
+                    for i in range(sites)
+                ]
+            },
+            "other": {"blob": ["z" * 200] * 200},
+        }
+    }
+    filler = "".join(f'<div class="cell"><img src="/i/{i}.jpg"><p>{"text " * 30}</p></div>' for i in range(3000))
+    attr = html.escape(json.dumps(state, ensure_ascii=False), quote=True)
+    return (
+        f'<html><body>{filler}<div class="Root" id="ImagesApp-abc" data-state="{attr}"></div></body></html>'
+    ).encode("utf-8")
+
+
+def baidu_dom(content: bytes):
+    for script in parse_html(content)("script").items():
+        text = script.text()
+        if text and "window.cardData" in text:
+            return json_loads(text[text.find("["):text.rfind("]") + 1])
+    return []
+
+
+def baidu_fast(content: bytes):
+    return extract_script_json(content, b"window.cardData")
+
+
+def yandex_dom(content: bytes):
+    return json_loads(parse_html(content)('div.Root[id^="ImagesApp-"]').attr("data-state"))
+
+
+def yandex_fast(content: bytes):
+    return extract_attribute_json(content, b'id="ImagesApp-', "data-state", class_name=b"Root")
+
+
+CASES = {
+    "baidu": (baidu_dom, baidu_fast),
+    "yandex": (yandex_dom, yandex_fast),
+}
+
+
+def timed(func, content: bytes, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(content)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def _peak_rss_worker(case: str, index: int, path: str, queue) -> None:
+    content = Path(path).read_bytes()
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    CASES[case][index](content)
+    queue.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+
+
+def peak_rss_kb(case: str, index: int, path: str) -> int:
+    queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=_peak_rss_worker, args=(case, index, path, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baidu", help="保存的百度识图结果页")
+    parser.add_argument("--yandex", help="保存的 Yandex 结果页")
+    parser.add_argument("-n", "--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pages = {}
+        for case, saved, factory in (("baidu", args.baidu, make_baidu_page), ("yandex", args.yandex, make_yandex_page)):
+            if saved:
+                pages[case] = Path(saved)
+            else:
+                pages[case] = Path(tmp_dir) / f"{case}.html"
+                pages[case].write_bytes(factory())
+
+        for case, path in pages.items():
+            content = path.read_bytes()
+            dom, fast = CASES[case]
+            if fast(content) != dom(content):
+                print(f"[{case}] 警告: 两种方式提取结果不一致")
+            dom_ms, fast_ms = timed(dom, content, args.rounds), timed(fast, content, args.rounds)
+            dom_kb, fast_kb = peak_rss_kb(case, 0, str(path)), peak_rss_kb(case, 1, str(path))
+            print(
+                f"[{case}] 页面 {len(content) / 1024:.0f}KB | "
+                f"DOM {dom_ms:.1f}ms / +{dom_kb / 1024:.1f}MB | "
+                f"字节流 {fast_ms:.1f}ms / +{fast_kb / 1024:.1f}MB | "
+                f"加速 {dom_ms / fast_ms:.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
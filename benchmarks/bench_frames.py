@@ -0,0 +1,118 @@
+"""
+动图单帧提取基准测试：只解码需要的帧 vs 解码整个动画
+
+用法（在插件目录下、已安装 AstrBot 依赖的环境中运行）:
+    python benchmarks/bench_frames.py [动图 ...] [--frames 帧数] [--size 宽x高] [--scan 帧数] [-n 次数]
+
+对每个动图比较:
+    - 动图识别：文件头判断（is_animated） vs 打开图像读取 is_animated
+    - 单帧提取：extract_frame 取第一帧 / 前 --scan 帧中最清晰的一帧 vs 依次解码全部帧
+    - 上传字节数：原动图 vs 提取出的JPEG
+未提供动图时生成 GIF、动态 WebP、APNG 三种格式的长动画（默认 640x480、120 帧，开头几帧为淡入）。
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from PIL import Image, ImageDraw, ImageFilter, ImageSequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ImgRevSearcher.utils import cpu_tasks  # noqa: E402
+from ImgRevSearcher.utils.image_handle import is_animated, sniff_format  # noqa: E402
+
+
+# ---------- 模拟输入 ----------
+
+def make_frames(count: int, size: tuple[int, int]) -> list[Image.Image]:
+    width, height = size
+    base = Image.linear_gradient("L").resize(size)
+    frames = []
+    for i in range(count):
+        img = Image.merge("RGB", (base, base.rotate(90).resize(size), Image.new("L", size, (i * 2) % 256)))
+        draw = ImageDraw.Draw(img)
+        for k in range(16):
+            x = (k * 97 + i * 6) % width
+            draw.rectangle((x, k * height // 16, x + width // 8, (k + 1) * height // 16), fill=(255, k * 16, 0))
+        if i < 4:
+            # 淡入：开头几帧模糊
+            img = img.filter(ImageFilter.GaussianBlur(12 - 3 * i))
+        frames.append(img)
+    return frames
+
+
+def encode_animation(frames: list[Image.Image], image_format: str) -> bytes:
+    buffer = io.BytesIO()
+    first = frames[0].quantize() if image_format == "GIF" else frames[0]
+    rest = [frame.quantize() for frame in frames[1:]] if image_format == "GIF" else frames[1:]
+    first.save(buffer, format=image_format, save_all=True, append_images=rest, duration=40, loop=0)
+    return buffer.getvalue()
+
+
+# ---------- 对照实现 ----------
+
+def pil_is_animated(data: bytes) -> bool:
+    return getattr(Image.open(io.BytesIO(data)), "is_animated", False)
+
+
+def decode_all(data: bytes) -> bytes:
+    # 依次解码全部帧（例如先读取 n_frames 或把动画整体载入内存的实现）
+    first = None
+    for frame in ImageSequence.Iterator(Image.open(io.BytesIO(data))):
+        frame.load()
+        if first is None:
+            first = frame.convert("RGB")
+    buffer = io.BytesIO()
+    first.save(buffer, format="JPEG", quality=cpu_tasks.FRAME_QUALITY)
+    return buffer.getvalue()
+
+
+def timed(func: Callable[[], object], rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*", help="测试动图")
+    parser.add_argument("--frames", type=int, default=120, help="模拟动画的帧数")
+    parser.add_argument("--size", default="640x480", help="模拟动画的尺寸")
+    parser.add_argument("--scan", type=int, default=8, help="选取最清晰一帧时比较的帧数")
+    parser.add_argument("-n", "--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.images:
+        inputs = [(path, Path(path).read_bytes()) for path in args.images]
+    else:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+        frames = make_frames(args.frames, (width, height))
+        inputs = [(f"模拟 {name}", encode_animation(frames, name)) for name in ("GIF", "WEBP", "PNG")]
+
+    for name, data in inputs:
+        image_format = sniff_format(data)
+        header_us = timed(lambda: is_animated(data, image_format), 100) * 1000
+        open_us = timed(lambda: pil_is_animated(data), 100) * 1000
+        first_ms = timed(lambda: cpu_tasks.extract_frame(data), args.rounds)
+        scan_ms = timed(lambda: cpu_tasks.extract_frame(data, args.scan), args.rounds)
+        all_ms = timed(lambda: decode_all(data), args.rounds)
+        first, sharpest = cpu_tasks.extract_frame(data), cpu_tasks.extract_frame(data, args.scan)
+        sharpness = [cpu_tasks._sharpness(Image.open(io.BytesIO(frame))) for frame in (first, sharpest)]
+        print(
+            f"{name} ({image_format}, {len(data) / 1024:.0f}KB) | "
+            f"识别: 文件头 {header_us:.1f}us, 打开图像 {open_us:.1f}us | "
+            f"第一帧 {first_ms:.1f}ms, 前 {args.scan} 帧选最清晰 {scan_ms:.1f}ms, 解码全部帧 {all_ms:.1f}ms "
+            f"({all_ms / first_ms:.0f}x) | 上传 {len(data) / 1024:.0f}KB -> {len(first) / 1024:.0f}KB | "
+            f"清晰度 第一帧 {sharpness[0]:.0f}, 选取帧 {sharpness[1]:.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+HTML结果页解析基准测试：预编译 XPath 解析器 vs 原 PyQuery CSS 选择器实现
+
+用法（在插件目录下、已安装 AstrBot 依赖的环境中运行）:
+    python benchmarks/bench_html_parsers.py [--ascii2d 页面.html ...] [--iqdb 页面.html ...] [--ehentai 页面.html ...] [-n 次数]
+
+每个页面先比较两种实现的解析结果，不一致时打印差异并以非零状态退出；
+未提供保存的页面时使用按真实页面结构生成的模拟页面。
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from pyquery import PyQuery
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ImgRevSearcher.utils.ext_tools import parse_html  # noqa: E402
+from ImgRevSearcher.utils.response_parser.ascii2d_parser import BASE_URL, Ascii2DResponse  # noqa: E402
+from ImgRevSearcher.utils.response_parser.ehentai_parser import EHentaiResponse  # noqa: E402
+from ImgRevSearcher.utils.response_parser.iqdb_parser import IqdbResponse  # noqa: E402
+
+EHENTAI_FIELDS = ("title", "url", "thumbnail", "type", "date", "pages", "tags")
+
+
+# ---------- 原 PyQuery 实现（作为对照） ----------
+
+def legacy_ascii2d(content: bytes) -> list[dict[str, Any]]:
+    results = []
+    for item in parse_html(content)("div.row.item-box").items():
+        if not item.find("div.detail-box a"):
+            continue
+        try:
+            hash_txt = item.find("div.hash").text()
+            params = item.find("div.text-muted").text()
+            img_src = item.find("img").attr("src")
+            if img_src and img_src.startswith("/"):
+                img_src = f"{BASE_URL}{img_src}"
+            links = item.find("div.detail-box").find("a")
+            title = url = author = author_url = ""
+            if links:
+                title = links.eq(0).text() or "No Title"
+                url = links.eq(0).attr("href")
+                if len(links) > 1:
+                    author = links.eq(1).text()
+                    author_url = links.eq(1).attr("href")
+            results.append({
+                "title": title, "url": url, "author": author, "author_url": author_url,
+                "thumbnail": img_src, "other_info": f"{hash_txt} {params}",
+            })
+        except Exception:
+            pass
+    return results
+
+
+def legacy_iqdb(content: bytes) -> list[dict[str, Any]]:
+    results = []
+    for table in parse_html(content)(".pages table").items():
+        if "match" not in table("th").text():
+            continue
+        try:
+            td_img = table("td.image")
+            link_tag = td_img("a") if td_img else None
+            url = link_tag.attr("href") if link_tag else None
+            if not url:
+                continue
+            thumbnail = link_tag("img").attr("src")
+            if url.startswith("//"):
+                url = "https:" + url
+            elif url.startswith("/"):
+                url = "https://iqdb.org" + url
+            if thumbnail and thumbnail.startswith("/"):
+                thumbnail = "https://iqdb.org" + thumbnail
+            similarity = 0.0
+            rows = table("tr")
+            for tr in rows.items():
+                text = tr.text()
+                if "% similarity" in text:
+                    try:
+                        similarity = float(text.split("%")[0].strip().split()[-1])
+                    except ValueError:
+                        pass
+            other_info = []
+            for tr in rows.items():
+                txt = tr.text().strip()
+                if "match" in txt or "% similarity" in txt or not txt or txt == table("th").text().strip():
+                    continue
+                if not tr.find("td.image"):
+                    other_info.append(txt)
+            results.append({
+                "title": table("th").text() or "Result", "url": url, "thumbnail": thumbnail,
+                "author": "", "similarity": similarity, "other_info": " | ".join(other_info),
+            })
+        except Exception:
+            pass
+    results.sort(key=lambda x: x.get("similarity", 0), reverse=True)
+    return results
+
+
+def legacy_ehentai_item(data: PyQuery) -> tuple:
+    glink = data.find(".glink")
+    title = glink.text()
+    if glink.parent("div"):
+        url = glink.parent("div").parent("a").attr("href")
+    else:
+        url = glink.parent("a").attr("href")
+    thumbnail = data.find(".glthumb img") or data.find(".gl1e img") or data.find(".gl3t img")
+    thumbnail = thumbnail.attr("data-src") or thumbnail.attr("src")
+    _type = data.find(".cs") or data.find(".cn")
+    pages = "解析失败"
+    if glink:
+        pages_div = glink.parent().parent().parent().find(".gl4c div").filter(
+            lambda i, e: "pages" in PyQuery(e).text()
+        )
+        if len(pages_div) > 0:
+            pages_text = pages_div.eq(0).text().strip()
+            pages = pages_text.split()[0] if pages_text else "解析失败"
+    tags = [tag for i in data.find("div[class=gt],div[class=gtl]").items() if (tag := i.attr("title"))]
+    return (title, url, thumbnail, _type.eq(0).text() or "", data.find("[id^='posted']").eq(0).text() or "", pages, tags)
+
+
+def legacy_ehentai(content: bytes) -> list[tuple]:
+    if b"No unfiltered results" in content:
+        return []
+    data = parse_html(content)
+    rows = [i for i in data.find(".itg").children("tr").items() if i.children("td")]
+    # 原实现中 items() 生成器恒为真，缩略图模式 (.gl1t) 分支不会执行
+    return [legacy_ehentai_item(i) for i in rows]
+
+
+# ---------- 新实现 ----------
+
+def xpath_ascii2d(content: bytes) -> list[dict[str, Any]]:
+    return list(Ascii2DResponse(content, "").raw)
+
+
+def xpath_iqdb(content: bytes) -> list[dict[str, Any]]:
+    return list(IqdbResponse(content, "").raw)
+
+
+def xpath_ehentai(content: bytes) -> list[tuple]:
+    return [tuple(getattr(item, field) for field in EHENTAI_FIELDS) for item in EHentaiResponse(content, "").raw]
+
+
+# ---------- 模拟页面 ----------
+
+def make_ascii2d_page(items: int = 20) -> bytes:
+    rows = ['<div class="row item-box"><div class="image-box"><img src="/thumbnail/self.jpg"></div>'
+            '<div class="info-box"><div class="hash">selfhash</div><small class="text-muted">500x500 PNG 1KB</small></div></div>']
+    for i in range(items):
+        rows.append(
+            f'<hr><div class="row item-box"><div class="col-xs-12 image-box">'
+            f'<img loading="lazy" src="/thumbnail/{i}.jpg" alt="t"></div>'
+            f'<div class="col-xs-12 info-box"><div class="hash">{i:032x}</div>'
+            f'<div class="text-muted">1000x{i} JPEG {i}.0KB</div>'
+            f'<div class="detail-box gray-link"><h6><img src="/img/pixiv.png"> '
+            f'<a target="_blank" href="https://www.pixiv.net/artworks/{i}">作品 {i}</a>\n'
+            f'<a target="_blank" href="https://www.pixiv.net/users/{i}">作者 {i}</a> <small>pixiv</small></h6></div>'
+            f'</div></div>'
+        )
+    nav = "".join(f'<li class="nav-item"><a href="/x/{i}">菜单 {i}</a></li>' for i in range(200))
+    return f'<html><body><ul class="nav">{nav}</ul><div class="container">{"".join(rows)}</div></body></html>'.encode()
+
+
+def make_iqdb_page(matches: int = 12) -> bytes:
+    tables = ["<div><table><tr><th>Your image</th></tr><tr><td class='image'><img src='/thu/self.jpg'></td></tr>"
+              "<tr><td>500×500 JPEG</td></tr></table></div>"]
+    for i in range(matches):
+        kind = "Best match" if i == 0 else "Additional match"
+        tables.append(
+            f"<div><table><tr><th>{kind}</th></tr>"
+            f"<tr><td class='image'><a href='//danbooru.donmai.us/posts/{i}'><img src='/danbooru/{i}.jpg' alt='a'></a></td></tr>"
+            f"<tr><td><img class='service-icon' src='/icon/danbooru.ico'>Danbooru <span class='el'>Safe</span></td></tr>"
+            f"<tr><td>1435×{1000 + i} [Safe]</td></tr><tr><td>{90 - i}% similarity</td></tr></table></div>"
+        )
+    return f"<html><body><div id='yetmore'></div><div class='pages'>{''.join(tables)}</div></body></html>".encode()
+
+
+def make_ehentai_page(rows: int = 25) -> bytes:
+    trs = ["<tr><th>Category</th><th>Published</th><th>Title</th><th>Uploader</th></tr>"]
+    for i in range(rows):
+        tags = "".join(
+            f'<div class="{"gtl" if j % 3 == 0 else "gt"}" title="female:tag {j}">tag {j}</div>' for j in range(12)
+        )
+        trs.append(
+            f'<tr><td class="gl1c glcat"><div class="cn ct2">Doujinshi</div></td>'
+            f'<td class="gl2c"><div class="glthumb" id="it{i}"><div><img data-src="https://ehgt.org/t/{i}.jpg" src="data:,"></div></div>'
+            f'<div><div id="posted_{i}">2024-01-{i % 28 + 1:02d} 12:00</div></div></td>'
+            f'<td class="gl3c glname"><a href="https://e-hentai.org/g/{i}/abc/"><div class="glink">标题 {i} [中国翻訳]</div>'
+            f'<div>{tags}</div></a></td>'
+            f'<td class="gl4c glhide"><div><a href="https://e-hentai.org/uploader/u{i}">uploader</a></div><div>{i + 10} pages</div></td></tr>'
+        )
+    return f'<html><body><div class="ido"><table class="itg gltc">{"".join(trs)}</table></div></body></html>'.encode()
+
+
+CASES: dict[str, tuple[Callable, Callable, Callable]] = {
+    "ascii2d": (legacy_ascii2d, xpath_ascii2d, make_ascii2d_page),
+    "iqdb": (legacy_iqdb, xpath_iqdb, make_iqdb_page),
+    "ehentai": (legacy_ehentai, xpath_ehentai, make_ehentai_page),
+}
+
+
+def timed(func: Callable, content: bytes, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(content)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for case in CASES:
+        parser.add_argument(f"--{case}", nargs="*", default=[], help=f"保存的 {case} 结果页")
+    parser.add_argument("-n", "--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    mismatches = 0
+    for case, (legacy, fast, factory) in CASES.items():
+        pages = [(path, Path(path).read_bytes()) for path in getattr(args, case)] or [("模拟页面", factory())]
+        for name, content in pages:
+            expected, actual = legacy(content), fast(content)
+            if expected != actual:
+                mismatches += 1
+                print(f"[{case}] {name}: 解析结果不一致\n  原实现: {expected[:3]}\n  新实现: {actual[:3]}")
+                continue
+            legacy_ms, fast_ms = timed(legacy, content, args.rounds), timed(fast, content, args.rounds)
+            print(
+                f"[{case}] {name} ({len(content) / 1024:.0f}KB, {len(actual)} 条结果) | "
+                f"PyQuery {legacy_ms:.2f}ms | XPath {fast_ms:.2f}ms | 加速 {legacy_ms / fast_ms:.1f}x"
+            )
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+上传前预处理基准测试：各引擎配置的上传体积、预处理耗时与匹配质量
+
+用法（在插件目录下、已安装 AstrBot 依赖与 numpy 的环境中运行）:
+    python benchmarks/bench_preprocess.py [图片 ...] [--uplink-mbps 上行带宽] [-n 次数]
+
+对每张图片、每个引擎配置比较:
+    - 上传字节数：原图 vs 预处理后
+    - 预处理耗时：prepare_upload（draft/reduce 快速缩小） vs 完整解码后直接 LANCZOS 缩放
+    - 按上行带宽估算的上传耗时（预处理耗时 + 上传耗时 与直接上传原图对比）
+    - 原图与预处理结果的感知哈希距离（0-64，越小越接近，用于确认不影响匹配）
+未提供图片时使用生成的手机截图（PNG 1080x2400）与 1200 万像素照片（JPEG 4000x3000）。
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ImgRevSearcher.utils import cpu_tasks  # noqa: E402
+from ImgRevSearcher.utils.image_handle import sniff_format  # noqa: E402
+from ImgRevSearcher.utils.preprocess import DEFAULT_PROFILES, UploadProfile  # noqa: E402
+
+
+# ---------- 模拟输入 ----------
+
+def make_screenshot() -> bytes:
+    img = Image.new("RGB", (1080, 2400), (245, 245, 245))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, 1080, 180), fill=(33, 150, 243))
+    for row in range(18):
+        top = 220 + row * 120
+        draw.ellipse((40, top, 130, top + 90), fill=(row * 13 % 255, 120, 200))
+        draw.rounded_rectangle((160, top, 1040, top + 90), radius=24, fill="white", outline=(220, 220, 220))
+        for line in range(3):
+            draw.text((190, top + 12 + line * 24), f"消息 {row}-{line} " + "lorem ipsum dolor sit amet " * 2, fill=(40, 40, 40))
+    img.paste(make_photo_image((600, 400)), (240, 900))
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def make_photo_image(size: tuple[int, int]) -> Image.Image:
+    width, height = size
+    gradient = Image.linear_gradient("L").resize(size)
+    noise = Image.effect_noise(size, 40).filter(ImageFilter.GaussianBlur(1))
+    shapes = Image.new("L", size, 0)
+    draw = ImageDraw.Draw(shapes)
+    for i in range(12):
+        x, y = (i * 7919) % width, (i * 104729) % height
+        radius = min(size) // (4 + i % 5)
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=60 + i * 15)
+    return Image.merge("RGB", (gradient, noise, shapes.filter(ImageFilter.GaussianBlur(8))))
+
+
+def make_photo() -> bytes:
+    img = make_photo_image((4000, 3000))
+    exif = Image.Exif()
+    exif[0x0112] = 6  # 相机竖拍，需要按EXIF方向旋转
+    exif[0x010F] = "Benchmark Camera"
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=95, exif=exif)
+    return buffer.getvalue()
+
+
+# ---------- 对照实现：完整解码后直接缩放 ----------
+
+def naive_upload(data: bytes, max_side: int, quality: int = 90) -> bytes:
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(data))).convert("RGB")
+    if max_side and max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def reference_hash(data: bytes) -> Optional[int]:
+    # 感知哈希不读取EXIF方向，与预处理结果比较前先按方向旋转原图
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    buffer = io.BytesIO()
+    img.convert("RGB").save(buffer, format="PNG")
+    return cpu_tasks.phash_values([buffer.getvalue()])[0]
+
+
+def timed(func: Callable, data: bytes, profile: UploadProfile, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(data, profile.max_side, profile.quality)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*", help="测试图片")
+    parser.add_argument("--uplink-mbps", type=float, default=10.0, help="估算上传耗时使用的上行带宽(Mbps)")
+    parser.add_argument("-n", "--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    inputs = [(path, Path(path).read_bytes()) for path in args.images] or [
+        ("模拟截图", make_screenshot()),
+        ("模拟照片", make_photo()),
+    ]
+    upload_ms = lambda length: length * 8 / (args.uplink_mbps * 1000)  # noqa: E731
+    # 相同配置的引擎结果相同，只测一次
+    profiles: dict[UploadProfile, list[str]] = {}
+    for engine, profile in DEFAULT_PROFILES.items():
+        profiles.setdefault(profile, []).append(engine)
+
+    for name, data in inputs:
+        size = Image.open(io.BytesIO(data)).size
+        original_hash = reference_hash(data)
+        print(f"{name}: {sniff_format(data)} {size[0]}x{size[1]}, {len(data) / 1024:.0f}KB, "
+              f"直接上传约 {upload_ms(len(data)):.0f}ms")
+        for profile, engines in profiles.items():
+            if profile.accepts(sniff_format(data), size, len(data)):
+                print(f"  {'/'.join(engines)} ({profile.max_side}px): 原图符合配置，直接上传")
+                continue
+            output = cpu_tasks.prepare_upload(data, profile.max_side, profile.quality)
+            naive_ms = timed(naive_upload, data, profile, args.rounds)
+            fast_ms = timed(cpu_tasks.prepare_upload, data, profile, args.rounds)
+            processed_hash = cpu_tasks.phash_values([output])[0]
+            distance = (
+                bin(original_hash ^ processed_hash).count("1")
+                if original_hash is not None and processed_hash is not None else "-"
+            )
+            print(
+                f"  {'/'.join(engines)} ({profile.max_side}px q{profile.quality}): "
+                f"{len(data) / 1024:.0f}KB -> {len(output) / 1024:.0f}KB | "
+                f"完整解码 {naive_ms:.0f}ms, 快速缩小 {fast_ms:.0f}ms ({naive_ms / fast_ms:.1f}x) | "
+                f"预处理+上传 {fast_ms + upload_ms(len(output)):.0f}ms vs 原图 {upload_ms(len(data)):.0f}ms | "
+                f"哈希距离 {distance}"
+            )
+
+
+if __name__ == "__main__":
+    main()
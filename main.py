@@ -5,22 +5,42 @@ import re
 import tempfile
 import time
 from typing import List
-from pathlib import Path
 import httpx
-from PIL import Image, ImageDraw, ImageFont
 from astrbot.api.event import AstrMessageEvent, filter
 from astrbot.api.message_components import Image as AstrImage, Nodes, Node, Plain
 from astrbot.api.star import Context, Star, register
 from astrbot.api import logger
 import base64
-import socket
-import ipaddress
-from urllib.parse import urlparse
 from .ImgRevSearcher.model import BaseSearchModel
+from .ImgRevSearcher.utils import cpu_tasks, executors
+from .ImgRevSearcher.utils.executors import run_cpu
+from .ImgRevSearcher.utils.network import DownloadRejected, stream_download
+from .ImgRevSearcher.utils.load_shed import DegradeMode, LoadShedder
+from .ImgRevSearcher.utils.url_guard import UrlGuard
+from .ImgRevSearcher.utils.proxy_pool import ProxyPool, ProxyRouter, parse_rules
+from .ImgRevSearcher.utils.warmup import DEFAULT_KEEPALIVE_INTERVAL, ConnectionWarmer
+from .ImgRevSearcher.utils.health import QUOTA_ENGINES, HealthProber, HealthRegistry
+from .ImgRevSearcher.utils.retry import DEFAULT_BUDGET
+from .ImgRevSearcher.utils.transport import METRICS
+from .ImgRevSearcher.utils.anilist_cache import DEFAULT_MEMORY_ENTRIES, AniListCache
+from .ImgRevSearcher.utils.fusion import DEFAULT_FUSION_ENGINES, DEFAULT_FUSION_RESULTS, DEFAULT_FUSION_TOP_K, FUSION_ENGINE
+from .ImgRevSearcher.utils.search_hit import format_hits
+from .ImgRevSearcher.utils.rerank import (
+    DEFAULT_BYTE_BUDGET, DEFAULT_MAX_DISTANCE, DEFAULT_MAX_THUMBNAILS, DEFAULT_RERANK_ENGINES,
+    DEFAULT_THUMBNAIL_BYTES, DEFAULT_TIME_BUDGET, ThumbnailReranker
+)
+from .ImgRevSearcher.utils.image_handle import ImageHandle
+from .ImgRevSearcher.utils.local_index import (
+    DEFAULT_MAX_DISTANCE as DEFAULT_LOCAL_MAX_DISTANCE, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_RESULTS,
+    DEFAULT_LOCAL_ENGINES, DEFAULT_MIN_SIMILARITY, DEFAULT_RECORD_THUMBNAILS, LOCAL_ENGINE, LocalIndex
+)
+from .ImgRevSearcher.utils.preprocess import parse_profiles
 
 ALL_ENGINES = [
     "animetrace", "ascii2d", "iqdb", "tracemoe", "yandex", "baidu", "copyseeker", "ehentai", "google", "saucenao", "tineye"
 ]
+# 搜图命令中带有这些参数时跳过本地索引，直接请求引擎
+SKIP_LOCAL_FLAGS = {"刷新", "-f", "--fresh"}
 
 ENGINE_INFO = {
     "animetrace": {"url": "https://www.animetrace.com/", "anime": True},
@@ -199,6 +219,14 @@ class ImgRevSearcherPlugin(Star):
         self.cleanup_task = asyncio.create_task(self.cleanup_loop())
         available_apis_config = config.get("available_apis", {})
         self.available_engines = [e for e in ALL_ENGINES if available_apis_config.get(e, True)]
+        fusion_config = config.get("fusion", {})
+        self.fusion_engines = []
+        if fusion_config.get("enabled", True):
+            self.fusion_engines = [
+                e for e in (fusion_config.get("engines") or DEFAULT_FUSION_ENGINES) if e in self.available_engines
+            ]
+        self.fusion_results = fusion_config.get("max_results", DEFAULT_FUSION_RESULTS)
+        self.fusion_top_k = fusion_config.get("top_k", DEFAULT_FUSION_TOP_K)
         timeout_settings = config.get("timeout_settings", {})
         self.search_params_timeout = timeout_settings.get("search_params_timeout", 30)
         self.text_confirm_timeout = timeout_settings.get("text_confirm_timeout", 30)
@@ -217,11 +245,119 @@ class ImgRevSearcherPlugin(Star):
             if keyword and keyword.strip():
                 self.engine_keywords[keyword.strip().lower()] = engine
         default_params = config.get("default_params", {})
+        download_config = config.get("download", {})
+        self.max_download_bytes = int(download_config.get("max_image_size_mb", 20) * 1024 * 1024)
+        dns_cache_ttl = download_config.get("dns_cache_ttl", 300)
+        self.url_guard = UrlGuard(
+            positive_ttl=dns_cache_ttl,
+            negative_ttl=max(1, dns_cache_ttl / 10),
+            trusted_hosts=download_config.get("trusted_hosts", []),
+        )
+        proxy_config = config.get("proxy_routing", {})
+        self.proxy_pool = ProxyPool(
+            proxy_config.get("pool", []),
+            check_url=proxy_config.get("health_check_url") or "https://www.gstatic.com/generate_204",
+            check_interval=proxy_config.get("health_check_interval", 60),
+        )
+        self.proxy_router = ProxyRouter(
+            default=config.get("proxies", ""),
+            engine_rules=parse_rules(proxy_config.get("engine_rules")),
+            host_rules=parse_rules(proxy_config.get("host_rules")),
+            pool=self.proxy_pool,
+        )
+        self.proxy_pool.start()
+        anilist_cache_config = config.get("anilist_cache", {})
+        self.anilist_cache = None
+        if anilist_cache_config.get("enabled", True):
+            self.anilist_cache = AniListCache(
+                ttl=anilist_cache_config.get("ttl_days", 30) * 24 * 3600,
+                memory_entries=anilist_cache_config.get("memory_entries", DEFAULT_MEMORY_ENTRIES),
+            )
+            if anilist_cache_config.get("import_path"):
+                asyncio.create_task(self._import_anilist_cache(anilist_cache_config["import_path"]))
+        rerank_config = config.get("rerank", {})
+        self.reranker = None
+        if rerank_config.get("enabled", False):
+            self.reranker = ThumbnailReranker(
+                engines=rerank_config.get("engines") or DEFAULT_RERANK_ENGINES,
+                max_thumbnails=rerank_config.get("max_thumbnails", DEFAULT_MAX_THUMBNAILS),
+                max_bytes=int(rerank_config.get("thumbnail_max_kb", DEFAULT_THUMBNAIL_BYTES // 1024) * 1024),
+                byte_budget=int(rerank_config.get("budget_mb", DEFAULT_BYTE_BUDGET / 1024 / 1024) * 1024 * 1024),
+                time_budget=rerank_config.get("time_budget", DEFAULT_TIME_BUDGET),
+                max_distance=rerank_config.get("max_distance", DEFAULT_MAX_DISTANCE),
+                prune=rerank_config.get("prune", True),
+            )
+            if not self.reranker.available:
+                logger.warning("[Rerank] 已启用缩略图重排，但未安装 numpy，重排不会生效")
+        local_index_config = config.get("local_index", {})
+        self.local_index = None
+        if local_index_config.get("enabled", False):
+            self.local_index = LocalIndex(
+                max_distance=local_index_config.get("max_distance", DEFAULT_LOCAL_MAX_DISTANCE),
+                max_results=local_index_config.get("max_results", DEFAULT_MAX_RESULTS),
+                min_similarity=local_index_config.get("min_similarity", DEFAULT_MIN_SIMILARITY),
+                record_thumbnails=local_index_config.get("record_thumbnails", DEFAULT_RECORD_THUMBNAILS),
+                max_entries=local_index_config.get("max_entries", DEFAULT_MAX_ENTRIES),
+                engines=local_index_config.get("engines") or DEFAULT_LOCAL_ENGINES,
+            )
+            if not self.local_index.available:
+                logger.warning("[LocalIndex] 已启用本地索引，但未安装 numpy，本地索引不会生效")
+        preprocess_config = config.get("preprocess", {})
+        self.scan_frames = max(0, preprocess_config.get("scan_frames", 0))
+        upload_profiles = None
+        if preprocess_config.get("enabled", True):
+            upload_profiles = parse_profiles(preprocess_config.get("rules", []), ALL_ENGINES)
         self.search_model = BaseSearchModel(
             proxies=config.get("proxies", ""),
             timeout=60,
             default_params=default_params,
-            default_cookies=config.get("default_cookies", {})
+            default_cookies=config.get("default_cookies", {}),
+            max_download_bytes=self.max_download_bytes,
+            url_guard=self.url_guard,
+            proxy_router=self.proxy_router,
+            anilist_cache=self.anilist_cache,
+            reranker=self.reranker,
+            local_index=self.local_index,
+            upload_profiles=upload_profiles,
+            scan_frames=self.scan_frames
+        )
+        warmup_config = config.get("warmup", {})
+        self.warmer = ConnectionWarmer(
+            self.search_model.warm_up,
+            self.available_engines,
+            keepalive_interval=warmup_config.get("keepalive_interval", DEFAULT_KEEPALIVE_INTERVAL),
+        )
+        if warmup_config.get("enabled", False):
+            self.warmer.start()
+        health_config = config.get("health_probe", {})
+        self.engine_health = HealthRegistry()
+        probe_engines = health_config.get("engines") or [
+            e for e in self.available_engines if e not in QUOTA_ENGINES
+        ]
+        self.health_prober = HealthProber(
+            self.search_model.search,
+            self.engine_health,
+            [e for e in probe_engines if e in self.available_engines],
+            min_interval=health_config.get("min_interval", 600),
+            max_interval=health_config.get("max_interval", 21600),
+        )
+        if health_config.get("enabled", False):
+            self.health_prober.start()
+        load_shedding_config = config.get("load_shedding", {})
+        self.load_shedder = LoadShedder(
+            enabled=load_shedding_config.get("enabled", True),
+            depth_thresholds=load_shedding_config.get("depth_thresholds"),
+            lag_thresholds_ms=load_shedding_config.get("lag_thresholds_ms"),
+            short_timeout=load_shedding_config.get("short_timeout", 20),
+            cheap_engines=load_shedding_config.get("cheap_engines"),
+        )
+        self.load_shedder.start()
+        execution_config = config.get("execution", {})
+        executors.configure(
+            cpu_backend=execution_config.get("cpu_backend", "thread"),
+            process_workers=execution_config.get("process_workers", 0),
+            io_workers=execution_config.get("io_workers", executors.DEFAULT_IO_WORKERS),
+            cpu_workers=execution_config.get("cpu_workers", executors.DEFAULT_CPU_WORKERS),
         )
         self.state_handlers = {
             "waiting_text_confirm": self._handle_waiting_text_confirm,
@@ -234,39 +370,6 @@ class ImgRevSearcherPlugin(Star):
         }
 
 
-    @staticmethod
-    def _is_safe_url(url: str) -> bool:
-        """
-        检查 URL 是否安全 (防止 SSRF)
-        """
-        try:
-            parsed = urlparse(url)
-            if parsed.scheme not in ('http', 'https'):
-                return False
-            
-            hostname = parsed.hostname
-            if not hostname:
-                return False
-                
-            # 获取 IP 地址
-            try:
-                addr_info = socket.getaddrinfo(hostname, None)
-            except socket.gaierror:
-                return False
-                
-            for family, socktype, proto, canonname, sockaddr in addr_info:
-                ip_str = sockaddr[0]
-                ip = ipaddress.ip_address(ip_str)
-                # 禁止以下类型的 IP
-                if ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_multicast:
-                    # logger.warning(f"检测到不安全的 IP 地址: {ip_str} ({hostname})")
-                    return False
-            
-            return True
-        except Exception as e:
-            # logger.warning(f"URL 安全检查失败: {e}")
-            return False
-
     async def _fetch_reply_images_via_api(self, event: AstrMessageEvent, reply_id: str) -> List[io.BytesIO]:
         """通过 OneBot API 获取被引用消息中的图片"""
         images = []
@@ -334,7 +437,7 @@ class ImgRevSearcherPlugin(Star):
                     elif hasattr(seg_data, 'url'):
                         img_url = seg_data.url
                     
-                    if img_url and self._is_safe_url(img_url):
+                    if img_url and img_url.startswith(("http://", "https://")):
                         urls.append(img_url)
             
             if urls:
@@ -419,7 +522,7 @@ class ImgRevSearcherPlugin(Star):
 
     async def terminate(self):
         """
-        插件关闭时收尾操作：关闭http连接与定时清理任务
+        插件关闭时收尾操作：关闭http连接、预热与定时清理任务
 
         异常:
             无
@@ -427,10 +530,23 @@ class ImgRevSearcherPlugin(Star):
         await self.client.aclose()
         if hasattr(self, 'cleanup_task'):
             self.cleanup_task.cancel()
+        self.load_shedder.stop()
+        self.proxy_pool.stop()
+        self.warmer.stop()
+        self.health_prober.stop()
+        await self.search_model.aclose()
+        if self.anilist_cache is not None:
+            self.anilist_cache.close()
+        if self.local_index is not None:
+            self.local_index.close()
+        executors.shutdown()
 
     async def _download_img(self, url: str):
         """
-        异步下载图片数据，转为BytesIO对象
+        异步流式下载图片数据，转为BytesIO对象
+
+        超过大小上限或内容不是图片时提前中止，不会完整下载响应体；
+        URL 及每次重定向都经过安全检查，指向内网地址的链接会被拒绝
 
         参数:
             url (str): 图片URL
@@ -442,9 +558,12 @@ class ImgRevSearcherPlugin(Star):
             网络异常会吞掉，返回None
         """
         try:
-            r = await self.client.get(url, timeout=15)
-            if r.status_code == 200:
-                return io.BytesIO(r.content)
+            data = await stream_download(
+                self.client, url, max_bytes=self.max_download_bytes, guard=self.url_guard, timeout=15
+            )
+            return io.BytesIO(data)
+        except DownloadRejected as e:
+            logger.warning(f"图片下载被拒绝: {e} ({url})")
         except Exception:
             pass
         return None
@@ -503,100 +622,21 @@ class ImgRevSearcherPlugin(Star):
         异常:
             无
         """
-        def create_engine_intro_image():
-            width = 1000
-            cell_height = 50
-            header_height = 60
-            title_height = 70
-            table_height = header_height + cell_height * len(self.available_engines)
-            height = title_height + table_height + 25
-            border_width = 2
-            
-            def rounded_rectangle(draw, xy, radius, fill=None, outline=None, width=1):
-                x1, y1, x2, y2 = xy
-                diameter = 2 * radius
-                draw.rectangle([x1 + radius, y1, x2 - radius, y2], fill=fill, outline=outline, width=width)
-                draw.rectangle([x1, y1 + radius, x2, y2 - radius], fill=fill, outline=outline, width=width)
-                draw.pieslice([x1, y1, x1 + diameter, y1 + diameter], 180, 270, fill=fill, outline=outline, width=width)
-                draw.pieslice([x2 - diameter, y1, x2, y1 + diameter], 270, 360, fill=fill, outline=outline, width=width)
-                draw.pieslice([x1, y2 - diameter, x1 + diameter, y2], 90, 180, fill=fill, outline=outline, width=width)
-                draw.pieslice([x2 - diameter, y2 - diameter, x2, y2], 0, 90, fill=fill, outline=outline, width=width)
-
-            img = Image.new('RGB', (width, height), COLOR_THEME["bg"])
-            draw = ImageDraw.Draw(img)
-            workspace_root = Path(__file__).parent
-            try:
-                font_path = str(workspace_root / "ImgRevSearcher/resource/font/arialuni.ttf")
-                title_font = ImageFont.truetype(font_path, 24)
-                header_font = ImageFont.truetype(font_path, 18)
-                body_font = ImageFont.truetype(font_path, 16)
-            except Exception:
-                title_font = ImageFont.load_default()
-                header_font = ImageFont.load_default()
-                body_font = ImageFont.load_default()
-            rounded_rectangle(draw, [20, 15, width - 20, title_height - 5], 10, fill=COLOR_THEME["header_bg"])
-            title = "可用搜索引擎"
-            title_width = draw.textlength(title, font=title_font) if hasattr(draw, 'textlength') else title_font.getsize(title)[0]
-            title_x = (width - title_width) // 2
-            draw.text((title_x, 25), title, font=title_font, fill=COLOR_THEME["header_text"])
-            table_x = 20
-            table_width = width - 40
-            col_widths = [int(table_width * 0.15), int(table_width * 0.40), int(table_width * 0.20), int(table_width * 0.25)]
-            table_y = title_height + 10
-            table_bottom = table_y + header_height + cell_height * len(self.available_engines)
-            draw.rectangle([table_x, table_y, table_x + sum(col_widths), table_y + header_height], fill=COLOR_THEME["table_header"])
-            y = table_y + header_height
-            for idx, engine in enumerate(self.available_engines):
-                if engine not in ENGINE_INFO:
-                    continue
-                row_bg = COLOR_THEME["cell_bg_even"] if idx % 2 == 0 else COLOR_THEME["cell_bg_odd"]
-                draw.rectangle([table_x, y, table_x + sum(col_widths), y + cell_height], fill=row_bg)
-                y += cell_height
-            headers = ["引擎", "网址", "二次元图片专用", "关键词"]
-            x = table_x
-            for i, header in enumerate(headers):
-                text_width = draw.textlength(header, font=header_font) if hasattr(draw, 'textlength') else header_font.getsize(header)[0]
-                text_x = x + (col_widths[i] - text_width) // 2
-                draw.text((text_x, table_y + (header_height - 18) // 2), header, font=header_font, fill=COLOR_THEME["text"])
-                x += col_widths[i]
-            y = table_y + header_height
-            for idx, engine in enumerate(self.available_engines):
-                if engine not in ENGINE_INFO:
-                    continue
-                info = ENGINE_INFO[engine]
-                x = table_x
-                draw.text((x + 15, y + (cell_height - 16) // 2), engine, font=body_font, fill=COLOR_THEME["text"])
-                x += col_widths[0]
-                draw.text((x + 15, y + (cell_height - 16) // 2), info["url"], font=body_font, fill=COLOR_THEME["url"])
-                x += col_widths[1]
-                mark = "✓" if info["anime"] else "✗"
-                mark_color = COLOR_THEME["success"] if info["anime"] else COLOR_THEME["fail"]
-                mark_width = draw.textlength(mark, font=header_font) if hasattr(draw, 'textlength') else header_font.getsize(mark)[0]
-                draw.text((x + (col_widths[2] - mark_width) // 2, y + (cell_height - 18) // 2), mark, font=header_font, fill=mark_color)
-                x += col_widths[2]
-                keyword = engine
-                for custom_keyword, engine_name in self.engine_keywords.items():
-                    if engine_name == engine:
-                        keyword = custom_keyword
-                        break
-                draw.text((x + 15, y + (cell_height - 16) // 2), keyword, font=body_font, fill=COLOR_THEME["hint"])
-                y += cell_height
-            draw.rectangle([table_x, table_y, table_x + sum(col_widths), table_bottom], outline=COLOR_THEME["border"], width=border_width)
-            for i in range(1, len(self.available_engines) + 1):
-                line_y = table_y + header_height + cell_height * i
-                if i < len(self.available_engines):
-                    draw.line([(table_x, line_y), (table_x + sum(col_widths), line_y)], fill=COLOR_THEME["border"], width=border_width)
-            draw.line([(table_x, table_y + header_height), (table_x + sum(col_widths), table_y + header_height)], fill=COLOR_THEME["border"], width=border_width)
-            col_x = table_x
-            for i in range(len(col_widths) - 1):
-                col_x += col_widths[i]
-                draw.line([(col_x, table_y), (col_x, table_bottom)], fill=COLOR_THEME["border"], width=border_width)
-            output = io.BytesIO()
-            img.save(output, format="JPEG", quality=85)
-            output.seek(0)
-            return output.getvalue()
-        
-        img_bytes = await asyncio.to_thread(create_engine_intro_image)
+        rows = []
+        for engine in self.available_engines:
+            if engine not in ENGINE_INFO:
+                continue
+            keyword = engine
+            for custom_keyword, engine_name in self.engine_keywords.items():
+                if engine_name == engine:
+                    keyword = custom_keyword
+                    break
+            info = ENGINE_INFO[engine]
+            rows.append((engine, info["url"], info["anime"], keyword))
+        if self.fusion_engines:
+            anime = all(ENGINE_INFO[e]["anime"] for e in self.fusion_engines)
+            rows.append((FUSION_ENGINE, f"合并 {'/'.join(self.fusion_engines)}", anime, FUSION_ENGINE))
+        img_bytes = await run_cpu(cpu_tasks.render_engine_table, rows, COLOR_THEME)
         async for result in self._send_image(event, img_bytes):
                 yield result
 
@@ -649,7 +689,7 @@ class ImgRevSearcherPlugin(Star):
         img_buffer = state.get("img_buffer_ptr")
         if img_buffer:
             img_buffer.seek(0)
-            async for result in self._perform_search(event, engine, img_buffer):
+            async for result in self._perform_search(event, engine, img_buffer, state.get("skip_local", False)):
                 yield result
         else:
             yield event.plain_result("图片数据丢失，请重新搜索")
@@ -662,7 +702,8 @@ class ImgRevSearcherPlugin(Star):
         
         event.stop_event()
 
-    async def _check_and_ask_mode(self, event: AstrMessageEvent, engine: str, img_buffer: io.BytesIO, user_id: str):
+    async def _check_and_ask_mode(self, event: AstrMessageEvent, engine: str, img_buffer: io.BytesIO, user_id: str,
+                                  skip_local: bool = False):
         """
         检查是否需要询问模式
         返回 True 表示已拦截并发送询问，False 表示直接继续
@@ -677,7 +718,8 @@ class ImgRevSearcherPlugin(Star):
                 "timestamp": time.time(),
                 "engine": engine,
                 "img_buffer_ptr": img_buffer, # 暂存指针
-                "search_extra_params": state.get("search_extra_params", {})
+                "search_extra_params": state.get("search_extra_params", {}),
+                "skip_local": skip_local
             }
             yield event.plain_result("请选择 ASCII2D 搜索模式:\n1. 色彩匹配 (Color) \n2. 特征匹配 (Bovw)")
             return
@@ -688,14 +730,16 @@ class ImgRevSearcherPlugin(Star):
                 "timestamp": time.time(),
                 "engine": engine,
                 "img_buffer_ptr": img_buffer,
-                "search_extra_params": state.get("search_extra_params", {})
+                "search_extra_params": state.get("search_extra_params", {}),
+                "skip_local": skip_local
             }
              yield event.plain_result("请选择 IQDB 数据库:\n1. 2D (动漫) \n2. 3D (真人)")
              return
              
         return
 
-    async def _perform_search(self, event: AstrMessageEvent, engine: str, img_buffer: io.BytesIO):
+    async def _perform_search(self, event: AstrMessageEvent, engine: str, img_buffer: io.BytesIO,
+                              skip_local: bool = False):
         """
         调用模型执行图片反向搜索（含异常提示图渲染）
 
@@ -703,6 +747,7 @@ class ImgRevSearcherPlugin(Star):
             event: 消息事件对象
             engine: 引擎名称
             img_buffer: 图片二进制流
+            skip_local: 是否跳过本地索引（用户要求重新搜索）
 
         返回:
             yield图片/提示
@@ -710,11 +755,38 @@ class ImgRevSearcherPlugin(Star):
         异常:
             出错时生成错误提示图片
         """
+        async with self.load_shedder.track() as mode:
+            async for result in self._perform_search_degraded(event, engine, img_buffer, mode, skip_local):
+                yield result
+
+    async def _perform_search_degraded(self, event: AstrMessageEvent, engine: str, img_buffer: io.BytesIO,
+                                       mode: DegradeMode, skip_local: bool = False):
+        """
+        按当前降级模式执行搜索
+
+        参数:
+            event: 消息事件对象
+            engine: 引擎名称
+            img_buffer: 图片二进制流
+            mode: 进入搜索时的降级模式
+            skip_local: 是否跳过本地索引
+
+        返回:
+            yield图片/提示
+        """
+        if not self.load_shedder.allows_engine(engine, mode):
+            allowed = self.engine_health.healthy_engines(
+                e for e in self.load_shedder.cheap_engines if e in self.available_engines
+            )
+            yield event.plain_result(
+                f"当前请求繁忙，暂时仅支持以下引擎: {', '.join(allowed) or '无'}，请稍后重试或更换引擎"
+            )
+            return
         if engine in ["ascii2d", "iqdb"]:
              # Check if we need to ask user for mode
              try:
                  user_id = event.get_sender_id()
-                 item = self._check_and_ask_mode(event, engine, img_buffer, user_id)
+                 item = self._check_and_ask_mode(event, engine, img_buffer, user_id, skip_local)
                  # is async generator
                  intercepted = False
                  async for res in item:
@@ -734,21 +806,55 @@ class ImgRevSearcherPlugin(Star):
                  # Fallthrough to normal search if interaction fails? Or return?
                  # If we return, we stop.
                  return
-
-        file_bytes = img_buffer.getvalue()
-        
+        # 整个搜索流程共用一个图像句柄，需要的派生版本在一次解码中提前生成；
+        # 句柄在模式询问之后创建，询问会结束本次调用，用户选择后重新进入搜索流程
+        handle = ImageHandle(img_buffer.getvalue(), self.scan_frames)
+        self._prefetch_variants(handle, engine, mode)
+        if self.local_index is not None and not skip_local and self.local_index.applies_to(engine):
+            try:
+                local_hits = await self.search_model.search_local(handle)
+            except Exception as e:
+                logger.warning(f"[LocalIndex] 查询失败，改为请求引擎: {e}")
+                local_hits = []
+            result_text = format_hits(local_hits, show_engine=True)
+            if result_text is not None:
+                # 本地索引中已有近乎相同的图像，直接回答，不请求任何引擎
+                async for result in self._deliver_results(event, LOCAL_ENGINE, result_text, handle, mode):
+                    yield result
+                yield event.plain_result("以上为本地索引中的历史结果，如需重新搜索，请在搜图命令后加上「刷新」")
+                return
+        if engine == FUSION_ENGINE:
+            async for result in self._perform_fused_search(event, handle, mode):
+                yield result
+            return
         # 获取额外参数
         user_id = event.get_sender_id()
         state = self.user_states.get(user_id, {})
         extra_kwargs = state.get("search_extra_params", {})
+        if not self.engine_health.is_healthy(engine):
+            alternatives = self.engine_health.healthy_engines(e for e in self.available_engines if e != engine)
+            yield event.plain_result(
+                f"[{engine}] 该引擎近期多次请求失败，可能暂时不可用"
+                + (f"，可尝试: {', '.join(alternatives[:5])}" if alternatives else "")
+            )
         
+        started = time.perf_counter()
         try:
-             result_text = await self.search_model.search(api=engine, file=file_bytes, **extra_kwargs)
+             result_text = await self.search_model.search(
+                 api=engine,
+                 file=handle,
+                 timeout=self.load_shedder.timeout_for(self.search_model.timeout, mode),
+                 enrich=mode < DegradeMode.NO_ENRICH,
+                 **extra_kwargs
+             )
+             self.engine_health.record(engine, True, (time.perf_counter() - started) * 1000)
              if result_text is None:
                  yield event.plain_result(f"[{engine}] 未找到相关结果")
                  return
         except Exception as e:
              # Log the error for admin/debug
+             self.engine_health.record(engine, False, error=e)
+             self.health_prober.note_search(engine, False)
              logger.error(f"[{engine}] Search failed: {e}")
              import traceback
              logger.error(traceback.format_exc())
@@ -756,20 +862,80 @@ class ImgRevSearcherPlugin(Star):
              # Notify user about the specific error
              yield event.plain_result(f"[{engine}] 搜索出错: {str(e)}")
              return
-        img_buffer.seek(0)
-        
-        def process_image():
-            try:
-                source_image = Image.open(img_buffer)
-                result_img = self.search_model.draw_results(engine, result_text, source_image)
-            except Exception as e:
-                result_img = self.search_model.draw_error(engine, str(e))
-            output = io.BytesIO()
-            result_img.save(output, format="JPEG", quality=85)
-            output.seek(0)
-            return output.getvalue()
-        
-        img_bytes = await asyncio.to_thread(process_image)
+        async for result in self._deliver_results(event, engine, result_text, handle, mode):
+            yield result
+
+    def _prefetch_variants(self, handle: ImageHandle, engine: str, mode: DegradeMode) -> None:
+        """
+        按本次搜索会用到的功能提前生成图像派生版本（一次解码）
+
+        参数:
+            handle: 查询图像句柄
+            engine: 引擎名称
+            mode: 进入搜索时的降级模式
+        """
+        names = ["jpeg"]
+        if mode < DegradeMode.TEXT_ONLY:
+            names.append("preview")
+        rerank = self.reranker is not None and (engine == FUSION_ENGINE or self.reranker.applies_to(engine))
+        if (self.local_index is not None and self.local_index.applies_to(engine)) or rerank:
+            names.append("phash")
+        handle.prefetch(*names)
+
+    async def _perform_fused_search(self, event: AstrMessageEvent, handle: ImageHandle, mode: DegradeMode):
+        """
+        并发调用多个引擎并发送合并去重后的结果
+
+        参数:
+            event: 消息事件对象
+            handle: 查询图像句柄
+            mode: 进入搜索时的降级模式
+
+        返回:
+            yield图片/提示
+        """
+        engines = self.engine_health.healthy_engines(self.fusion_engines) or self.fusion_engines
+        try:
+            hits = await self.search_model.search_fused(
+                engines,
+                file=handle,
+                timeout=self.load_shedder.timeout_for(self.search_model.timeout, mode),
+                enrich=mode < DegradeMode.NO_ENRICH,
+                top_k=self.fusion_top_k,
+                limit=self.fusion_results,
+            )
+        except Exception as e:
+            logger.error(f"[{FUSION_ENGINE}] Search failed: {e}")
+            yield event.plain_result(f"[{FUSION_ENGINE}] 搜索出错: {str(e)}")
+            return
+        result_text = format_hits(hits, show_engine=True)
+        if result_text is None:
+            yield event.plain_result(f"[{FUSION_ENGINE}] 未找到相关结果")
+            return
+        async for result in self._deliver_results(event, FUSION_ENGINE, result_text, handle, mode):
+            yield result
+
+    async def _deliver_results(self, event: AstrMessageEvent, engine: str, result_text: str,
+                               handle: ImageHandle, mode: DegradeMode):
+        """
+        按降级模式发送搜索结果：结果图，以及可选的文本结果
+
+        参数:
+            event: 消息事件对象
+            engine: 引擎名称
+            result_text: 搜索结果文本
+            handle: 查询图像句柄
+            mode: 进入搜索时的降级模式
+
+        返回:
+            yield图片/文本
+        """
+        if mode >= DegradeMode.TEXT_ONLY:
+            # 繁忙时跳过结果图渲染，直接发送文本结果
+            for part in split_text_by_length(result_text):
+                yield event.plain_result(f"[{engine}] 搜索结果:\n{part}")
+            return
+        img_bytes = await run_cpu(cpu_tasks.render_results_jpeg, engine, result_text, await handle.preview())
         async for result in self._send_image(event, img_bytes):
                 yield result
         if self.auto_send_text_results:
@@ -862,6 +1028,18 @@ class ImgRevSearcherPlugin(Star):
             return self.engine_keywords[engine_name_lower]
         return engine_name
 
+    def _is_selectable(self, engine: str) -> bool:
+        """
+        判断引擎是否可供用户选择（已启用的引擎，或已配置参与引擎的合并搜索）
+
+        参数:
+            engine: 引擎标识符
+
+        返回:
+            bool: 可选择则为True
+        """
+        return engine in self.available_engines or (engine == FUSION_ENGINE and bool(self.fusion_engines))
+
     def _clear_waiting_states_before_search(self, user_id: str):
         """
         在执行搜索前清除用户等待状态
@@ -949,12 +1127,14 @@ class ImgRevSearcherPlugin(Star):
             event.stop_event()
             return
         actual_engine = self._get_engine_by_name(message_text)
-        if actual_engine in self.available_engines:
+        if self._is_selectable(actual_engine):
             state["engine"] = actual_engine
             if state.get("preloaded_img"):
                 self._clear_waiting_states_before_search(user_id)
                 try:
-                    async for result in self._perform_search(event, state["engine"], state["preloaded_img"]):
+                    async for result in self._perform_search(
+                        event, state["engine"], state["preloaded_img"], state.get("skip_local", False)
+                    ):
                         yield result
                 except Exception:
                     yield event.plain_result("搜索失败，请重试")
@@ -1002,7 +1182,7 @@ class ImgRevSearcherPlugin(Star):
         updated = False
         if message_text and not state.get('engine'):
             actual_engine = self._get_engine_by_name(message_text)
-            if actual_engine in self.available_engines:
+            if self._is_selectable(actual_engine):
                 state["engine"] = actual_engine
                 updated = True
             elif actual_engine in ALL_ENGINES:
@@ -1046,7 +1226,9 @@ class ImgRevSearcherPlugin(Star):
         if state.get("engine") and state.get("preloaded_img"):
             self._clear_waiting_states_before_search(user_id)
             try:
-                async for result in self._perform_search(event, state["engine"], state["preloaded_img"]):
+                async for result in self._perform_search(
+                    event, state["engine"], state["preloaded_img"], state.get("skip_local", False)
+                ):
                     yield result
             except Exception:
                 yield event.plain_result("搜索失败，请重试")
@@ -1092,7 +1274,7 @@ class ImgRevSearcherPlugin(Star):
             img_buffer = await self._download_img(message_text)
         if img_buffer:
             self._clear_waiting_states_before_search(user_id)
-            async for result in self._perform_search(event, state["engine"], img_buffer):
+            async for result in self._perform_search(event, state["engine"], img_buffer, state.get("skip_local", False)):
                 yield result
             event.stop_event()
         else:
@@ -1119,7 +1301,7 @@ class ImgRevSearcherPlugin(Star):
         example_engine = self.available_engines[0] if self.available_engines else None
         message_text = get_message_text(event.message_obj)
         img_urls = get_img_urls(event.message_obj)
-        parts = message_text.strip().split()
+        parts = [part for part in message_text.strip().split() if part.lower() not in SKIP_LOCAL_FLAGS]
         engine = None
         img_buffer = None
         error = None
@@ -1130,7 +1312,7 @@ class ImgRevSearcherPlugin(Star):
             else:
                 potential_engine = parts[1].lower()
                 actual_engine = self._get_engine_by_name(potential_engine)
-                if actual_engine in self.available_engines:
+                if self._is_selectable(actual_engine):
                     engine = actual_engine
                 elif actual_engine in ALL_ENGINES:
                     error = {
@@ -1183,12 +1365,16 @@ class ImgRevSearcherPlugin(Star):
         if user_id in self.user_states:
             del self.user_states[user_id]
         engine, img_buffer, error = await self._parse_initial_command(event)
+        skip_local = any(
+            part.lower() in SKIP_LOCAL_FLAGS for part in get_message_text(event.message_obj).split()
+        )
         if error:
             state = {
                 "step": "waiting_both",
                 "timestamp": time.time(),
                 "preloaded_img": img_buffer,
-                "engine": None
+                "engine": None,
+                "skip_local": skip_local
             }
             if error['type'] == 'invalid_engine':
                 state["invalid_attempts"] = 1  
@@ -1201,7 +1387,7 @@ class ImgRevSearcherPlugin(Star):
         if engine and img_buffer:
             self._clear_waiting_states_before_search(user_id)
             try:
-                async for result in self._perform_search(event, engine, img_buffer):
+                async for result in self._perform_search(event, engine, img_buffer, skip_local):
                     yield result
             except Exception:
                 yield event.plain_result("搜索失败，请重试")
@@ -1211,13 +1397,86 @@ class ImgRevSearcherPlugin(Star):
             "step": "waiting_both",
             "timestamp": time.time(),
             "preloaded_img": img_buffer,
-            "engine": engine
+            "engine": engine,
+            "skip_local": skip_local
         }
         self.user_states[user_id] = state
         async for result in self._send_engine_prompt(event, state):
             yield result
         event.stop_event()
 
+    @filter.command("搜图状态")
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    async def show_status(self, event: AstrMessageEvent):
+        """
+        管理员查看插件当前运行状态（降级模式、执行后端、代理等）
+        """
+        sections = [
+            self.load_shedder.describe(),
+            executors.describe(),
+            self.proxy_router.describe(),
+            self.warmer.describe(),
+            self.engine_health.describe(),
+            DEFAULT_BUDGET.describe(),
+            METRICS.describe(),
+        ]
+        if self.anilist_cache is not None:
+            sections.append(self.anilist_cache.describe())
+        if self.reranker is not None:
+            sections.append(self.reranker.describe())
+        if self.local_index is not None:
+            sections.append(self.local_index.describe())
+        yield event.plain_result("\n\n".join(sections))
+        event.stop_event()
+
+    async def _import_anilist_cache(self, path: str) -> int:
+        """
+        从文件导入番剧信息到 AniList 缓存，失败只记录日志
+
+        参数:
+            path: 导入文件路径
+
+        返回:
+            int: 导入的条目数
+        """
+        try:
+            return await self.anilist_cache.import_file(path)
+        except Exception as e:
+            logger.warning(f"[AniListCache] 导入 {path} 失败: {e}")
+            return 0
+
+    @filter.command("搜图导入番剧缓存")
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    async def import_anilist_cache(self, event: AstrMessageEvent, path: str = ""):
+        """
+        管理员从文件批量导入 AniList 番剧信息，预热 TraceMoe 元数据缓存
+        """
+        if self.anilist_cache is None:
+            yield event.plain_result("AniList缓存未启用")
+        elif not path:
+            yield event.plain_result("用法: /搜图导入番剧缓存 <文件路径>（JSON数组或JSON Lines，每项需包含id）")
+        else:
+            count = await self._import_anilist_cache(path)
+            yield event.plain_result(f"已导入 {count} 条番剧信息\n{self.anilist_cache.describe()}")
+        event.stop_event()
+
+    @filter.command("搜图整理索引")
+    @filter.permission_type(filter.PermissionType.ADMIN)
+    async def compact_local_index(self, event: AstrMessageEvent):
+        """
+        管理员整理本地索引：删除超出上限的最早条目，重建哈希文件并回收空间
+        """
+        if self.local_index is None:
+            yield event.plain_result("本地索引未启用")
+        else:
+            try:
+                removed = await self.local_index.compact()
+                yield event.plain_result(f"本地索引整理完成，删除 {removed} 条\n{self.local_index.describe()}")
+            except Exception as e:
+                logger.error(f"[LocalIndex] 整理失败: {e}")
+                yield event.plain_result(f"本地索引整理失败: {e}")
+        event.stop_event()
+
     @filter.event_message_type(filter.EventMessageType.ALL)
     async def on_message(self, event: AstrMessageEvent):
         """